@@ -0,0 +1,10 @@
+# benchmarks/__init__.py
+"""
+Benchmarks reproductibles des chemins critiques (recherche et pagination des agents, chevauchements,
+calcul des jours, division/restauration des congés, statistiques, imports et exports Excel).
+
+    python -m benchmarks --tailles 1000 10000 100000 --sortie resultats.json
+    python -m benchmarks.comparer reference.json resultats.json
+
+Voir generateur.py (bases synthétiques), scenarios.py (opérations mesurées) et __main__.py.
+"""
@@ -0,0 +1,135 @@
+# benchmarks/__main__.py
+"""
+Lance les benchmarks et écrit les résultats en JSON.
+
+    python -m benchmarks --tailles 1000 10000 100000 --sortie resultats.json
+    python -m benchmarks --tailles 10000 --operations agents_recherche division_conges --repetitions 20
+    python -m benchmarks.comparer reference.json resultats.json
+
+Les bases générées sont conservées dans --dossier (réutilisées tant que les paramètres ne changent pas) ;
+chaque série de mesures travaille sur une copie, supprimée à la fin.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.config_loader import load_config, CONFIG
+
+
+def _resume(durees):
+    """Statistiques (ms) d'une série de durées en secondes."""
+    valeurs = sorted(d * 1000 for d in durees)
+    rang = lambda p: valeurs[min(len(valeurs) - 1, int(p * len(valeurs)))]
+    return {'repetitions': len(valeurs), 'min_ms': round(valeurs[0], 4), 'mediane_ms': round(rang(0.5), 4),
+            'moyenne_ms': round(sum(valeurs) / len(valeurs), 4), 'p95_ms': round(rang(0.95), 4), 'max_ms': round(valeurs[-1], 4)}
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _base(args, taille):
+    """Chemin de la base générée pour `taille` agents (créée si absente) et ses volumes."""
+    from benchmarks.generateur import generer_base
+    annee_fin = datetime.now().year
+    chemin = os.path.join(args.dossier, f"conges_{taille}_{args.annees}ans_{annee_fin}_g{args.graine}.db")
+    if args.regenerer and os.path.exists(chemin): os.remove(chemin)
+    if not os.path.exists(chemin):
+        print(f"Génération de {os.path.basename(chemin)}...", file=sys.stderr)
+        temporaire = chemin + ".tmp"
+        if os.path.exists(temporaire): os.remove(temporaire)
+        infos = generer_base(temporaire, taille, annees=args.annees, annee_fin=annee_fin, graine=args.graine,
+                             progress=lambda n: print(f"  {n}/{taille} agents", file=sys.stderr))
+        os.replace(temporaire, chemin) # Une génération interrompue ne laisse pas de base incomplète
+        return chemin, infos
+    conn = sqlite3.connect(chemin)
+    try:
+        infos = {'agents': conn.execute("SELECT COUNT(*) FROM agents").fetchone()[0],
+                 'conges': conn.execute("SELECT COUNT(*) FROM conges").fetchone()[0],
+                 'certificats': conn.execute("SELECT COUNT(*) FROM certificats_medicaux").fetchone()[0]}
+    finally:
+        conn.close()
+    return chemin, infos
+
+
+def _mesurer(args, taille, chemin, scenarios):
+    from db.database import DatabaseManager
+    from core.conges.service import CongeService
+    from benchmarks.scenarios import Contexte, chronometrer
+    resultats = []
+    with tempfile.TemporaryDirectory(dir=args.dossier) as dossier:
+        copie = os.path.join(dossier, "travail.db")
+        shutil.copyfile(chemin, copie)
+        db = DatabaseManager(copie)
+        db.connect()
+        try:
+            db.create_db_tables()
+            ctx = Contexte(CongeService(db, os.path.join(dossier, "certificats")), dossier, graine=args.graine)
+            for nom, fabrique, repetitions in scenarios:
+                print(f"  {taille} agents : {nom}", file=sys.stderr)
+                durees = chronometrer(fabrique(ctx), args.repetitions or repetitions)
+                resultats.append({'taille': taille, 'operation': nom, **_resume(durees)})
+            if args.stats_sql: print(db.rapport_requetes(30), file=sys.stderr)
+        finally:
+            db.close()
+    return resultats
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks des opérations principales, sans interface.")
+    parser.add_argument("--tailles", type=int, nargs="+", default=[1000, 10000], help="Nombre d'agents des bases générées (ex. 1000 10000 100000)")
+    parser.add_argument("--annees", type=int, default=20, help="Années d'historique de congés")
+    parser.add_argument("--graine", type=int, default=42, help="Graine du générateur (même graine, même base)")
+    parser.add_argument("--operations", nargs="+", help="Opérations à mesurer (par défaut toutes)")
+    parser.add_argument("--repetitions", type=int, help="Nombre de mesures par opération (par défaut propre à chaque opération)")
+    parser.add_argument("--dossier", default=os.path.join(BASE_DIR, "benchmarks", "bases"), help="Dossier des bases générées")
+    parser.add_argument("--regenerer", action="store_true", help="Régénère les bases même si elles existent")
+    parser.add_argument("--sortie", help="Fichier JSON des résultats (par défaut la sortie standard)")
+    parser.add_argument("--stats-sql", action="store_true", help="Mesure aussi les requêtes SQL (db.instrumentation) et affiche leur bilan")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    load_config(os.path.join(BASE_DIR, "config.yaml"))
+    # La mesure des requêtes ajoute son propre coût : désactivée sauf demande explicite
+    CONFIG['db'].setdefault('instrumentation', {})['actif'] = args.stats_sql
+    from benchmarks.scenarios import SCENARIOS
+    noms = [nom for nom, _, _ in SCENARIOS]
+    inconnues = [nom for nom in args.operations or [] if nom not in noms]
+    if inconnues:
+        print(f"Opération(s) inconnue(s) : {', '.join(inconnues)}. Disponibles : {', '.join(noms)}", file=sys.stderr); return 2
+    scenarios = [s for s in SCENARIOS if not args.operations or s[0] in args.operations]
+    os.makedirs(args.dossier, exist_ok=True)
+
+    sortie = {'date': datetime.now().isoformat(timespec='seconds'), 'commit': _commit(), 'python': platform.python_version(),
+              'sqlite': sqlite3.sqlite_version, 'plateforme': platform.platform(), 'annees': args.annees, 'graine': args.graine,
+              'bases': {}, 'resultats': []}
+    for taille in args.tailles:
+        chemin, infos = _base(args, taille)
+        sortie['bases'][str(taille)] = infos
+        sortie['resultats'].extend(_mesurer(args, taille, chemin, scenarios))
+
+    texte = json.dumps(sortie, ensure_ascii=False, indent=2)
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as f: f.write(texte + "\n")
+        print(f"Résultats écrits dans {args.sortie}", file=sys.stderr)
+    else:
+        print(texte)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+# benchmarks/comparer.py
+"""
+Compare deux fichiers de résultats de `python -m benchmarks` (médianes par taille et opération).
+
+    python -m benchmarks.comparer reference.json resultats.json [--seuil 10]
+
+Code de sortie 1 si une opération est plus lente que la référence de plus de --seuil pour cent.
+"""
+import argparse
+import json
+import sys
+
+
+def _medianes(chemin):
+    with open(chemin, encoding='utf-8') as f:
+        return {(r['taille'], r['operation']): r['mediane_ms'] for r in json.load(f)['resultats']}
+
+
+def comparer(reference, resultats, seuil):
+    """[(taille, operation, médiane de référence, nouvelle médiane, écart en %, régression)] des mesures communes."""
+    lignes = []
+    for cle in sorted(reference.keys() & resultats.keys()):
+        avant, apres = reference[cle], resultats[cle]
+        ecart = (apres - avant) / avant * 100 if avant else 0.0
+        lignes.append((*cle, avant, apres, ecart, ecart > seuil))
+    return lignes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.comparer", description="Compare deux séries de benchmarks.")
+    parser.add_argument("reference"); parser.add_argument("resultats")
+    parser.add_argument("--seuil", type=float, default=10.0, help="Ralentissement toléré, en pour cent de la médiane")
+    args = parser.parse_args(argv)
+    lignes = comparer(_medianes(args.reference), _medianes(args.resultats), args.seuil)
+    for taille, operation, avant, apres, ecart, regression in lignes:
+        print(f"{taille:>8} {operation:<24} {avant:>12.3f} ms -> {apres:>12.3f} ms  {ecart:+7.1f} %{'  RÉGRESSION' if regression else ''}")
+    regressions = sum(1 for l in lignes if l[-1])
+    print(f"{len(lignes)} mesure(s) comparée(s), {regressions} régression(s) au-delà de {args.seuil:g} %.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
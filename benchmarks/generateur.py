@@ -0,0 +1,108 @@
+# benchmarks/generateur.py
+"""
+Génération de bases `conges_v3.db` synthétiques et reproductibles (même graine, même base).
+
+Chaque agent reçoit, pour chacune des `annees` dernières années, un ou deux congés annuels
+et parfois un congé de maladie (avec certificat), exceptionnel ou de maternité, sans
+chevauchement. Les jours fériés officiels sont synchronisés et quelques jours fériés
+personnalisés ajoutés chaque année. L'écriture passe par les méthodes de DatabaseManager
+(upsert_agents, ajouter_conges_en_masse...) : triggers, statistiques et journal des soldes
+sont ceux de l'application.
+"""
+import random
+from datetime import date, timedelta
+from time import perf_counter
+
+from core.conges.strategies import strategies_par_type
+from db.database import DatabaseManager
+from utils.holiday_calendar import HOLIDAY_CALENDAR
+
+NOMS = ["Alaoui", "Bennani", "Benjelloun", "El Amrani", "Tazi", "Chraibi", "Idrissi", "Berrada", "Fassi", "Ouazzani",
+        "Lahlou", "Kettani", "Bouzid", "Naciri", "Haddad", "Cherkaoui", "Belkadi", "Mansouri", "Lefèvre", "Moreau",
+        "العلوي", "بناني"]
+PRENOMS = ["Mohamed", "Fatima", "Ahmed", "Khadija", "Youssef", "Salma", "Omar", "Imane", "Hamza", "Meryem",
+           "Karim", "Nadia", "Rachid", "Souad", "Hélène", "Éric", "Zineb", "Anas", "Hajar", "Mehdi", None]
+SYLLABES = ["ka", "ri", "mo", "sa", "la", "di", "na", "bou", "ha", "ze", "fi", "lou", "ta", "me", "cha"]
+GRADES = ["Professeur", "PA", "Infirmier", "Technicien de santé", "Administrateur", "Technicien"]
+LOT_AGENTS = 2000   # Agents dont les congés sont écrits par transaction (mémoire bornée à 100k agents)
+
+
+def _nom(rng):
+    # Un tiers de noms rares : la sélectivité des recherches ressemble à celle d'un vrai fichier
+    if rng.random() < 0.33:
+        return "Ben" + "".join(rng.choice(SYLLABES) for _ in range(rng.randint(2, 3)))
+    return rng.choice(NOMS)
+
+
+def _agents(rng, nb_agents):
+    return [(_nom(rng), rng.choice(PRENOMS), f"P{100000 + i}", rng.choice(GRADES), round(rng.uniform(0, 44), 1))
+            for i in range(nb_agents)]
+
+
+def _conges_agent(rng, agent_id, annees):
+    """Congés (type, début, fin) d'un agent : au plus un par mois, donc jamais de chevauchement."""
+    conges = []
+    for annee in annees:
+        types = ["Congé annuel"] * rng.randint(1, 2)
+        if rng.random() < 0.3: types.append("Congé de maladie")
+        if rng.random() < 0.2: types.append("Congé exceptionnel")
+        if rng.random() < 0.01: types.append("Congé de maternité")
+        for type_conge, mois in zip(types, sorted(rng.sample(range(1, 13), len(types)))):
+            debut = date(annee, mois, rng.randint(1, 12))
+            duree = {"Congé annuel": rng.randint(3, 16), "Congé de maladie": rng.randint(1, 15)}.get(type_conge, rng.randint(1, 5))
+            if type_conge == "Congé de maternité": duree = 16 # Tronqué au mois : les congés ne doivent pas se chevaucher
+            conges.append((agent_id, type_conge, debut, debut + timedelta(days=duree - 1)))
+    return conges
+
+
+def _jours(conges, holidays_set):
+    """Durée de chaque congé selon la stratégie de son type, calculée par lot."""
+    strategies, jours = strategies_par_type(), {}
+    par_type = {}
+    for i, (_, type_conge, debut, fin) in enumerate(conges): par_type.setdefault(type_conge, []).append(i)
+    for type_conge, indices in par_type.items():
+        durees = strategies[type_conge].calculate_days_many([(conges[i][2], conges[i][3]) for i in indices], holidays_set)
+        jours.update(zip(indices, durees))
+    return [jours[i] for i in range(len(conges))]
+
+
+def generer_base(chemin, nb_agents, annees=20, annee_fin=None, graine=42, progress=None):
+    """
+    Crée la base `chemin` (qui ne doit pas exister). Retourne {'agents', 'conges', 'certificats', 'duree_s'}.
+    `annee_fin` : dernière année de congés (par défaut l'année en cours). `progress(n)` : agents traités.
+    """
+    rng = random.Random(graine)
+    annee_fin = annee_fin or date.today().year
+    annees = range(annee_fin - annees + 1, annee_fin + 1)
+    debut = perf_counter()
+    db = DatabaseManager(chemin)
+    db.connect()
+    try:
+        db.create_db_tables()
+        HOLIDAY_CALENDAR.sync_official(db, annees)
+        for annee in annees:
+            for jour in rng.sample(range(1, 366), 2):
+                db.add_holiday((date(annee, 1, 1) + timedelta(days=jour - 1)).isoformat(), "Jour férié local", "Personnalisé")
+        HOLIDAY_CALENDAR.invalidate()
+        holidays_set = HOLIDAY_CALENDAR.holidays_for_period(db, annees[0], annees[-1])
+
+        db.upsert_agents([_agents(rng, nb_agents)])
+        agent_ids = [r[0] for r in db.execute_query("SELECT id FROM agents ORDER BY id", fetch="all")]
+        nb_conges = 0
+        for i in range(0, len(agent_ids), LOT_AGENTS):
+            conges = [c for agent_id in agent_ids[i:i + LOT_AGENTS] for c in _conges_agent(rng, agent_id, annees)]
+            jours = _jours(conges, holidays_set)
+            justifs = {"Congé de maladie": "Arrêt maladie", "Congé exceptionnel": "Événement familial"}
+            nb_conges += db.ajouter_conges_en_masse(
+                [(agent_id, t, justifs.get(t), None, d.isoformat(), f.isoformat(), j) for (agent_id, t, d, f), j in zip(conges, jours)], {})
+            if progress: progress(min(i + LOT_AGENTS, len(agent_ids)))
+        with db.transaction() as cursor:
+            cursor.execute("""INSERT INTO certificats_medicaux (conge_id, nom_medecin, duree_jours, chemin_fichier)
+                              SELECT id, 'Dr Synthétique', jours_pris, 'certificats/cert_' || id || '.pdf' FROM conges
+                              WHERE type_conge = 'Congé de maladie'""")
+            nb_certificats = cursor.rowcount
+        db.snapshot_soldes()
+        db.conn.execute("ANALYZE")
+    finally:
+        db.close()
+    return {'agents': nb_agents, 'conges': nb_conges, 'certificats': nb_certificats, 'duree_s': round(perf_counter() - debut, 2)}
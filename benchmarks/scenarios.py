@@ -0,0 +1,227 @@
+# benchmarks/scenarios.py
+"""
+Opérations chronométrées, sans interface graphique, sur une copie de travail d'une base générée.
+
+Chaque scénario reçoit le Contexte et retourne une fonction sans argument : un appel = une mesure.
+Les scénarios qui écrivent (division/restauration, imports, recalcul des statistiques) laissent
+la base dans un état équivalent ou n'écrivent que dans des années hors de l'historique généré.
+"""
+import gc
+import os
+import random
+from datetime import date, timedelta
+from time import perf_counter
+
+from core.conges.strategies import strategies_par_type
+from utils.date_utils import jours_ouvres
+from utils.excel_export import export_rows_to_xlsx
+from utils.holiday_calendar import HOLIDAY_CALENDAR
+
+TERMES_RECHERCHE = ["alaoui", "fatima", "ben", "lefevre", "P100042", "العلوي", "introuvable"]
+TAILLE_PAGE = 50
+
+
+class Contexte:
+    def __init__(self, service, dossier, graine=42):
+        self.service = service
+        self.db = service.db
+        self.dossier = dossier
+        self.rng = random.Random(graine)
+        self.agent_ids = [r[0] for r in self.db.execute_query("SELECT id FROM agents ORDER BY id", fetch="all")]
+        debut, fin = self.db.execute_query("SELECT MIN(date_debut), MAX(date_fin) FROM conges", fetch="one")
+        self.debut, self.fin = date.fromisoformat(debut), date.fromisoformat(fin)
+        self.holidays_set = HOLIDAY_CALENDAR.holidays_for_period(self.db, self.debut.year, self.fin.year)
+        self.annee_import = self.fin.year + 1   # Années hors historique : les imports n'y chevauchent rien
+        self.agents_divises = set()             # Un agent n'est divisé qu'une fois : pas de division d'un segment
+
+    def agent(self):
+        return self.rng.choice(self.agent_ids)
+
+    def date(self):
+        return self.debut + timedelta(days=self.rng.randrange((self.fin - self.debut).days))
+
+    def fichier(self, nom):
+        return os.path.join(self.dossier, nom)
+
+
+def chronometrer(fonction, repetitions):
+    """
+    Durées (secondes) de `repetitions` appels, ramasse-miettes suspendu pendant chaque appel (comme timeit).
+    Une opération qui prépare ses données peut retourner elle-même la durée (float) de sa partie mesurée.
+    """
+    durees = []
+    for _ in range(repetitions):
+        gc.disable()
+        try:
+            debut = perf_counter()
+            duree = fonction()
+            durees.append(duree if isinstance(duree, float) else perf_counter() - debut)
+        finally:
+            gc.enable()
+    return durees
+
+
+# --- Agents : recherche et pagination ---
+
+def agents_recherche(ctx):
+    termes = iter(TERMES_RECHERCHE * 10000)
+    def operation():
+        ctx.db._invalidate_agent_caches()
+        terme = next(termes)
+        ctx.db.get_agents(term=terme, limit=TAILLE_PAGE)
+        ctx.db.get_agents_count(terme)
+    return operation
+
+def agents_page_suivante(ctx):
+    # Navigation page par page (pagination par clé), en repartant du début en fin de liste
+    etat = {'after': None}
+    def operation():
+        agents = ctx.db.get_agents(limit=TAILLE_PAGE, after=etat['after'])
+        etat['after'] = ctx.db.agent_sort_key(agents[-1]) if len(agents) == TAILLE_PAGE else None
+    return operation
+
+def agents_saut_page(ctx):
+    # Accès direct à une page éloignée, caches vidés : parcours de l'index idx_agents_tri
+    pages = max(1, len(ctx.agent_ids) // TAILLE_PAGE)
+    def operation():
+        ctx.db._invalidate_agent_caches()
+        after = ctx.db.get_agent_page_cursor(None, ctx.rng.randint(1, pages), TAILLE_PAGE)
+        ctx.db.get_agents(limit=TAILLE_PAGE, after=after)
+    return operation
+
+
+# --- Chevauchements et calcul des jours ---
+
+def chevauchements_froid(ctx):
+    def operation():
+        ctx.db.intervals.invalidate()
+        debut = ctx.date()
+        ctx.db.get_overlapping_leaves(ctx.agent(), debut, debut + timedelta(days=30))
+    return operation
+
+def chevauchements_chaud(ctx):
+    ctx.db.precharger_conges_actifs()
+    def operation():
+        debut = ctx.date()
+        ctx.db.get_overlapping_leaves(ctx.agent(), debut, debut + timedelta(days=30))
+    return operation
+
+def index_chargement(ctx):
+    def operation():
+        ctx.db.intervals.invalidate()
+        ctx.db.precharger_conges_actifs()
+    return operation
+
+def jours_ouvres_calcul(ctx):
+    def operation():
+        debut = ctx.date()
+        jours_ouvres(debut, debut + timedelta(days=ctx.rng.randint(1, 60)), ctx.holidays_set)
+    return operation
+
+def date_fin_calcul(ctx):
+    strategie = strategies_par_type()["Congé annuel"]
+    def operation():
+        strategie.calculate_end_date(ctx.date(), ctx.rng.randint(1, 44), ctx.holidays_set)
+    return operation
+
+
+# --- Division d'un congé annuel puis restauration ---
+
+def _division(ctx):
+    """Prépare la division d'un congé annuel d'au moins 3 jours par un congé exceptionnel en son milieu."""
+    while True:
+        agent_id = ctx.agent()
+        if agent_id in ctx.agents_divises: continue
+        row = ctx.db.execute_query("""SELECT id FROM conges WHERE agent_id = ? AND type_conge = 'Congé annuel' AND statut = 'Actif'
+                                      AND julianday(date_fin) - julianday(date_debut) >= 2 LIMIT 1""", (agent_id,), fetch="one")
+        if row: break
+    ctx.agents_divises.add(agent_id)
+    conge = ctx.db.get_conge_by_id(row[0])
+    milieu = conge.date_debut + (conge.date_fin - conge.date_debut) / 2
+    form_data = {'agent_id': conge.agent_id, 'type_conge': "Congé exceptionnel", 'justif': "Benchmark", 'interim_id': None,
+                 'date_debut': milieu.strftime('%d/%m/%Y'), 'date_fin': milieu.strftime('%d/%m/%Y'), 'jours_pris': 1}
+    return conge, milieu, form_data
+
+def division_conges(ctx):
+    a_restaurer = ctx.a_restaurer = []
+    def operation():
+        conge, milieu, form_data = _division(ctx)
+        ctx.service.split_or_replace_leaves(ctx.db.get_overlapping_leaves(conge.agent_id, milieu, milieu), form_data)
+        a_restaurer.append((conge.agent_id, milieu))
+    return operation
+
+def restauration_conges(ctx):
+    # Restaure les divisions du scénario précédent (ou en crée une, non mesurée, avant chaque mesure)
+    def operation():
+        if not getattr(ctx, 'a_restaurer', None):
+            conge, milieu, form_data = _division(ctx)
+            ctx.service.split_or_replace_leaves(ctx.db.get_overlapping_leaves(conge.agent_id, milieu, milieu), form_data)
+            ctx.a_restaurer = [(conge.agent_id, milieu)]
+        agent_id, milieu = ctx.a_restaurer.pop()
+        conge_id = ctx.db.execute_query("SELECT id FROM conges WHERE agent_id = ? AND date_debut = ? AND type_conge = 'Congé exceptionnel' AND statut = 'Actif'",
+                                        (agent_id, milieu.strftime('%Y-%m-%d')), fetch="one")[0]
+        debut = perf_counter()
+        ctx.service.revoke_split_on_delete(conge_id)
+        return perf_counter() - debut
+    return operation
+
+
+# --- Statistiques ---
+
+def statistiques_lecture(ctx):
+    def operation():
+        ctx.service.rapport()
+    return operation
+
+def statistiques_recalcul(ctx):
+    return ctx.service.rebuild_stats
+
+
+# --- Excel ---
+
+def export_agents(ctx):
+    return lambda: ctx.service.export_agents(ctx.fichier("agents.xlsx"))
+
+def export_conges(ctx):
+    return lambda: ctx.service.export_conges(ctx.fichier("conges.xlsx"))
+
+def import_agents(ctx):
+    # Réimporte l'export des agents : lecture, validation et comparaison de tous les agents
+    fichier = ctx.fichier("agents.xlsx")
+    if not os.path.exists(fichier): ctx.service.export_agents(fichier)
+    return lambda: ctx.service.import_agents(fichier)
+
+def import_conges(ctx):
+    # Un congé sans décompte de solde pour (au plus) 10 000 agents, dans une nouvelle année à chaque mesure
+    pprs = [r[0] for r in ctx.db.execute_query("SELECT ppr FROM agents ORDER BY id LIMIT 10000", fetch="all")]
+    def operation():
+        fichier, annee = ctx.fichier(f"conges_{ctx.annee_import}.xlsx"), ctx.annee_import
+        ctx.annee_import += 1
+        lignes = [(ppr, "Congé exceptionnel", f"{annee}-03-{2 + i % 20:02d}", f"{annee}-03-{3 + i % 20:02d}") for i, ppr in enumerate(pprs)]
+        export_rows_to_xlsx(fichier, "Congés", ["PPR", "Type", "Début", "Fin"], lignes)
+        debut = perf_counter()
+        report = ctx.service.import_conges(fichier)
+        if not report.ok: raise ValueError(f"Import de congés refusé : {report.errors[:3]}")
+        return perf_counter() - debut
+    return operation
+
+
+# (nom, fabrique, répétitions par défaut). L'ordre compte : restauration_conges défait division_conges.
+SCENARIOS = [
+    ("agents_recherche", agents_recherche, 70),
+    ("agents_page_suivante", agents_page_suivante, 200),
+    ("agents_saut_page", agents_saut_page, 50),
+    ("chevauchements_froid", chevauchements_froid, 200),
+    ("chevauchements_chaud", chevauchements_chaud, 2000),
+    ("index_chargement", index_chargement, 3),
+    ("jours_ouvres", jours_ouvres_calcul, 2000),
+    ("date_fin", date_fin_calcul, 2000),
+    ("division_conges", division_conges, 50),
+    ("restauration_conges", restauration_conges, 50),
+    ("statistiques_lecture", statistiques_lecture, 200),
+    ("statistiques_recalcul", statistiques_recalcul, 3),
+    ("export_agents", export_agents, 3),
+    ("export_conges", export_conges, 1),
+    ("import_agents", import_agents, 3),
+    ("import_conges", import_conges, 3),
+]
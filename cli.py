@@ -0,0 +1,209 @@
+# cli.py
+"""
+Interface en ligne de commande, sans affichage : n'importe jamais tkinter.
+
+    python -m cli importer-agents agents.xlsx
+    python -m cli importer-conges historique.csv
+    python -m cli exporter-agents agents.xlsx
+    python -m cli exporter-conges conges.xlsx
+    python -m cli recalculer-stats
+    python -m cli rapport
+    python -m cli soldes [--ppr PPR] [--date JJ/MM/AAAA]
+    python -m cli historique-solde PPR [--du JJ/MM/AAAA] [--au JJ/MM/AAAA]
+    python -m cli verifier-soldes [--corriger]
+    python -m cli report-annuel 2025 [--simulation] [--force]
+    python -m cli conge-collectif "Congé exceptionnel" 04/08/2025 08/08/2025 --grade PA [--remplacer]
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+from utils.config_loader import load_config, CONFIG
+from core.exceptions import RemplacementRequisError
+from utils.date_utils import validate_date
+
+
+def _service(args):
+    # Importés à la demande : `--help` et les erreurs d'arguments restent instantanés
+    from db.database import DatabaseManager
+    from core.conges.service import CongeService
+    db_manager = DatabaseManager(args.db or os.path.join(BASE_DIR, CONFIG['db']['filename']))
+    db_manager.connect()
+    db_manager.create_db_tables()
+    db_manager.snapshot_soldes(CONFIG['conges'].get('snapshot_soldes_jours', 30))
+    return CongeService(db_manager, os.path.join(BASE_DIR, CONFIG['db']['certificates_dir']))
+
+
+def _afficher_import(report):
+    if report.ok:
+        print(f"Importation réussie : {report.added} ajouté(s), {report.updated} mis à jour.")
+        return 0
+    print(f"Échec de l'importation : {len(report.errors)} erreur(s). Aucune modification n'a été enregistrée.", file=sys.stderr)
+    for error in report.errors: print(f"  {error}", file=sys.stderr)
+    return 1
+
+
+def cmd_importer_agents(service, args):
+    return _afficher_import(service.import_agents(args.fichier))
+
+def cmd_importer_conges(service, args):
+    return _afficher_import(service.import_conges(args.fichier))
+
+def _progress(n):
+    print(f"  {n} lignes écrites...", file=sys.stderr)
+
+def cmd_exporter_agents(service, args):
+    print(f"{service.export_agents(args.fichier, progress=_progress)} agents exportés vers {args.fichier}")
+    return 0
+
+def cmd_exporter_conges(service, args):
+    print(f"{service.export_conges(args.fichier, progress=_progress)} congés exportés vers {args.fichier}")
+    return 0
+
+def cmd_recalculer_stats(service, args):
+    ecarts = service.rebuild_stats()
+    print(f"Statistiques recalculées : {len(ecarts)} écart(s) corrigé(s).")
+    for ecart in ecarts: print(f"  {ecart}")
+    return 0
+
+def cmd_rapport(service, args):
+    rapport = service.rapport()
+    print("Nombre total d'agents".ljust(32) + f": {rapport['agents']}")
+    print(f"{'Total des jours de congés actifs':<32}: {rapport['jours']}")
+    print("Répartition par type de congé (actifs):")
+    for type_conge, nombre, jours in rapport['par_type']:
+        part = (nombre / rapport['conges']) * 100 if rapport['conges'] else 0
+        print(f"  - {type_conge:<22}: {nombre} ({part:.1f}%), {jours} jours")
+    print("Par année:")
+    for annee, type_conge, nombre, jours in rapport['par_annee']:
+        print(f"  {annee}  {type_conge:<22}: {nombre} congé(s), {jours} jours")
+    return 0
+
+def _date_arg(text):
+    date = validate_date(text)
+    if not date: raise argparse.ArgumentTypeError(f"date invalide : {text}")
+    return date
+
+def cmd_soldes(service, args):
+    soldes_a_date = service.db.get_soldes_a_date(args.date) if args.date else None
+    for agent in service.db.iter_agents_export_rows():
+        agent_id, nom, prenom, ppr, grade, solde = agent
+        if args.ppr and ppr != args.ppr: continue
+        if soldes_a_date is not None:
+            solde = soldes_a_date.get(agent_id)
+            if solde is None: continue
+        print(f"{ppr:<12} {nom} {prenom or ''} ({grade}) : {solde:.1f} j")
+    return 0
+
+def cmd_historique_solde(service, args):
+    agent_id = service.db.get_agent_ids_by_ppr().get(args.ppr)
+    if agent_id is None:
+        print(f"PPR introuvable : {args.ppr}", file=sys.stderr); return 1
+    def afficher_solde(date):
+        solde = service.db.get_solde_a_date(agent_id, date)
+        print(f"Solde au {date:%d/%m/%Y} : {'inconnu' if solde is None else f'{solde:.1f} j'}")
+    if args.du: afficher_solde(args.du - timedelta(days=1))
+    for date_mouvement, delta, motif, conge_id in service.db.get_mouvements_solde(agent_id, args.du, args.au):
+        print(f"  {date_mouvement}  {delta:+7.1f} j  {motif}{f' (congé {conge_id})' if conge_id else ''}")
+    afficher_solde(args.au or datetime.now())
+    return 0
+
+def cmd_verifier_soldes(service, args):
+    ecarts = service.db.verifier_soldes(corriger=args.corriger)
+    for _, ppr, nom, prenom, solde, solde_journal in ecarts:
+        print(f"  {ppr:<12} {nom} {prenom or ''} : {solde:.2f} j en base, {solde_journal:.2f} j selon le journal ({solde - solde_journal:+.2f} j)")
+    if not ecarts: print("Tous les soldes concordent avec le journal des soldes."); return 0
+    if args.corriger: print(f"{len(ecarts)} solde(s) aligné(s) sur le journal des soldes."); return 0
+    print(f"{len(ecarts)} solde(s) différent(s) du journal des soldes (--corriger pour les aligner).", file=sys.stderr)
+    return 1
+
+def cmd_conge_collectif(service, args):
+    agent_ids = None
+    if args.ppr:
+        ids_par_ppr = service.db.get_agent_ids_by_ppr()
+        inconnus = [ppr for ppr in args.ppr if ppr not in ids_par_ppr]
+        if inconnus:
+            print(f"PPR introuvable(s) : {', '.join(inconnus)}", file=sys.stderr); return 1
+        agent_ids = [ids_par_ppr[ppr] for ppr in args.ppr]
+    try:
+        bilan = service.submit_conge_collectif(args.type, args.debut, args.fin, grade=args.grade, term=args.recherche,
+                                               agent_ids=agent_ids, justif=args.justif, remplacer=args.remplacer)
+    except RemplacementRequisError as e:
+        print(f"{e} ({len(e.conges_annuels)} congé(s)) Relancez avec --remplacer pour confirmer.", file=sys.stderr); return 1
+    for ligne in bilan.lignes(): print(f"  {ligne}")
+    print(f"{len(bilan.ajoutes)} agent(s) mis en congé ({bilan.jours} jour(s)), {len(bilan.ecartes)} écarté(s).")
+    return 0
+
+def cmd_report_annuel(service, args):
+    bilan = service.report_annuel(args.annee, simulation=args.simulation, force=args.force)
+    if bilan.deja_applique:
+        print(f"Attention : le report de {bilan.annee} a déjà été appliqué le {bilan.deja_applique}.", file=sys.stderr)
+    for _, ppr, nom, prenom, grade, solde, nouveau in bilan.modifications:
+        print(f"  {ppr:<12} {nom} {prenom or ''} ({grade}) : {solde:.1f} j -> {nouveau:.1f} j")
+    verbe = "seraient modifiés" if bilan.simulation else "modifiés"
+    print(f"Report {bilan.annee} -> {bilan.annee + 1} : {bilan.agents} solde(s) {verbe} en {bilan.duree * 1000:.0f} ms.")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Gestion des congés en ligne de commande.")
+    parser.add_argument("--db", help="Chemin de la base (par défaut celle de config.yaml)")
+    parser.add_argument("--log", help="Fichier journal (par défaut conges.log, à côté de la base)")
+    parser.add_argument("--stats-sql", action="store_true", help="Active la mesure des requêtes SQL et affiche leur bilan en fin d'exécution")
+    sub = parser.add_subparsers(dest="commande", required=True)
+    for name, func, aide in [("importer-agents", cmd_importer_agents, "Importe des agents (Excel ou CSV)"),
+                             ("importer-conges", cmd_importer_conges, "Importe un historique de congés (Excel ou CSV)"),
+                             ("exporter-agents", cmd_exporter_agents, "Exporte tous les agents (Excel)"),
+                             ("exporter-conges", cmd_exporter_conges, "Exporte tous les congés (Excel)")]:
+        p = sub.add_parser(name, help=aide); p.add_argument("fichier"); p.set_defaults(func=func)
+    sub.add_parser("recalculer-stats", help="Recalcule les statistiques agrégées").set_defaults(func=cmd_recalculer_stats)
+    sub.add_parser("rapport", help="Affiche les statistiques globales").set_defaults(func=cmd_rapport)
+    p = sub.add_parser("soldes", help="Affiche les soldes des agents"); p.add_argument("--ppr")
+    p.add_argument("--date", type=_date_arg, help="Soldes en fin de journée à cette date"); p.set_defaults(func=cmd_soldes)
+    p = sub.add_parser("historique-solde", help="Journal des mouvements de solde d'un agent"); p.add_argument("ppr")
+    p.add_argument("--du", type=_date_arg); p.add_argument("--au", type=_date_arg); p.set_defaults(func=cmd_historique_solde)
+    p = sub.add_parser("verifier-soldes", help="Compare les soldes des agents au journal des soldes")
+    p.add_argument("--corriger", action="store_true", help="Aligne les soldes différents sur le journal"); p.set_defaults(func=cmd_verifier_soldes)
+    p = sub.add_parser("report-annuel", help="Clôture une année : acquisition et report plafonné des soldes")
+    p.add_argument("annee", type=int); p.add_argument("--simulation", action="store_true", help="Affiche les soldes sans rien écrire")
+    p.add_argument("--force", action="store_true", help="Réapplique un report déjà enregistré pour cette année")
+    p.set_defaults(func=cmd_report_annuel)
+    p = sub.add_parser("conge-collectif", help="Applique un même congé à un grade, une recherche ou une liste de PPR")
+    p.add_argument("type"); p.add_argument("debut"); p.add_argument("fin")
+    p.add_argument("--grade"); p.add_argument("--recherche"); p.add_argument("--ppr", nargs="+")
+    p.add_argument("--justif"); p.add_argument("--remplacer", action="store_true")
+    p.set_defaults(func=cmd_conge_collectif)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        load_config(os.path.join(BASE_DIR, "config.yaml"))
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr); return 2
+    if args.stats_sql: CONFIG['db'].setdefault('instrumentation', {})['actif'] = True
+    dossier_base = os.path.dirname(os.path.abspath(args.db)) if args.db else BASE_DIR
+    logging.basicConfig(filename=args.log or os.path.join(dossier_base, "conges.log"), level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+    try:
+        service = _service(args)
+    except (sqlite3.Error, ValueError) as e:
+        print(f"Impossible d'ouvrir la base de données : {e}", file=sys.stderr); return 2
+    try:
+        return args.func(service, args)
+    except (ValueError, sqlite3.Error, OSError) as e:
+        print(f"Erreur : {e}", file=sys.stderr); return 1
+    finally:
+        rapport = service.db.rapport_requetes()
+        if args.stats_sql and rapport: print(rapport, file=sys.stderr)
+        service.db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
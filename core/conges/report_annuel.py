@@ -0,0 +1,60 @@
+# core/conges/report_annuel.py
+"""
+Report annuel des soldes : acquisition par grade et report plafonné du solde restant.
+Appliqué à tous les agents en une seule instruction UPDATE ... FROM (DatabaseManager.appliquer_report_annuel).
+Les règles viennent de `conges.report_annuel` dans config.yaml.
+"""
+import logging
+import time
+
+from core.exceptions import ValidationError
+from utils.config_loader import CONFIG
+
+CLES_REGLE = ('acquisition', 'plafond_report', 'plafond_solde')
+
+
+class BilanReport:
+    """Bilan d'un report annuel (appliqué ou simulé)."""
+    def __init__(self, annee, simulation):
+        self.annee = annee
+        self.simulation = simulation
+        self.agents = 0           # Agents dont le solde change
+        self.modifications = []   # Simulation : [(id, ppr, nom, prenom, grade, solde, nouveau_solde)]
+        self.deja_applique = None # Date du report déjà enregistré pour cette année, le cas échéant
+        self.duree = 0.0          # Secondes
+
+
+def regles_report():
+    """Règles de la configuration : ({grade: règle}, règle par défaut). Lève ValidationError si elles sont incomplètes."""
+    conf = CONFIG['conges'].get('report_annuel') or {}
+    try:
+        defaut = {k: float(conf['defaut'][k]) for k in CLES_REGLE}
+        regles = {grade: {k: float((regle or {}).get(k, defaut[k])) for k in CLES_REGLE}
+                  for grade, regle in (conf.get('grades') or {}).items()}
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValidationError(f"Règles de report annuel invalides dans config.yaml (conges.report_annuel) : {e}") from e
+    return regles, defaut
+
+
+def executer_report_annuel(db_manager, annee, simulation=False, force=False):
+    """
+    Clôture l'année `annee` : calcule le solde de l'année suivante pour tous les agents.
+    En simulation, rien n'est écrit et `modifications` liste les soldes qui changeraient.
+    Lève ValidationError si le report de cette année a déjà été appliqué (sauf si force=True).
+    """
+    regles, defaut = regles_report()
+    bilan = BilanReport(annee, simulation)
+    deja = db_manager.get_report_annuel(annee)
+    if deja:
+        bilan.deja_applique = deja[1]
+        if not simulation and not force:
+            raise ValidationError(f"Le report de l'année {annee} a déjà été appliqué le {deja[1]}.")
+    debut = time.perf_counter()
+    if simulation:
+        bilan.modifications = db_manager.calculer_report_annuel(regles, defaut)
+        bilan.agents = len(bilan.modifications)
+    else:
+        bilan.agents = db_manager.appliquer_report_annuel(annee, regles, defaut, force=force)
+    bilan.duree = time.perf_counter() - debut
+    logging.info(f"Report annuel {annee}{' (simulation)' if simulation else ''} : {bilan.agents} solde(s) modifié(s) en {bilan.duree * 1000:.0f} ms.")
+    return bilan
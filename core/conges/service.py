@@ -0,0 +1,332 @@
+# core/conges/service.py
+"""
+Service métier des congés, sans interface graphique.
+
+Toutes les opérations retournent un résultat ou lèvent une exception typée
+(core/exceptions.py). CongeManager (core/conges/manager.py) l'enveloppe pour
+Tk (confirmations et boîtes de dialogue) ; cli.py l'utilise directement.
+"""
+import sqlite3
+import logging
+import os
+import shutil
+from datetime import datetime, timedelta
+
+from core.exceptions import ValidationError, IntrouvableError, RemplacementRequisError, CertificatError
+from core.conges.importer import import_conges_from_file
+from core.conges.report_annuel import executer_report_annuel
+from core.conges.strategies import strategies_par_type
+from utils.date_utils import jours_ouvres, validate_date
+from utils.holiday_calendar import HOLIDAY_CALENDAR
+from utils.config_loader import CONFIG
+from utils.excel_export import export_rows_to_xlsx, AGENTS_EXPORT_HEADERS, CONGES_EXPORT_HEADERS
+from utils.excel_import import import_agents_from_file
+from db.models import Conge
+
+
+class BilanCollectif:
+    """Bilan d'un congé collectif : durée appliquée et résultat par agent."""
+    def __init__(self, jours):
+        self.jours = jours
+        self.ajoutes = []   # [(agent, nombre de congés annuels divisés)]
+        self.ecartes = []   # [(agent, motif)]
+
+    def ajouter(self, agent, remplaces=0):
+        self.ajoutes.append((agent, remplaces))
+
+    def ecarter(self, agent, motif):
+        self.ecartes.append((agent, motif))
+
+    def ecarter_introuvable(self, agent_id):
+        """Identifiant demandé qui ne correspond à aucun agent."""
+        self.ecartes.append((None, f"aucun agent d'identifiant {agent_id}."))
+
+    def lignes(self):
+        """Résultat lisible, un agent par ligne."""
+        for agent, remplaces in self.ajoutes:
+            detail = f" ({remplaces} congé(s) annuel(s) divisé(s))" if remplaces else ""
+            yield f"PPR {agent.ppr} {agent.nom} {agent.prenom or ''}: ajouté{detail}."
+        for agent, motif in self.ecartes:
+            if agent is None: yield f"Agent introuvable: écarté, {motif}"
+            else: yield f"PPR {agent.ppr} {agent.nom} {agent.prenom or ''}: écarté, {motif}"
+
+
+class CongeService:
+    def __init__(self, db_manager, certificats_dir):
+        self.db = db_manager
+        self.certificats_dir = certificats_dir
+
+    # --- Agents ---
+    def get_all_agents(self, **kwargs):
+        return self.db.get_agents(**kwargs)
+
+    def get_agent_by_id(self, agent_id):
+        return self.db.get_agent_by_id(agent_id)
+
+    def save_agent(self, agent_data, is_modification=False):
+        if is_modification:
+            return self.db.modifier_agent(
+                agent_data['id'], agent_data['nom'], agent_data['prenom'],
+                agent_data['ppr'], agent_data['grade'], agent_data['solde']
+            )
+        else:
+            return self.db.ajouter_agent(
+                agent_data['nom'], agent_data['prenom'], agent_data['ppr'],
+                agent_data['grade'], agent_data['solde']
+            )
+
+    def delete_agent(self, agent_id):
+        return self.db.supprimer_agent(agent_id)
+
+    # --- Congés ---
+    def get_conges_for_agent(self, agent_id):
+        return self.db.get_conges(agent_id=agent_id)
+
+    def get_conge_by_id(self, conge_id):
+        return self.db.get_conge_by_id(conge_id)
+
+    def delete_conge(self, conge_id):
+        """
+        Suppression qui dépend du statut : un congé annulé est retiré de l'historique,
+        un congé actif issu d'une division restaure le congé d'origine.
+        """
+        conge = self.db.get_conge_by_id(conge_id)
+        if not conge:
+            raise IntrouvableError("Le congé sélectionné n'a pas pu être trouvé.")
+        if conge.statut == 'Annulé':
+            # Cas 1: Suppression simple pour un congé déjà annulé (nettoyage)
+            logging.info(f"Suppression simple du congé annulé ID {conge_id}.")
+            self.db.execute_query("DELETE FROM conges WHERE id=?", (conge_id,))
+            return True
+        # Cas 2: Logique complexe de restauration pour un congé actif
+        return self.revoke_split_on_delete(conge_id)
+
+    def revoke_split_on_delete(self, conge_id_to_delete):
+        logging.info(f"Début de la suppression/restauration pour le congé ID {conge_id_to_delete}.")
+        conge_to_delete = self.db.get_conge_by_id(conge_id_to_delete)
+        if not conge_to_delete: return False
+        agent_id = conge_to_delete.agent_id
+        try:
+            parent_conge_row = self.db.execute_query(
+                """SELECT * FROM conges
+                   WHERE agent_id = ? AND type_conge = 'Congé annuel' AND statut = 'Annulé'
+                   AND ( (date_debut <= ? AND date_fin >= ?) OR (date_debut >= ? AND date_fin <= ?) )
+                   ORDER BY date_debut DESC LIMIT 1""",
+                (agent_id, conge_to_delete.date_debut.strftime('%Y-%m-%d'), conge_to_delete.date_fin.strftime('%Y-%m-%d'),
+                 conge_to_delete.date_debut.strftime('%Y-%m-%d'), conge_to_delete.date_fin.strftime('%Y-%m-%d')),
+                fetch="one"
+            )
+            if parent_conge_row:
+                parent_conge = Conge.from_db_row(parent_conge_row)
+                logging.info(f"Restauration détectée. Parent ID: {parent_conge.id}.")
+                with self.db.transaction() as cursor:
+                    self.db._supprimer_conge_no_commit(cursor, conge_id_to_delete)
+                    segments = self.db.get_overlapping_leaves(agent_id, parent_conge.date_debut, parent_conge.date_fin)
+                    for conge in segments:
+                        if conge.date_debut >= parent_conge.date_debut and conge.date_fin <= parent_conge.date_fin:
+                             self.db._supprimer_conge_no_commit(cursor, conge.id)
+                    self.db._changer_statut_no_commit(cursor, parent_conge.id, 'Actif')
+                    if parent_conge.type_conge in CONFIG['conges']['types_decompte_solde']:
+                        self.db._mouvement_solde_no_commit(cursor, agent_id, -parent_conge.jours_pris, 'Restauration de congé', parent_conge.id)
+                return True
+            else:
+                logging.info(f"Aucun parent trouvé. Suppression simple.")
+                self.db.supprimer_conge(conge_id_to_delete)
+                return True
+        except (sqlite3.Error, ValueError) as e:
+            logging.error(f"Échec de la transaction: {e}", exc_info=True); raise e
+
+    def submit_conge(self, form_data, is_modification, remplacer=False):
+        """
+        Valide et enregistre un congé. Lève ValidationError si les données sont invalides, et
+        RemplacementRequisError si des congés annuels doivent être divisés sans que `remplacer` soit vrai.
+        Lève CertificatError si le congé est enregistré mais pas son certificat.
+        Le congé, son décompte et son certificat sont validés ensemble, en une seule transaction.
+        """
+        start_date = validate_date(form_data['date_debut'])
+        end_date = validate_date(form_data['date_fin'])
+        if not all([form_data['type_conge'], start_date, end_date]) or end_date < start_date or form_data['jours_pris'] <= 0:
+            raise ValidationError("Veuillez vérifier le type, les dates et la durée du congé.")
+        conge_id_exclu = form_data.get('conge_id') if is_modification else None
+        overlaps = self.db.get_overlapping_leaves(form_data['agent_id'], start_date, end_date, conge_id_exclu)
+        if overlaps:
+            annual_overlaps = [c for c in overlaps if c.type_conge == 'Congé annuel']
+            if form_data['type_conge'] == 'Congé annuel' or len(annual_overlaps) != len(overlaps):
+                raise ValidationError("Chevauchement invalide. Vous ne pouvez remplacer des congés annuels que par un autre type de congé.")
+            if not remplacer: raise RemplacementRequisError(annual_overlaps)
+            return self.split_or_replace_leaves(annual_overlaps, form_data)
+        conge_model = Conge(id=form_data.get('conge_id'), agent_id=form_data['agent_id'], type_conge=form_data['type_conge'],
+                            justif=form_data.get('justif'), interim_id=form_data.get('interim_id'),
+                            date_debut=start_date.strftime('%Y-%m-%d'), date_fin=end_date.strftime('%Y-%m-%d'),
+                            jours_pris=form_data['jours_pris'])
+        erreur_cert = None
+        with self.db.transaction():
+            if is_modification: conge_id = self.db.modifier_conge(form_data['conge_id'], conge_model)
+            else: conge_id = self.db.ajouter_conge(conge_model)
+            if conge_id and form_data['type_conge'] == "Congé de maladie":
+                 erreur_cert = self._handle_certificat_save(form_data, is_modification, conge_id)
+        if erreur_cert: raise CertificatError(conge_id, erreur_cert)
+        return True if conge_id else False
+
+    def split_or_replace_leaves(self, annual_overlaps, form_data):
+        logging.info(f"Division/Remplacement de {len(annual_overlaps)} congés annuels.")
+        new_start = validate_date(form_data['date_debut'])
+        new_end = validate_date(form_data['date_fin'])
+        holidays_set = HOLIDAY_CALENDAR.holidays_for_period(self.db, new_start.year - 1, new_end.year + 2)
+        erreur_cert = None
+        with self.db.transaction() as cursor:
+            self._remplacer_annuels_no_commit(cursor, annual_overlaps, new_start, new_end, holidays_set)
+            new_conge_model = Conge(id=None, agent_id=form_data['agent_id'], type_conge=form_data['type_conge'],
+                                    justif=form_data.get('justif'), interim_id=form_data.get('interim_id'),
+                                    date_debut=new_start.strftime('%Y-%m-%d'), date_fin=new_end.strftime('%Y-%m-%d'),
+                                    jours_pris=form_data['jours_pris'])
+            new_conge_id = self.db._ajouter_conge_no_commit(cursor, new_conge_model)
+            if new_conge_id and form_data['type_conge'] == "Congé de maladie":
+                erreur_cert = self._handle_certificat_save(form_data, False, new_conge_id)
+        if erreur_cert: raise CertificatError(new_conge_id, erreur_cert)
+        return True
+
+    def _remplacer_annuels_no_commit(self, cursor, annual_overlaps, new_start, new_end, holidays_set):
+        """Annule les congés annuels chevauchés (solde recrédité) et recrée leurs parties hors de [new_start, new_end]."""
+        for conge in annual_overlaps:
+            self.db._changer_statut_no_commit(cursor, conge.id, 'Annulé')
+            if conge.type_conge in CONFIG['conges']['types_decompte_solde']:
+                self.db._mouvement_solde_no_commit(cursor, conge.agent_id, conge.jours_pris, 'Annulation (division)', conge.id)
+            if conge.date_debut < new_start:
+                end_part1 = new_start - timedelta(days=1)
+                self._creer_segment(cursor, conge.agent_id, conge.date_debut, end_part1, holidays_set)
+            if conge.date_fin > new_end:
+                start_part2 = new_end + timedelta(days=1)
+                self._creer_segment(cursor, conge.agent_id, start_part2, conge.date_fin, holidays_set)
+
+    def submit_conge_collectif(self, type_conge, date_debut, date_fin, grade=None, term=None, agent_ids=None,
+                               justif=None, remplacer=False):
+        """
+        Applique un même congé à tous les agents sélectionnés (par grade, recherche et/ou liste d'identifiants),
+        en une seule transaction. La durée est calculée une fois pour toute la période.
+        Les agents en conflit (chevauchement non remplaçable, solde insuffisant) sont écartés et signalés.
+        Lève ValidationError si la demande est invalide, et RemplacementRequisError si des congés annuels
+        doivent être divisés sans que `remplacer` soit vrai. Retourne un BilanCollectif.
+        """
+        start_date, end_date = validate_date(date_debut), validate_date(date_fin)
+        if type_conge not in CONFIG['ui']['types_conge'] or not start_date or not end_date or end_date < start_date:
+            raise ValidationError("Veuillez vérifier le type et les dates du congé.")
+        if grade is None and not term and agent_ids is None:
+            raise ValidationError("Aucun critère de sélection des agents.")
+        agents = self.db.get_agents(term=term, grade=grade, ids=agent_ids)
+        holidays_set = HOLIDAY_CALENDAR.holidays_for_period(self.db, start_date.year - 1, end_date.year + 2)
+        jours = strategies_par_type()[type_conge].calculate_days(start_date, end_date, holidays_set)
+        if jours <= 0: raise ValidationError("La période ne contient aucun jour à décompter.")
+
+        types_decompte = CONFIG['conges']['types_decompte_solde']
+        bilan, retenus, a_remplacer = BilanCollectif(jours), [], []
+        if agent_ids is not None:
+            # Chaque identifiant demandé figure au bilan, même s'il n'est pas retenu par la sélection
+            selectionnes = {agent.id for agent in agents}
+            manquants = [i for i in dict.fromkeys(agent_ids) if i not in selectionnes]
+            hors_criteres = {a.id: a for a in self.db.get_agents(ids=manquants)} if manquants else {}
+            for agent_id in manquants:
+                if agent_id in hors_criteres: bilan.ecarter(hors_criteres[agent_id], "ne correspond pas au grade ou à la recherche demandés.")
+                else: bilan.ecarter_introuvable(agent_id)
+        self.db.precharger_conges_actifs([agent.id for agent in agents]) # Une seule requête pour tous les agents sélectionnés
+        for agent in agents:
+            overlaps = self.db.intervals.overlapping(agent.id, start_date, end_date)
+            annuels = [c for c in overlaps if c.type_conge == 'Congé annuel']
+            if overlaps and (type_conge == 'Congé annuel' or len(annuels) != len(overlaps)):
+                c = overlaps[0]
+                bilan.ecarter(agent, f"chevauche le congé du {c.date_debut:%d/%m/%Y} au {c.date_fin:%d/%m/%Y} ({c.type_conge}).")
+            elif type_conge in types_decompte and agent.solde < jours:
+                bilan.ecarter(agent, f"solde insuffisant ({agent.solde:.1f}j) pour décompter {jours}j.")
+            else:
+                retenus.append((agent, annuels)); a_remplacer.extend(annuels)
+        if a_remplacer and not remplacer: raise RemplacementRequisError(a_remplacer)
+        if not retenus: return bilan
+
+        logging.info(f"Congé collectif '{type_conge}' du {start_date:%d/%m/%Y} au {end_date:%d/%m/%Y} pour {len(retenus)} agent(s).")
+        debut_sql, fin_sql = start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+        with self.db.transaction() as cursor:
+            for agent, annuels in retenus:
+                if annuels: self._remplacer_annuels_no_commit(cursor, annuels, start_date, end_date, holidays_set)
+                self.db._ajouter_conge_no_commit(cursor, Conge(None, agent.id, type_conge, justif, None, debut_sql, fin_sql, jours))
+        for agent, annuels in retenus: bilan.ajouter(agent, len(annuels))
+        return bilan
+
+    def _creer_segment(self, cursor, agent_id, date_debut, date_fin, holidays_set):
+        if date_debut > date_fin: return
+        jours = jours_ouvres(date_debut, date_fin, holidays_set)
+        if jours > 0:
+            segment = Conge(None, agent_id, 'Congé annuel', None, None, date_debut.strftime('%Y-%m-%d'), date_fin.strftime('%Y-%m-%d'), jours)
+            self.db._ajouter_conge_no_commit(cursor, segment)
+
+    def _handle_certificat_save(self, form_data, is_modification, conge_id):
+        """
+        Enregistre ou retire le certificat du congé, dans la transaction en cours.
+        La copie est effacée si la transaction est annulée ; l'ancien fichier ne l'est qu'une fois elle validée.
+        Retourne un message si le certificat n'a pas pu être copié : le congé, lui, reste valide.
+        """
+        new_path = form_data.get('cert_path')
+        original_path = form_data.get('original_cert_path')
+        if not new_path or not conge_id: return
+        if os.path.exists(new_path) and new_path != original_path:
+            dest_path = None
+            try:
+                base = f"cert_{form_data['agent_ppr']}_{conge_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+                extension, n = os.path.splitext(new_path)[1], 1
+                dest_path = os.path.join(self.certificats_dir, base + extension)
+                # Jamais le nom de l'ancien fichier (même congé modifié dans la même seconde) : il sera supprimé
+                while os.path.exists(dest_path):
+                    n += 1; dest_path = os.path.join(self.certificats_dir, f"{base}_{n}{extension}")
+                shutil.copy(new_path, dest_path)
+                self.db.noter_fichier_cree(dest_path)
+                self.db.execute_query("REPLACE INTO certificats_medicaux (conge_id, duree_jours, chemin_fichier) VALUES (?, ?, ?)",
+                                      (conge_id, form_data['jours_pris'], dest_path))
+                if original_path: self.db.supprimer_fichier_apres_commit(original_path)
+            except Exception as e:
+                logging.error(f"Erreur sauvegarde certificat: {e}", exc_info=True)
+                # Le congé sera validé sans ce certificat : la copie n'est référencée par aucune ligne
+                if dest_path and os.path.exists(dest_path):
+                    try: os.remove(dest_path)
+                    except OSError: pass
+                return f"Le congé a été sauvegardé, mais le certificat n'a pas pu être copié:\n{e}"
+        elif not new_path and original_path:
+            try:
+                self.db.execute_query("DELETE FROM certificats_medicaux WHERE conge_id = ?", (conge_id,))
+                self.db.supprimer_fichier_apres_commit(original_path)
+            except Exception as e:
+                logging.error(f"Impossible de supprimer l'ancien certificat pour conge_id {conge_id}: {e}")
+
+    # --- Traitements en masse et rapports ---
+    def import_agents(self, filename):
+        """Import d'agents (Excel ou CSV), tout ou rien. Retourne un ImportReport."""
+        return import_agents_from_file(self.db, filename)
+
+    def import_conges(self, filename):
+        """Import d'un historique de congés (Excel ou CSV), tout ou rien. Retourne un ImportReport."""
+        return import_conges_from_file(self.db, filename)
+
+    def export_agents(self, filename, progress=None):
+        """Exporte tous les agents ; retourne le nombre de lignes écrites."""
+        return export_rows_to_xlsx(filename, "Agents", AGENTS_EXPORT_HEADERS, self.db.iter_agents_export_rows(), progress=progress)
+
+    def export_conges(self, filename, progress=None):
+        """Exporte tous les congés ; retourne le nombre de lignes écrites."""
+        return export_rows_to_xlsx(filename, "Tous les Congés", CONGES_EXPORT_HEADERS, self.db.iter_conges_export_rows(), progress=progress)
+
+    def rebuild_stats(self):
+        """Recalcule les statistiques agrégées ; retourne les écarts corrigés."""
+        return self.db.rebuild_stats()
+
+    def report_annuel(self, annee, simulation=False, force=False):
+        """Report des soldes en fin d'année `annee` (voir core/conges/report_annuel.py) ; retourne un BilanReport."""
+        return executer_report_annuel(self.db, annee, simulation=simulation, force=force)
+
+    def rapport(self, statut='Actif'):
+        """Statistiques globales : {'agents', 'conges', 'jours', 'par_type': [(type, nombre, jours)], 'par_annee': [...]}."""
+        repartition = self.db.get_stats_conges(statut)
+        return {
+            'agents': self.db.get_agents_count(),
+            'conges': sum(nombre for _, nombre, _ in repartition),
+            'jours': sum(jours for _, _, jours in repartition),
+            'par_type': repartition,
+            'par_annee': self.db.get_stats_par_annee(statut),
+        }
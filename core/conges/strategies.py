@@ -5,6 +5,7 @@ import os
 
 # Import des fonctions et de la configuration depuis vos modules utilitaires
 from utils.date_utils import jours_ouvres
+from utils.working_days import WorkingDayCalendar
 from utils.config_loader import CONFIG
 
 class CongeStrategy(ABC):
@@ -59,6 +60,10 @@ class CongeStrategy(ABC):
         """Méthode abstraite pour calculer la durée en jours."""
         pass
 
+    def calculate_days_many(self, ranges, holidays_set):
+        """Calcule la durée de plusieurs couples (début, fin) en un seul appel."""
+        return [self.calculate_days(start, end, holidays_set) for start, end in ranges]
+
 
 # --- Implémentations concrètes des stratégies ---
 
@@ -66,18 +71,14 @@ class CongeAnnuelStrategy(CongeStrategy):
     """Stratégie pour les congés annuels, calculés en jours ouvrés."""
     def calculate_end_date(self, start_date, days_to_add, holidays_set):
         if days_to_add <= 0: return start_date
-        temp_date = start_date.date()
-        days_counted = 0
-        while days_counted < days_to_add:
-            if temp_date.weekday() < 5 and temp_date not in holidays_set:
-                days_counted += 1
-            if days_counted < days_to_add:
-                temp_date += timedelta(days=1)
-        return temp_date
+        return WorkingDayCalendar.for_holidays(holidays_set).add_working_days(start_date, days_to_add)
 
     def calculate_days(self, start_date, end_date, holidays_set):
         return jours_ouvres(start_date, end_date, holidays_set)
 
+    def calculate_days_many(self, ranges, holidays_set):
+        return list(WorkingDayCalendar.for_holidays(holidays_set).count_many(ranges))
+
 class CongeCalendaireStrategy(CongeStrategy):
     """Stratégie de base pour les congés calculés en jours calendaires."""
     def calculate_end_date(self, start_date, days_to_add, holidays_set):
@@ -121,4 +122,21 @@ class CongePaterniteStrategy(CongeCalendaireStrategy):
 
     def calculate_days(self, start_date, end_date, holidays_set):
         # On utilise le calcul de la classe parente (calendaire) pour rester flexible.
-        return super().calculate_days(start_date, end_date, holidays_set)
\ No newline at end of file
+        return super().calculate_days(start_date, end_date, holidays_set)
+
+_STRATEGIES = {}
+
+def strategies_par_type():
+    """
+    Stratégie associée à chaque type de congé.
+    Instanciées au premier appel : certaines lisent la configuration, qui doit déjà être chargée.
+    """
+    if not _STRATEGIES:
+        _STRATEGIES.update({
+            "Congé annuel": CongeAnnuelStrategy(),
+            "Congé exceptionnel": CongeCalendaireStrategy(),
+            "Congé de maladie": CongeMaladieStrategy(),
+            "Congé de maternité": CongeMaterniteStrategy(),
+            "Congé de paternité": CongePaterniteStrategy(),
+        })
+    return _STRATEGIES
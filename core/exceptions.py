@@ -0,0 +1,31 @@
+# core/exceptions.py
+"""Exceptions de la couche métier. L'interface (Tk ou CLI) décide comment les présenter."""
+
+
+class CongesError(Exception):
+    """Erreur métier de base."""
+
+
+class ValidationError(CongesError, ValueError):
+    """Données saisies ou importées invalides."""
+
+
+class IntrouvableError(CongesError, LookupError):
+    """Agent ou congé inexistant."""
+
+
+class RemplacementRequisError(CongesError):
+    """
+    Le congé chevauche des congés annuels qu'il faudrait diviser ou remplacer.
+    L'appelant doit obtenir une confirmation puis relancer la soumission avec `remplacer=True`.
+    """
+    def __init__(self, conges_annuels):
+        super().__init__("Ce congé va modifier un ou plusieurs congés annuels.")
+        self.conges_annuels = conges_annuels
+
+
+class CertificatError(CongesError):
+    """Le congé est enregistré, mais le certificat médical n'a pas pu être copié ou retiré."""
+    def __init__(self, conge_id, message):
+        super().__init__(message)
+        self.conge_id = conge_id
@@ -0,0 +1,102 @@
+# db/connection.py
+"""
+Connexions SQLite de l'application : un rédacteur unique et un lecteur par thread.
+
+Le fichier est passé en WAL : les lecteurs ne bloquent plus le rédacteur et
+inversement. Les pragmas viennent de la section `db` de config.yaml ; ils sont
+appliqués à chaque connexion ouverte (journal_mode et synchronous au rédacteur seul).
+Les connexions sont en mode autocommit (isolation_level=None) : seules les
+transactions explicites (DatabaseManager.transaction) regroupent des écritures.
+"""
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+
+from db.instrumentation import InstrumentedConnection, QueryStats
+
+PRAGMAS_DEFAUT = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,
+    'mmap_size': 134217728,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+# Pragmas propres au fichier ou au rédacteur : jamais envoyés aux connexions en lecture seule
+PRAGMAS_REDACTEUR = ('journal_mode', 'synchronous')
+CACHED_STATEMENTS_DEFAUT = 256
+
+
+def _valeur_pragma(value):
+    """Valeur de pragma sûre à insérer dans le SQL : entier ou mot-clé."""
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or (isinstance(value, str) and not value.isidentifier()):
+        raise ValueError(f"Valeur de pragma invalide : {value!r}")
+    return value
+
+
+class ConnectionManager:
+    """
+    `writer()` : la connexion d'écriture, ouverte au premier appel et réservée au thread qui l'a ouverte.
+    `reader()` : une connexion en lecture seule par thread, réutilisée tant que le thread la garde.
+    """
+    def __init__(self, db_file, options=None):
+        options = options or {}
+        self.db_file = db_file
+        self.pragmas = {**PRAGMAS_DEFAUT, **(options.get('pragmas') or {})}
+        self.cached_statements = int(options.get('cached_statements', CACHED_STATEMENTS_DEFAUT))
+        self.timeout = int(self.pragmas['busy_timeout']) / 1000
+        # Mesure des requêtes (db/instrumentation.py), partagée par toutes les connexions ; None si désactivée
+        instrumentation = options.get('instrumentation') or {}
+        self.stats = QueryStats(instrumentation.get('seuil_lent_ms', 100)) if instrumentation.get('actif') else None
+        self._writer = None
+        self._local = threading.local()
+        self._readers = []
+        self._lock = threading.Lock()
+
+    def _connecter(self, database, **kwargs):
+        if self.stats is None:
+            return sqlite3.connect(database, **kwargs)
+        conn = sqlite3.connect(database, factory=InstrumentedConnection, **kwargs)
+        conn.stats = self.stats
+        return conn
+
+    def _configurer(self, conn, redacteur):
+        for name, value in self.pragmas.items():
+            if not redacteur and name in PRAGMAS_REDACTEUR: continue
+            row = conn.execute(f"PRAGMA {name} = {_valeur_pragma(value)}").fetchone()
+            if name == 'journal_mode' and row and str(row[0]).lower() != str(value).lower():
+                logging.warning(f"Mode de journal '{value}' refusé par SQLite, '{row[0]}' conservé.")
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def writer(self):
+        if self._writer is None:
+            conn = self._connecter(self.db_file, timeout=self.timeout, cached_statements=self.cached_statements, isolation_level=None)
+            try: self._writer = self._configurer(conn, redacteur=True)
+            except (sqlite3.Error, ValueError): conn.close(); raise
+        return self._writer
+
+    def reader(self):
+        """Connexion en lecture seule du thread courant. Elle peut être fermée depuis un autre thread (close)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connecter(f"{Path(self.db_file).resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False,
+                                   timeout=self.timeout, cached_statements=self.cached_statements, isolation_level=None)
+            try: self._configurer(conn, redacteur=False)
+            except (sqlite3.Error, ValueError): conn.close(); raise
+            self._local.conn = conn
+            with self._lock: self._readers.append(conn)
+        return conn
+
+    def close(self):
+        """Ferme les lecteurs puis le rédacteur (après PRAGMA optimize)."""
+        with self._lock:
+            readers, self._readers = self._readers, []
+        for conn in readers: conn.close()
+        self._local = threading.local()
+        if self._writer is not None:
+            try: self._writer.execute("PRAGMA optimize")
+            except sqlite3.Error: pass
+            self._writer.close()
+            self._writer = None
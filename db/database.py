@@ -1,43 +1,164 @@
 import sqlite3
-from tkinter import messagebox
 import logging
 import os
+import hashlib
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 
+from db.connection import ConnectionManager
 from db.models import Agent, Conge
+from db.migrations import apply_migrations
+from db.interval_index import LeaveIntervalIndex
+from utils.text_utils import normaliser_recherche, valeurs_recherche
 try:
     from utils.config_loader import CONFIG
 except ImportError:
     CONFIG = {'conges': {'types_decompte_solde': ['Congé annuel']}}
 
+def _horodatage():
+    """Horodatage local des mouvements et instantanés de solde ('YYYY-MM-DD HH:MM:SS')."""
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+def _supprimer_fichier(chemin):
+    try:
+        if chemin and os.path.exists(chemin): os.remove(chemin)
+    except OSError as e:
+        logging.error(f"Impossible de supprimer le fichier {chemin} : {e}")
+
 class DatabaseManager:
     def __init__(self, db_file):
         self.db_file = db_file
         self.conn = None
+        self.connections = None # ConnectionManager de l'instance principale (None pour un lecteur)
+        self._tx_depth = 0      # Profondeur des transaction() imbriquées
+        # Index en mémoire des congés actifs, construit à la demande par agent
+        self.intervals = LeaveIntervalIndex(self._charger_conges_actifs)
+        self.has_agents_fts = False
+        # Caches de pagination des agents, invalidés à chaque écriture sur la table agents
+        self._agents_count_cache = {}
+        self._agents_pages_cache = {}
+        self._agents_cache_gen = [0] # Partagé avec les lecteurs (open_reader) : une lecture antérieure à une écriture n'est pas mise en cache
+        self._data_version = None    # PRAGMA data_version au dernier contrôle des écritures des autres connexions
+        # Fichiers (certificats) liés à la transaction en cours : créés, à effacer si elle est annulée,
+        # et remplacés, à effacer seulement une fois la transaction validée
+        self._fichiers_crees = []
+        self._fichiers_a_supprimer = []
 
     def connect(self):
+        """Ouvre la connexion d'écriture (WAL et pragmas de config.yaml, voir db/connection.py)."""
         try:
-            self.conn = sqlite3.connect(self.db_file)
-            self.conn.execute("PRAGMA foreign_keys = ON")
+            self.connections = ConnectionManager(self.db_file, CONFIG.get('db'))
+            self.conn = self.connections.writer()
             return True
-        except sqlite3.Error as e:
-            messagebox.showerror("Erreur Base de Données", f"Impossible de se connecter : {e}")
-            return False
+        except (sqlite3.Error, ValueError) as e:
+            logging.error(f"Impossible de se connecter à {self.db_file} : {e}")
+            raise
+
+    def open_reader(self):
+        """
+        Instance en lecture seule sur le même fichier, pour le thread courant (voir db/read_executor.py) : elle utilise
+        la connexion de lecture de ce thread. Les caches de pagination des agents sont partagés avec cette instance.
+        Lève sqlite3.Error en cas d'échec.
+        """
+        reader = DatabaseManager(self.db_file)
+        reader.conn = self.connections.reader()
+        reader.has_agents_fts = self.has_agents_fts
+        reader._agents_count_cache = self._agents_count_cache
+        reader._agents_pages_cache = self._agents_pages_cache
+        reader._agents_cache_gen = self._agents_cache_gen
+        return reader
 
     def close(self):
-        if self.conn: self.conn.close()
+        if self.connections:
+            self.connections.close()
+        elif self.conn:
+            self.conn.close()
+
+    def rapport_requetes(self, limite=None):
+        """Tableau des statistiques des requêtes SQL (db/instrumentation.py), ou None si la mesure est désactivée."""
+        stats = self.connections.stats if self.connections else None
+        return stats.rapport(limite) if stats else None
+
+    def rollback(self):
+        """Annule la transaction en cours et oublie l'index d'intervalles (il peut refléter des écritures annulées)."""
+        self.conn.rollback()
+        self.intervals.invalidate()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unité de travail : `with db.transaction() as cursor:` valide toutes les écritures du bloc en un seul COMMIT.
+        Imbriquée dans une autre, elle devient un SAVEPOINT : une exception n'annule que ses propres écritures,
+        puis se propage. Toute annulation oublie l'index d'intervalles (il peut refléter des écritures annulées).
+        Les fichiers notés pendant le bloc (noter_fichier_cree, supprimer_fichier_apres_commit) suivent son issue.
+        """
+        if not self.conn:
+            raise sqlite3.Error("Pas de connexion à la base de données.")
+        cursor = self.conn.cursor()
+        depth = self._tx_depth
+        marques = (len(self._fichiers_crees), len(self._fichiers_a_supprimer))
+        cursor.execute(f"SAVEPOINT tx_{depth}" if depth else "BEGIN")
+        self._tx_depth += 1
+        try:
+            yield cursor
+        except BaseException:
+            self._tx_depth = depth
+            if not depth: self.rollback()
+            elif self.conn.in_transaction: # SQLite a pu annuler toute la transaction d'elle-même
+                cursor.execute(f"ROLLBACK TO tx_{depth}"); cursor.execute(f"RELEASE tx_{depth}")
+                self.intervals.invalidate()
+            self._annuler_fichiers(*marques)
+            raise
+        self._tx_depth = depth
+        if depth:
+            cursor.execute(f"RELEASE tx_{depth}"); return
+        try: self.conn.commit()
+        except sqlite3.Error: self.rollback(); self._annuler_fichiers(0, 0); raise
+        a_supprimer, self._fichiers_a_supprimer, self._fichiers_crees = self._fichiers_a_supprimer, [], []
+        for chemin in a_supprimer: _supprimer_fichier(chemin)
+
+    def noter_fichier_cree(self, chemin):
+        """Fichier créé pendant la transaction en cours : effacé si elle est annulée."""
+        if self._tx_depth: self._fichiers_crees.append(chemin)
+
+    def supprimer_fichier_apres_commit(self, chemin):
+        """Efface le fichier quand la transaction en cours est validée (aussitôt hors transaction)."""
+        if self._tx_depth: self._fichiers_a_supprimer.append(chemin)
+        else: _supprimer_fichier(chemin)
+
+    def _annuler_fichiers(self, crees, a_supprimer):
+        """Annulation depuis les marques (longueurs des listes) : efface les fichiers créés et garde ceux à supprimer."""
+        for chemin in self._fichiers_crees[crees:]: _supprimer_fichier(chemin)
+        del self._fichiers_crees[crees:]
+        del self._fichiers_a_supprimer[a_supprimer:]
 
     def execute_query(self, query, params=(), fetch=None):
+        """Lecture (fetch="one" ou "all"), ou écriture : validée aussitôt, ou intégrée à la transaction() en cours."""
+        if not self.conn:
+            raise sqlite3.Error("Pas de connexion à la base de données.")
+        try:
+            if fetch in ("one", "all"):
+                cursor = self.conn.cursor()
+                cursor.execute(query, params)
+                return cursor.fetchone() if fetch == "one" else cursor.fetchall()
+            with self.transaction() as cursor:
+                cursor.execute(query, params)
+                return cursor.lastrowid
+        except sqlite3.Error as e:
+            logging.error(f"Erreur SQL: {query} avec params {params} -> {e}", exc_info=True)
+            raise e
+
+    def fetch_models(self, model, query, params=(), fetch="all"):
+        """Exécute une lecture dont les lignes sont construites directement en modèles (row_factory du curseur)."""
         if not self.conn:
             raise sqlite3.Error("Pas de connexion à la base de données.")
         try:
             cursor = self.conn.cursor()
+            cursor.row_factory = model.row_factory
             cursor.execute(query, params)
-            if fetch == "one": return cursor.fetchone()
-            if fetch == "all": return cursor.fetchall()
-            self.conn.commit()
-            return cursor.lastrowid
+            return cursor.fetchone() if fetch == "one" else cursor.fetchall()
         except sqlite3.Error as e:
-            self.conn.rollback()
             logging.error(f"Erreur SQL: {query} avec params {params} -> {e}", exc_info=True)
             raise e
 
@@ -47,19 +168,39 @@ class DatabaseManager:
             self.execute_query("""CREATE TABLE IF NOT EXISTS conges (id INTEGER PRIMARY KEY, agent_id INTEGER NOT NULL, type_conge TEXT NOT NULL, justif TEXT, interim_id INTEGER, date_debut TEXT NOT NULL, date_fin TEXT NOT NULL, jours_pris INTEGER NOT NULL CHECK(jours_pris >= 0), statut TEXT NOT NULL DEFAULT 'Actif', FOREIGN KEY (agent_id) REFERENCES agents(id) ON DELETE CASCADE, FOREIGN KEY (interim_id) REFERENCES agents(id) ON DELETE SET NULL)""")
             self.execute_query("""CREATE TABLE IF NOT EXISTS jours_feries_personnalises (date TEXT PRIMARY KEY, nom TEXT NOT NULL, type TEXT NOT NULL)""")
             self.execute_query("""CREATE TABLE IF NOT EXISTS certificats_medicaux (id INTEGER PRIMARY KEY, conge_id INTEGER NOT NULL UNIQUE, nom_medecin TEXT, duree_jours INTEGER, chemin_fichier TEXT NOT NULL, FOREIGN KEY (conge_id) REFERENCES conges(id) ON DELETE CASCADE)""")
+            apply_migrations(self.conn)
+            self.has_agents_fts = bool(self.execute_query("SELECT 1 FROM sqlite_master WHERE name = 'agents_fts'", fetch="one"))
         except sqlite3.Error as e:
-            messagebox.showerror("Erreur BD", f"Erreur création des tables : {e}")
+            logging.error(f"Erreur création des tables : {e}", exc_info=True)
+            raise
+
+    def _journaliser_soldes_no_commit(self, cursor, mouvements, motif):
+        """Inscrit au journal des soldes des mouvements [(agent_id, delta, conge_id)] déjà appliqués à agents.solde."""
+        horodatage = _horodatage()
+        cursor.executemany("INSERT INTO mouvements_solde (agent_id, date_mouvement, delta, motif, conge_id) VALUES (?, ?, ?, ?, ?)",
+                           [(agent_id, horodatage, delta, motif, conge_id) for agent_id, delta, conge_id in mouvements if delta])
+
+    def _mouvement_solde_no_commit(self, cursor, agent_id, delta, motif, conge_id=None):
+        """Seule modification relative d'un solde : met à jour agents.solde et l'inscrit au journal, dans la transaction en cours."""
+        if not delta: return
+        cursor.execute("UPDATE agents SET solde = solde + ? WHERE id = ?", (delta, agent_id))
+        self._journaliser_soldes_no_commit(cursor, [(agent_id, delta, conge_id)], motif)
 
     def _ajouter_conge_no_commit(self, cursor, conge_model):
-        if conge_model.type_conge in CONFIG['conges']['types_decompte_solde']:
+        decompte = conge_model.type_conge in CONFIG['conges']['types_decompte_solde']
+        if decompte:
             agent_data = cursor.execute("SELECT solde FROM agents WHERE id=?", (conge_model.agent_id,)).fetchone()
             if agent_data[0] < conge_model.jours_pris:
                 raise sqlite3.Error(f"Solde insuffisant ({agent_data[0]:.1f}j) pour décompter {conge_model.jours_pris}j.")
-            cursor.execute("UPDATE agents SET solde = solde - ? WHERE id = ?", (conge_model.jours_pris, conge_model.agent_id))
         
         cursor.execute("INSERT INTO conges (agent_id, type_conge, justif, interim_id, date_debut, date_fin, jours_pris) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                       (conge_model.agent_id, conge_model.type_conge, conge_model.justif, conge_model.interim_id, conge_model.date_debut, conge_model.date_fin, conge_model.jours_pris))
-        return cursor.lastrowid
+                       (conge_model.agent_id, conge_model.type_conge, conge_model.justif, conge_model.interim_id,
+                        conge_model.date_debut.strftime('%Y-%m-%d'), conge_model.date_fin.strftime('%Y-%m-%d'), conge_model.jours_pris))
+        conge_id = cursor.lastrowid
+        if decompte: self._mouvement_solde_no_commit(cursor, conge_model.agent_id, -conge_model.jours_pris, 'Congé', conge_id)
+        self.intervals.add(Conge(conge_id, conge_model.agent_id, conge_model.type_conge, conge_model.justif, conge_model.interim_id,
+                                 conge_model.date_debut, conge_model.date_fin, conge_model.jours_pris))
+        return conge_id
 
     def _supprimer_conge_no_commit(self, cursor, conge_id):
         conge = cursor.execute("SELECT agent_id, type_conge, jours_pris, statut FROM conges WHERE id=?", (conge_id,)).fetchone()
@@ -67,14 +208,21 @@ class DatabaseManager:
         agent_id, type_conge, jours_pris, statut = conge
         
         if type_conge in CONFIG['conges']['types_decompte_solde'] and statut == 'Actif':
-            cursor.execute("UPDATE agents SET solde = solde + ? WHERE id = ?", (jours_pris, agent_id))
+            self._mouvement_solde_no_commit(cursor, agent_id, jours_pris, 'Suppression de congé', conge_id)
             
         cert = cursor.execute("SELECT chemin_fichier FROM certificats_medicaux WHERE conge_id = ?", (conge_id,)).fetchone()
-        if cert and cert[0] and os.path.exists(cert[0]):
-            try: os.remove(cert[0])
-            except OSError as e: logging.error(f"Erreur suppression certificat pour conge_id {conge_id}: {e}")
+        if cert and cert[0]: self.supprimer_fichier_apres_commit(cert[0])
         
         cursor.execute("DELETE FROM conges WHERE id=?", (conge_id,))
+        self.intervals.remove(conge_id)
+
+    def _changer_statut_no_commit(self, cursor, conge_id, statut):
+        """Change le statut d'un congé ('Actif' / 'Annulé') en gardant l'index d'intervalles à jour."""
+        cursor.execute("UPDATE conges SET statut = ? WHERE id = ?", (statut, conge_id))
+        self.intervals.remove(conge_id)
+        if statut == 'Actif':
+            conge = self.get_conge_by_id(conge_id)
+            if conge: self.intervals.add(conge)
 
     def _add_or_update_certificat_no_commit(self, cursor, conge_id, cert_model):
         exists = cursor.execute("SELECT id FROM certificats_medicaux WHERE conge_id=?", (conge_id,)).fetchone()
@@ -82,87 +230,507 @@ class DatabaseManager:
         else: cursor.execute("INSERT INTO certificats_medicaux (conge_id, nom_medecin, duree_jours, chemin_fichier) VALUES (?, ?, ?, ?)", (conge_id, cert_model.nom_medecin, cert_model.duree_jours, cert_model.chemin_fichier))
 
     def ajouter_conge(self, conge_model, cert_model=None):
-        try:
-            cursor = self.conn.cursor()
+        with self.transaction() as cursor:
             conge_id = self._ajouter_conge_no_commit(cursor, conge_model)
             if cert_model and cert_model.chemin_fichier: self._add_or_update_certificat_no_commit(cursor, conge_id, cert_model)
-            self.conn.commit()
-            return conge_id
-        except sqlite3.Error as e: self.conn.rollback(); raise e
+        return conge_id
 
     def modifier_conge(self, old_conge_id, new_conge_model, cert_model=None):
-        try:
-            cursor = self.conn.cursor()
+        with self.transaction() as cursor:
             self._supprimer_conge_no_commit(cursor, old_conge_id)
             new_conge_id = self._ajouter_conge_no_commit(cursor, new_conge_model)
             if cert_model and cert_model.chemin_fichier: self._add_or_update_certificat_no_commit(cursor, new_conge_id, cert_model)
-            self.conn.commit()
-            return new_conge_id
-        except sqlite3.Error as e: self.conn.rollback(); raise e
+        return new_conge_id
 
-    def supprimer_conge(self, conge_id):
+    def ajouter_conges_en_masse(self, conges, debits, batch_size=5000):
+        """
+        Insère des congés déjà validés, en une seule transaction.
+        `conges` : liste de (agent_id, type_conge, justif, interim_id, date_debut ISO, date_fin ISO, jours_pris) ;
+        `debits` : {agent_id: jours à décompter du solde}, appliqué en une mise à jour par agent.
+        """
         try:
-            cursor = self.conn.cursor()
+            with self.transaction() as cursor:
+                for i in range(0, len(conges), batch_size):
+                    cursor.executemany("INSERT INTO conges (agent_id, type_conge, justif, interim_id, date_debut, date_fin, jours_pris) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                       conges[i:i + batch_size])
+                cursor.executemany("UPDATE agents SET solde = solde - ? WHERE id = ?", [(jours, agent_id) for agent_id, jours in debits.items() if jours])
+                self._journaliser_soldes_no_commit(cursor, [(agent_id, -jours, None) for agent_id, jours in debits.items()], 'Import de congés')
+        finally:
+            self.intervals.invalidate()
+            self._invalidate_agent_caches()
+        return len(conges)
+
+    def supprimer_conge(self, conge_id):
+        with self.transaction() as cursor:
             self._supprimer_conge_no_commit(cursor, conge_id)
-            self.conn.commit()
-            return True
-        except sqlite3.Error as e: self.conn.rollback(); raise e
+        return True
     
-    def get_agents(self, term=None, limit=None, offset=None, exclude_id=None):
+    def _agent_search_clause(self, term):
+        """Condition SQL (et paramètres) de recherche d'agents par nom, prénom ou PPR."""
+        t = normaliser_recherche(term)
+        if self.has_agents_fts and len(t) >= 3:
+            # Sous-chaîne quelconque d'une colonne : phrase interrogée sur l'index de trigrammes
+            return "id IN (SELECT rowid FROM agents_fts WHERE agents_fts MATCH ?)", ['"' + t.replace('"', '""') + '"']
+        # Moins de 3 caractères (pas de trigramme) ou FTS5 indisponible : sous-chaîne des colonnes normalisées
+        t = f"%{t}%"
+        return "(nom_recherche LIKE ? OR prenom_recherche LIKE ? OR ppr_recherche LIKE ?)", [t, t, t]
+
+    # Ordre de tri des agents, identique à l'index idx_agents_tri
+    AGENT_SORT_KEY = "nom, IFNULL(prenom, ''), id"
+
+    @staticmethod
+    def agent_sort_key(agent):
+        """Curseur de pagination (nom, prénom, id) d'un agent."""
+        return (agent.nom, agent.prenom or '', agent.id)
+
+    def _invalidate_agent_caches(self):
+        self._agents_cache_gen[0] += 1
+        self._agents_count_cache.clear()
+        self._agents_pages_cache.clear()
+
+    def _verifier_ecritures_externes(self):
+        """
+        Oublie l'index d'intervalles et les caches des agents si une autre connexion (autre processus, CLI...)
+        a validé des écritures depuis le dernier contrôle. À appeler avant de servir ces données en mémoire.
+        """
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            if self._data_version is not None:
+                self.intervals.invalidate()
+                self._invalidate_agent_caches()
+            self._data_version = version
+
+    def get_agents(self, term=None, limit=None, offset=None, exclude_id=None, after=None, grade=None, ids=None):
+        """
+        Agents triés par (nom, prénom, id). Pagination par clé : `after` est le curseur
+        (nom, prénom, id) de la dernière ligne de la page précédente.
+        `grade` et `ids` (liste d'identifiants) restreignent la sélection.
+        """
         q = "SELECT id, nom, prenom, ppr, grade, solde FROM agents"
         p, c = [], []
         if term:
-            t = f"%{term.lower()}%"
-            c.append("(LOWER(nom) LIKE ? OR LOWER(prenom) LIKE ? OR LOWER(ppr) LIKE ?)")
-            p.extend([t, t, t])
+            clause, params = self._agent_search_clause(term)
+            c.append(clause); p.extend(params)
+        if grade is not None:
+            c.append("grade = ?"); p.append(grade)
+        if ids is not None:
+            # Un seul paramètre JSON : pas de limite sur le nombre d'identifiants
+            c.append("id IN (SELECT value FROM json_each(?))"); p.append(json.dumps(list(ids)))
         if exclude_id is not None:
             c.append("id != ?"); p.append(exclude_id)
+        if after is not None:
+            c.append(f"({self.AGENT_SORT_KEY}) > (?, ?, ?)"); p.extend(after)
         if c: q += " WHERE " + " AND ".join(c)
-        q += " ORDER BY nom, prenom"
-        if limit is not None: q += " LIMIT ? OFFSET ?"; p.extend([limit, offset])
-        return [Agent.from_db_row(r) for r in self.execute_query(q, tuple(p), fetch="all") if r]
+        q += f" ORDER BY {self.AGENT_SORT_KEY}"
+        if limit is not None: q += " LIMIT ? OFFSET ?"; p.extend([limit, offset or 0])
+        return self.fetch_models(Agent, q, tuple(p))
 
     def get_agents_count(self, term=None):
-        q, p = "SELECT COUNT(*) FROM agents", []
+        """Nombre d'agents correspondant à la recherche (mis en cache jusqu'à la prochaine écriture)."""
+        self._verifier_ecritures_externes()
+        count = self._agents_count_cache.get(term)
+        if count is None:
+            gen = self._agents_cache_gen[0]
+            q, p = "SELECT COUNT(*) FROM agents", []
+            if term:
+                clause, p = self._agent_search_clause(term)
+                q += " WHERE " + clause
+            count = self.execute_query(q, tuple(p), fetch="one")[0]
+            if gen == self._agents_cache_gen[0]: self._agents_count_cache[term] = count
+        return count
+
+    def get_agent_page_cursor(self, term, page, page_size):
+        """
+        Curseur `after` permettant d'afficher directement la page demandée (None pour la première).
+        Index clairsemé des limites de pages : on part de la page connue la plus proche en amont
+        et on saute les lignes intermédiaires sur l'index couvrant idx_agents_tri.
+        """
+        if page <= 1: return None
+        self._verifier_ecritures_externes()
+        bounds = self._agents_pages_cache.setdefault((term, page_size), {1: None})
+        if page in bounds: return bounds[page]
+        anchor = max(p for p in bounds if p < page)
+        gen = self._agents_cache_gen[0]
+        q, p = f"SELECT nom, IFNULL(prenom, ''), id FROM agents", []
+        c = []
         if term:
-            t = f"%{term.lower()}%"
-            q += " WHERE LOWER(nom) LIKE ? OR LOWER(prenom) LIKE ? OR LOWER(ppr) LIKE ?"
-            p.extend([t, t, t])
-        return self.execute_query(q, tuple(p), fetch="one")[0]
+            clause, params = self._agent_search_clause(term)
+            c.append(clause); p.extend(params)
+        if bounds[anchor] is not None:
+            c.append(f"({self.AGENT_SORT_KEY}) > (?, ?, ?)"); p.extend(bounds[anchor])
+        if c: q += " WHERE " + " AND ".join(c)
+        q += f" ORDER BY {self.AGENT_SORT_KEY} LIMIT 1 OFFSET ?"
+        row = self.execute_query(q, (*p, (page - anchor) * page_size - 1), fetch="one")
+        if row is None: return bounds[anchor] # Au-delà de la dernière page
+        if gen == self._agents_cache_gen[0]: bounds[page] = tuple(row)
+        return tuple(row)
+
+    def note_agent_page_cursor(self, term, page, page_size, cursor):
+        """Mémorise le curseur d'une page atteinte par navigation (suivant/précédent)."""
+        self._agents_pages_cache.setdefault((term, page_size), {1: None})[page] = cursor
 
     def get_agent_by_id(self, agent_id):
-        r = self.execute_query("SELECT id, nom, prenom, ppr, grade, solde FROM agents WHERE id=?", (agent_id,), fetch="one")
-        return Agent.from_db_row(r) if r else None
+        return self.fetch_models(Agent, "SELECT id, nom, prenom, ppr, grade, solde FROM agents WHERE id=?", (agent_id,), fetch="one")
         
     def get_conges(self, agent_id=None):
         q, p = "SELECT id, agent_id, type_conge, justif, interim_id, date_debut, date_fin, jours_pris, statut FROM conges", ()
         if agent_id: q += " WHERE agent_id=? ORDER BY date_debut DESC"; p = (agent_id,)
         else: q += " ORDER BY date_debut DESC"
-        return [Conge.from_db_row(r) for r in self.execute_query(q, p, fetch="all") if r]
+        return self.fetch_models(Conge, q, p)
+
+    def get_conge_rows_for_agent(self, agent_id, type_conge=None):
+        """
+        Lignes prêtes à afficher pour l'arbre des congés d'un agent, en une seule requête :
+        (id, année, type, date_debut, date_fin, jours_pris, justif, statut, certificat, interim_id, interim_nom, interim_prenom)
+        `certificat` vaut None hors congé maladie, sinon 1 si un certificat est attaché, 0 sinon.
+        Triées par année décroissante puis par date de début.
+        """
+        q = """SELECT c.id, CAST(substr(c.date_debut, 1, 4) AS INTEGER) AS annee, c.type_conge, c.date_debut, c.date_fin,
+                      c.jours_pris, c.justif, c.statut,
+                      CASE WHEN c.type_conge = 'Congé de maladie' THEN cm.id IS NOT NULL END AS certificat,
+                      c.interim_id, i.nom, i.prenom
+               FROM conges c
+               LEFT JOIN certificats_medicaux cm ON cm.conge_id = c.id
+               LEFT JOIN agents i ON i.id = c.interim_id
+               WHERE c.agent_id = ?"""
+        p = [agent_id]
+        if type_conge: q += " AND c.type_conge = ?"; p.append(type_conge)
+        q += " ORDER BY annee DESC, c.date_debut, c.id"
+        return self.execute_query(q, tuple(p), fetch="all")
 
     def get_conge_by_id(self, conge_id):
-        r = self.execute_query("SELECT id, agent_id, type_conge, justif, interim_id, date_debut, date_fin, jours_pris, statut FROM conges WHERE id=?", (conge_id,), fetch="one")
-        return Conge.from_db_row(r) if r else None
+        return self.fetch_models(Conge, "SELECT id, agent_id, type_conge, justif, interim_id, date_debut, date_fin, jours_pris, statut FROM conges WHERE id=?", (conge_id,), fetch="one")
+
+    def iter_rows(self, query, params=(), batch_size=5000):
+        """Lecture en flux : génère les lignes par lots de `batch_size`, sans tout charger en mémoire."""
+        if not self.conn:
+            raise sqlite3.Error("Pas de connexion à la base de données.")
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, params)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch: return
+                yield from batch
+        except sqlite3.Error as e:
+            logging.error(f"Erreur SQL: {query} avec params {params} -> {e}", exc_info=True)
+            raise e
+        finally:
+            cursor.close()
+
+    def iter_agents_export_rows(self):
+        """Lignes de l'export des agents : (id, nom, prénom, ppr, grade, solde)."""
+        return self.iter_rows(f"SELECT id, nom, prenom, ppr, grade, solde FROM agents ORDER BY {self.AGENT_SORT_KEY}")
+
+    def iter_conges_export_rows(self):
+        """
+        Lignes de l'export de tous les congés, en une seule requête (agent, intérimaire et certificat joints) :
+        (ppr, nom, prénom, type, début JJ/MM/AAAA, fin JJ/MM/AAAA, jours, justification, intérimaire, certificat).
+        Les valeurs vides sont NULL : openpyxl n'écrit pas de cellule pour None.
+        Parcourt idx_conges_debut à rebours : pas de tri en mémoire.
+        """
+        return self.iter_rows("""
+            SELECT a.ppr, a.nom, a.prenom, c.type_conge,
+                   COALESCE(strftime('%d/%m/%Y', c.date_debut), c.date_debut),
+                   COALESCE(strftime('%d/%m/%Y', c.date_fin), c.date_fin),
+                   c.jours_pris, NULLIF(c.justif, ''),
+                   CASE WHEN c.interim_id IS NULL THEN NULL
+                        WHEN i.id IS NULL THEN 'Agent Supprimé'
+                        ELSE i.nom || ' ' || IFNULL(i.prenom, '') END,
+                   CASE WHEN c.type_conge != 'Congé de maladie' THEN NULL
+                        WHEN cm.id IS NULL THEN 'Manquant' ELSE 'Justifié' END
+            FROM conges c
+            JOIN agents a ON a.id = c.agent_id
+            LEFT JOIN agents i ON i.id = c.interim_id
+            LEFT JOIN certificats_medicaux cm ON cm.conge_id = c.id
+            ORDER BY c.date_debut DESC""")
 
     def ajouter_agent(self, nom, prenom, ppr, grade, solde):
-        try: self.execute_query("INSERT INTO agents (nom, prenom, ppr, grade, solde) VALUES (?, ?, ?, ?, ?)",(nom.strip(), prenom.strip(), ppr.strip(), grade.strip(), solde)); return True
+        try:
+            with self.transaction() as cursor:
+                nom, prenom, ppr = nom.strip(), prenom.strip(), ppr.strip()
+                cursor.execute("""INSERT INTO agents (nom, prenom, ppr, grade, solde, nom_recherche, prenom_recherche, ppr_recherche)
+                                  VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", (nom, prenom, ppr, grade.strip(), solde, *valeurs_recherche(nom, prenom, ppr)))
+                self._journaliser_soldes_no_commit(cursor, [(cursor.lastrowid, solde, None)], 'Solde initial')
+            return True
         except sqlite3.IntegrityError: return False
+        finally: self._invalidate_agent_caches()
 
     def modifier_agent(self, agent_id, nom, prenom, ppr, grade, solde):
-        try: self.execute_query("UPDATE agents SET nom=?, prenom=?, ppr=?, grade=?, solde=? WHERE id=?",(nom.strip(), prenom.strip(), ppr.strip(), grade.strip(), solde, agent_id)); return True
+        try:
+            with self.transaction() as cursor:
+                ancien = cursor.execute("SELECT solde FROM agents WHERE id=?", (agent_id,)).fetchone()
+                nom, prenom, ppr = nom.strip(), prenom.strip(), ppr.strip()
+                # Le solde saisi est écrit tel quel (pas de solde + écart recalculé) ; seul l'écart va au journal
+                cursor.execute("""UPDATE agents SET nom=?, prenom=?, ppr=?, grade=?, solde=?, nom_recherche=?, prenom_recherche=?, ppr_recherche=?
+                                  WHERE id=?""", (nom, prenom, ppr, grade.strip(), solde, *valeurs_recherche(nom, prenom, ppr), agent_id))
+                if ancien: self._journaliser_soldes_no_commit(cursor, [(agent_id, solde - ancien[0], None)], 'Correction manuelle')
+            return True
         except sqlite3.IntegrityError: return False
+        finally: self._invalidate_agent_caches()
+
+    def get_agent_ids_by_ppr(self):
+        """Correspondance {ppr: id} de tous les agents."""
+        return dict(self.execute_query("SELECT ppr, id FROM agents", fetch="all"))
+
+    def get_soldes(self):
+        """Soldes de tous les agents : {id: solde}."""
+        return dict(self.execute_query("SELECT id, solde FROM agents", fetch="all"))
+
+    def upsert_agents(self, chunks):
+        """
+        Ajoute ou met à jour (par PPR) des agents, en une seule transaction.
+        `chunks` : itérable de listes de (nom, prenom, ppr, grade, solde). Si l'itérable lève une exception,
+        la transaction est annulée et l'exception propagée. Retourne le nombre de lignes reçues.
+        Les lignes passent par une table temporaire puis un seul INSERT ... ON CONFLICT : les triggers de l'index
+        plein texte s'exécutent dans une seule instruction (un UPSERT par ligne est plus de 30 fois plus lent).
+        Les agents inchangés ne sont pas réécrits (sauf colonnes de recherche à recalculer, après une écriture hors application).
+        """
+        count = 0
+        try:
+            with self.transaction() as cursor:
+                cursor.execute("""CREATE TEMP TABLE IF NOT EXISTS import_agents (nom TEXT, prenom TEXT, ppr TEXT, grade TEXT, solde REAL,
+                                  nom_recherche TEXT, prenom_recherche TEXT, ppr_recherche TEXT)""")
+                cursor.execute("DELETE FROM temp.import_agents")
+                for rows in chunks:
+                    # Colonnes de recherche normalisées calculées ici : aucune fonction SQL propre à l'application
+                    cursor.executemany("INSERT INTO temp.import_agents VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                       [(*row, *valeurs_recherche(row[0], row[1], row[2])) for row in rows])
+                    count += len(rows)
+                # Journal des soldes : écarts des agents existants, puis solde initial des nouveaux (identifiants > dernier_id)
+                horodatage = _horodatage()
+                dernier_id = cursor.execute("SELECT IFNULL(MAX(id), 0) FROM agents").fetchone()[0]
+                cursor.execute("""INSERT INTO mouvements_solde (agent_id, date_mouvement, delta, motif)
+                                  SELECT a.id, ?, i.solde - a.solde, 'Import d''agents' FROM temp.import_agents i JOIN agents a ON a.ppr = i.ppr
+                                  WHERE i.solde IS NOT a.solde""", (horodatage,))
+                # WHERE true : lève l'ambiguïté entre ON CONFLICT et une jointure (documentation SQLite sur UPSERT)
+                cursor.execute("""INSERT INTO agents (nom, prenom, ppr, grade, solde, nom_recherche, prenom_recherche, ppr_recherche)
+                                  SELECT nom, prenom, ppr, grade, solde, nom_recherche, prenom_recherche, ppr_recherche FROM temp.import_agents WHERE true
+                                  ON CONFLICT(ppr) DO UPDATE SET nom = excluded.nom, prenom = excluded.prenom,
+                                                                 grade = excluded.grade, solde = excluded.solde,
+                                                                 nom_recherche = excluded.nom_recherche, prenom_recherche = excluded.prenom_recherche
+                                  WHERE (agents.nom, agents.prenom, agents.grade, agents.solde, agents.nom_recherche, agents.prenom_recherche)
+                                        IS NOT (excluded.nom, excluded.prenom, excluded.grade, excluded.solde,
+                                                excluded.nom_recherche, excluded.prenom_recherche)""")
+                cursor.execute("""INSERT INTO mouvements_solde (agent_id, date_mouvement, delta, motif)
+                                  SELECT id, ?, solde, 'Solde initial' FROM agents WHERE id > ? AND solde != 0""", (horodatage, dernier_id))
+                cursor.execute("DELETE FROM temp.import_agents")
+            return count
+        finally:
+            self._invalidate_agent_caches()
 
     def supprimer_agent(self, agent_id):
-        self.execute_query("DELETE FROM agents WHERE id=?", (agent_id,)); return True
+        """Supprime l'agent et ses congés. Son journal des soldes est conservé, clos par un mouvement qui ramène le solde à zéro."""
+        try:
+            with self.transaction() as cursor:
+                agent = cursor.execute("SELECT solde FROM agents WHERE id=?", (agent_id,)).fetchone()
+                if agent: self._journaliser_soldes_no_commit(cursor, [(agent_id, -agent[0], None)], "Suppression de l'agent")
+                cursor.execute("DELETE FROM agents WHERE id=?", (agent_id,))
+        finally: self._invalidate_agent_caches()
+        self.intervals.invalidate(agent_id); return True
+
+    def get_stats_conges(self, statut='Actif'):
+        """Répartition par type des congés d'un statut : [(type_conge, nombre, jours)], lue dans stats_conges."""
+        return self.execute_query("""SELECT type_conge, SUM(nombre), SUM(jours) FROM stats_conges WHERE statut = ?
+                                     GROUP BY type_conge ORDER BY SUM(nombre) DESC""", (statut,), fetch="all")
+
+    def get_stats_par_annee(self, statut='Actif'):
+        """Totaux par année et par type : [(annee, type_conge, nombre, jours)]."""
+        return self.execute_query("SELECT annee, type_conge, nombre, jours FROM stats_conges WHERE statut = ? ORDER BY annee DESC, type_conge",
+                                  (statut,), fetch="all")
+
+    def rebuild_stats(self):
+        """
+        Recalcule stats_conges depuis la table conges (contrôle de cohérence).
+        Retourne la liste des écarts constatés : [(type_conge, statut, annee, (nombre, jours) avant, (nombre, jours) après)].
+        """
+        recompute = """SELECT type_conge, statut, CAST(substr(date_debut, 1, 4) AS INTEGER), COUNT(*), SUM(jours_pris)
+                       FROM conges GROUP BY 1, 2, 3"""
+        with self.transaction() as cursor:
+            before = {r[:3]: r[3:] for r in cursor.execute("SELECT type_conge, statut, annee, nombre, jours FROM stats_conges")}
+            after = {r[:3]: r[3:] for r in cursor.execute(recompute)}
+            cursor.execute("DELETE FROM stats_conges")
+            cursor.execute(f"INSERT INTO stats_conges (type_conge, statut, annee, nombre, jours) {recompute}")
+        ecarts = [(*k, before.get(k), after.get(k)) for k in sorted(before.keys() | after.keys(), key=str) if before.get(k) != after.get(k)]
+        if ecarts: logging.warning(f"Statistiques des congés incohérentes, reconstruites : {ecarts}")
+        return ecarts
+
+    def _preparer_regles_report(self, cursor, regles, defaut):
+        """
+        Charge les règles de report par grade dans une table temporaire et retourne la requête
+        (id, ppr, nom, prenom, grade, solde, nouveau_solde) sur tous les agents, avec ses paramètres.
+        Nouveau solde : min(plafond_solde, min(solde, plafond_report) + acquisition) ; les grades absents
+        de `regles` suivent `defaut`. Un solde négatif est reporté tel quel.
+        """
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS regles_report (grade TEXT PRIMARY KEY, acquisition REAL, plafond_report REAL, plafond_solde REAL)")
+        cursor.execute("DELETE FROM temp.regles_report")
+        cursor.executemany("INSERT INTO temp.regles_report VALUES (?, ?, ?, ?)",
+                           [(grade, r['acquisition'], r['plafond_report'], r['plafond_solde']) for grade, r in regles.items()])
+        query = """SELECT a.id, a.ppr, a.nom, a.prenom, a.grade, a.solde,
+                          MIN(COALESCE(r.plafond_solde, ?), MIN(a.solde, COALESCE(r.plafond_report, ?)) + COALESCE(r.acquisition, ?)) AS nouveau_solde
+                   FROM agents a LEFT JOIN temp.regles_report r ON r.grade = a.grade"""
+        return query, (defaut['plafond_solde'], defaut['plafond_report'], defaut['acquisition'])
+
+    def calculer_report_annuel(self, regles, defaut):
+        """Simulation du report annuel, sans écriture : [(id, ppr, nom, prenom, grade, solde, nouveau_solde)] des soldes modifiés."""
+        with self.transaction() as cursor: # Seule la table temporaire des règles est écrite
+            query, params = self._preparer_regles_report(cursor, regles, defaut)
+            return cursor.execute(f"SELECT * FROM ({query}) WHERE solde IS NOT nouveau_solde ORDER BY {self.AGENT_SORT_KEY}", params).fetchall()
+
+    def get_report_annuel(self, annee):
+        """(annee, date_execution, agents, regles JSON) si le report de l'année a déjà été appliqué, sinon None."""
+        return self.execute_query("SELECT annee, date_execution, agents, regles FROM reports_annuels WHERE annee = ?", (annee,), fetch="one")
+
+    def appliquer_report_annuel(self, annee, regles, defaut, force=False):
+        """
+        Applique le report annuel à tous les agents en une seule instruction UPDATE ... FROM, et l'enregistre
+        dans reports_annuels. Lève sqlite3.IntegrityError si l'année a déjà été reportée (sauf si force=True).
+        Retourne le nombre d'agents dont le solde a changé.
+        """
+        with self.transaction() as cursor:
+            query, params = self._preparer_regles_report(cursor, regles, defaut)
+            cursor.execute(f"""INSERT INTO mouvements_solde (agent_id, date_mouvement, delta, motif)
+                               SELECT id, ?, nouveau_solde - solde, ? FROM ({query}) WHERE solde IS NOT nouveau_solde""",
+                           (_horodatage(), f"Report annuel {annee}", *params))
+            cursor.execute(f"""UPDATE agents SET solde = n.nouveau_solde FROM ({query}) AS n
+                               WHERE agents.id = n.id AND agents.solde IS NOT n.nouveau_solde""", params)
+            count = cursor.rowcount
+            cursor.execute(f"INSERT {'OR REPLACE ' if force else ''}INTO reports_annuels (annee, date_execution, agents, regles) VALUES (?, ?, ?, ?)",
+                           (annee, datetime.now().isoformat(timespec='seconds'), count, json.dumps({'defaut': defaut, 'grades': regles}, ensure_ascii=False)))
+            self._snapshot_soldes_no_commit(cursor) # Instantané de fin d'exercice
+        return count
+
+    # --- Journal et instantanés des soldes ---
+    def _snapshot_soldes_no_commit(self, cursor):
+        """Instantané des agents dont le solde a bougé depuis le précédent (tous les agents lors du premier). Retourne leur nombre."""
+        dernier = cursor.execute("SELECT IFNULL(MAX(mouvement_id), 0) FROM snapshots_solde").fetchone()[0]
+        cursor.execute("""INSERT OR REPLACE INTO snapshots_solde (agent_id, date_snapshot, solde, mouvement_id)
+                          SELECT a.id, ?, a.solde, (SELECT IFNULL(MAX(id), 0) FROM mouvements_solde) FROM agents a
+                          WHERE a.id IN (SELECT agent_id FROM mouvements_solde WHERE id > ?)
+                             OR NOT EXISTS (SELECT 1 FROM snapshots_solde s WHERE s.agent_id = a.id)""", (_horodatage(), dernier))
+        return cursor.rowcount
+
+    def snapshot_soldes(self, intervalle_jours=None):
+        """
+        Enregistre un instantané des soldes. Avec `intervalle_jours`, ne fait rien si le dernier instantané
+        est plus récent. Retourne le nombre d'agents enregistrés.
+        """
+        with self.transaction() as cursor:
+            if intervalle_jours is not None:
+                dernier = cursor.execute("SELECT MAX(date_snapshot) FROM snapshots_solde").fetchone()[0]
+                if dernier and dernier > (datetime.now() - timedelta(days=intervalle_jours)).strftime('%Y-%m-%d %H:%M:%S'):
+                    return 0
+            return self._snapshot_soldes_no_commit(cursor)
+
+    def get_soldes_a_date(self, date, agent_id=None):
+        """
+        Soldes en fin de journée `date` : {agent_id: solde}. Dernier instantané antérieur, plus les mouvements
+        du journal qui le suivent ; les agents sans instantané ni mouvement à cette date sont absents.
+        """
+        fin = (date + timedelta(days=1)).strftime('%Y-%m-%d')
+        q = """SELECT a.id, IFNULL(s.solde, 0) + IFNULL((SELECT SUM(m.delta) FROM mouvements_solde m
+                                                        WHERE m.agent_id = a.id AND m.id > IFNULL(s.mouvement_id, 0) AND m.date_mouvement < ?), 0)
+               FROM agents a
+               LEFT JOIN snapshots_solde s ON s.agent_id = a.id
+                    AND s.date_snapshot = (SELECT MAX(date_snapshot) FROM snapshots_solde WHERE agent_id = a.id AND date_snapshot < ?)
+               WHERE (s.agent_id IS NOT NULL OR EXISTS (SELECT 1 FROM mouvements_solde m WHERE m.agent_id = a.id AND m.date_mouvement < ?))"""
+        p = [fin, fin, fin]
+        if agent_id is not None: q += " AND a.id = ?"; p.append(agent_id)
+        return dict(self.execute_query(q, tuple(p), fetch="all"))
+
+    def get_solde_a_date(self, agent_id, date):
+        """Solde d'un agent en fin de journée `date`, ou None s'il n'est pas connu à cette date."""
+        return self.get_soldes_a_date(date, agent_id).get(agent_id)
+
+    def get_mouvements_solde(self, agent_id, debut=None, fin=None):
+        """Mouvements de solde d'un agent, du plus ancien au plus récent : [(date_mouvement, delta, motif, conge_id)]."""
+        q, p = "SELECT date_mouvement, delta, motif, conge_id FROM mouvements_solde WHERE agent_id = ?", [agent_id]
+        if debut: q += " AND date_mouvement >= ?"; p.append(debut.strftime('%Y-%m-%d'))
+        if fin: q += " AND date_mouvement < ?"; p.append((fin + timedelta(days=1)).strftime('%Y-%m-%d'))
+        return self.execute_query(q + " ORDER BY id", tuple(p), fetch="all")
+
+    def verifier_soldes(self, corriger=False):
+        """
+        Compare agents.solde au solde reconstitué par le journal : premier instantané de l'agent (ou zéro),
+        plus tous les mouvements qui le suivent. Avec `corriger`, aligne agents.solde sur le journal.
+        Retourne les écarts : [(agent_id, ppr, nom, prenom, solde, solde du journal)].
+        """
+        q = """SELECT a.id, a.ppr, a.nom, a.prenom, a.solde,
+                      IFNULL(s.solde, 0) + IFNULL((SELECT SUM(m.delta) FROM mouvements_solde m
+                                                   WHERE m.agent_id = a.id AND m.id > IFNULL(s.mouvement_id, 0)), 0)
+               FROM agents a
+               LEFT JOIN snapshots_solde s ON s.agent_id = a.id
+                    AND s.date_snapshot = (SELECT MIN(date_snapshot) FROM snapshots_solde WHERE agent_id = a.id)
+               ORDER BY a.nom, a.prenom, a.id"""
+        with self.transaction() as cursor:
+            # Tolérance : sommes de REAL arrondies différemment selon l'ordre des opérations
+            ecarts = [r for r in cursor.execute(q).fetchall() if abs(r[4] - r[5]) > 1e-6]
+            if corriger and ecarts:
+                # Le journal fait foi : aucun mouvement n'est ajouté, agents.solde rejoint simplement sa somme
+                cursor.executemany("UPDATE agents SET solde = ? WHERE id = ?", [(round(r[5], 6), r[0]) for r in ecarts])
+        if ecarts: logging.warning(f"{len(ecarts)} solde(s) différent(s) du journal des soldes{' : corrigé(s)' if corriger else ''}.")
+        if corriger and ecarts: self._invalidate_agent_caches()
+        return ecarts
 
     def get_holidays_for_year(self, year):
-        return self.execute_query("SELECT date, nom, type FROM jours_feries_personnalises WHERE strftime('%Y', date) = ? ORDER BY date", (str(year),), fetch="all")
+        # Intervalle [1er janvier, 1er janvier suivant[ : exploitable par l'index de la clé primaire
+        year = int(year)
+        return self.execute_query("SELECT date, nom, type FROM jours_feries_personnalises WHERE date >= ? AND date < ? ORDER BY date",
+                                  (f"{year:04d}-01-01", f"{year + 1:04d}-01-01"), fetch="all")
         
+    def add_holiday(self, date_sql, nom, type_jour):
+        try: self.execute_query("INSERT INTO jours_feries_personnalises (date, nom, type) VALUES (?, ?, ?)", (date_sql, nom, type_jour)); return True
+        except sqlite3.IntegrityError: return False
+
+    def delete_holiday(self, date_sql):
+        self.execute_query("DELETE FROM jours_feries_personnalises WHERE date = ?", (date_sql,)); return True
+
+    def sync_official_holidays(self, country, holidays_by_year, force=False):
+        """
+        Enregistre les jours fériés officiels {année: {date: nom}} en une seule transaction.
+        Les années dont l'empreinte est déjà enregistrée sont ignorées (sauf si force=True),
+        ce qui rend la consultation des années déjà synchronisées purement en lecture.
+        Retourne la liste des années écrites.
+        """
+        fingerprints = {year: hashlib.sha1("\n".join(f"{d.isoformat()}|{n}" for d, n in sorted(days.items())).encode('utf-8')).hexdigest()
+                        for year, days in holidays_by_year.items()}
+        if not force:
+            marks = ",".join("?" * len(fingerprints))
+            known = dict(self.execute_query(f"SELECT annee, empreinte FROM jours_feries_sync WHERE pays = ? AND annee IN ({marks})",
+                                            (country, *fingerprints), fetch="all"))
+            fingerprints = {y: f for y, f in fingerprints.items() if known.get(y) != f}
+        if not fingerprints: return []
+        rows = [(d.isoformat(), n) for y in fingerprints for d, n in holidays_by_year[y].items()]
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.transaction() as cursor:
+            # Un jour personnalisé à la même date n'est jamais écrasé
+            cursor.executemany("""INSERT INTO jours_feries_personnalises (date, nom, type) VALUES (?, ?, 'Automatique')
+                                  ON CONFLICT(date) DO UPDATE SET nom = excluded.nom WHERE type = 'Automatique'""", rows)
+            cursor.executemany("INSERT OR REPLACE INTO jours_feries_sync (annee, pays, empreinte, date_sync) VALUES (?, ?, ?, ?)",
+                               [(y, country, f, now) for y, f in fingerprints.items()])
+        return sorted(fingerprints)
+
     def get_certificat_for_conge(self, conge_id):
         return self.execute_query("SELECT * FROM certificats_medicaux WHERE conge_id = ?", (conge_id,), fetch="one")
 
     def get_overlapping_leaves(self, agent_id, start_date, end_date, conge_id_exclu=None):
-        q = "SELECT * FROM conges WHERE agent_id=? AND date_fin >= ? AND date_debut <= ? AND statut = 'Actif'"
-        p = [agent_id, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
-        if conge_id_exclu: q += " AND id != ?"; p.append(conge_id_exclu)
-        return [Conge.from_db_row(r) for r in self.execute_query(q, tuple(p), fetch="all") if r]
+        """Congés actifs de l'agent qui chevauchent [start_date, end_date], servis par l'index en mémoire."""
+        self._verifier_ecritures_externes()
+        return self.intervals.overlapping(agent_id, start_date, end_date, exclude_id=conge_id_exclu or None)
+
+    def precharger_conges_actifs(self, agent_ids=None):
+        """
+        Charge en une requête l'index d'intervalles de tous les agents, ou des agents `agent_ids`
+        (contrôles de chevauchement en masse).
+        """
+        self._verifier_ecritures_externes()
+        self.intervals.warm(agent_ids)
+
+    def _charger_conges_actifs(self, agent_id=None):
+        """Source de l'index d'intervalles : congés actifs d'un agent, d'une liste d'agents, ou de tous les agents."""
+        q, p = "SELECT id, agent_id, type_conge, justif, interim_id, date_debut, date_fin, jours_pris, statut FROM conges WHERE statut = 'Actif'", ()
+        if isinstance(agent_id, list):
+            # Un seul paramètre JSON : pas de limite sur le nombre d'identifiants
+            q += " AND agent_id IN (SELECT value FROM json_each(?))"; p = (json.dumps(agent_id),)
+        elif agent_id is not None: q += " AND agent_id = ?"; p = (agent_id,)
+        return self.fetch_models(Conge, q, p)
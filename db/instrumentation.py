@@ -0,0 +1,190 @@
+# db/instrumentation.py
+"""
+Mesure des requêtes SQL : nombre d'exécutions, temps total, p50 et p99 par requête normalisée.
+
+Les connexions ouvertes par ConnectionManager utilisent InstrumentedConnection quand
+`db.instrumentation.actif` est vrai (config.yaml). Le temps d'une requête couvre son
+exécution et la lecture de ses lignes (fetch* ou itération). Une requête plus lente que
+`seuil_lent_ms` est écrite dans le journal `sql.lentes` avec son EXPLAIN QUERY PLAN
+(relevé une fois par requête normalisée).
+"""
+import logging
+import random
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+from time import perf_counter
+
+slow_log = logging.getLogger("sql.lentes")
+
+_LITTERAUX = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTE_IN = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)+\s*\)", re.IGNORECASE)
+_ESPACES = re.compile(r"\s+")
+_EXPLICABLES = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+@lru_cache(maxsize=1024)
+def normaliser_sql(sql):
+    """Forme canonique d'une requête : littéraux remplacés par ?, listes IN (?, ?, ...) réduites, espaces compactés."""
+    sql = _LITTERAUX.sub("?", sql)
+    sql = _LISTE_IN.sub("IN (?, ...)", sql)
+    return _ESPACES.sub(" ", sql).strip()
+
+
+class _Mesures:
+    """Mesures d'une requête normalisée. Percentiles calculés sur un échantillon borné (réservoir)."""
+    TAILLE_ECHANTILLON = 4096
+    __slots__ = ("count", "total", "echantillon")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.echantillon = []
+
+    def ajouter(self, duree):
+        self.count += 1
+        self.total += duree
+        if len(self.echantillon) < self.TAILLE_ECHANTILLON:
+            self.echantillon.append(duree)
+        else:
+            i = random.randrange(self.count)
+            if i < self.TAILLE_ECHANTILLON: self.echantillon[i] = duree
+
+    def percentile(self, p):
+        valeurs = sorted(self.echantillon)
+        return valeurs[min(len(valeurs) - 1, int(p * len(valeurs)))] if valeurs else 0.0
+
+
+class QueryStats:
+    """Statistiques partagées par toutes les connexions d'un ConnectionManager (tous threads)."""
+    def __init__(self, seuil_lent_ms=100):
+        self.seuil_lent = seuil_lent_ms / 1000
+        self._mesures = {}
+        self._plans = set()    # Requêtes dont le plan a déjà été journalisé
+        self._lock = threading.Lock()
+
+    def enregistrer(self, conn, sql, params, duree):
+        cle = normaliser_sql(sql)
+        with self._lock:
+            mesures = self._mesures.get(cle)
+            if mesures is None: mesures = self._mesures[cle] = _Mesures()
+            mesures.ajouter(duree)
+            lente = duree >= self.seuil_lent
+            nouveau_plan = lente and cle not in self._plans
+            if nouveau_plan: self._plans.add(cle)
+        if lente:
+            plan = self._plan(conn, sql, params) if nouveau_plan else None
+            slow_log.warning(f"Requête lente ({duree * 1000:.1f} ms) : {cle}" + (f"\n{plan}" if plan else ""))
+
+    @staticmethod
+    def _plan(conn, sql, params):
+        if not sql.lstrip().upper().startswith(_EXPLICABLES) or params is None: return None
+        try:
+            cursor = sqlite3.Cursor(conn) # Curseur non instrumenté
+            rows = cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            cursor.close()
+        except sqlite3.Error as e:
+            return f"  (plan indisponible : {e})"
+        # Colonnes (id, parent, notused, detail) : indentation selon la profondeur dans l'arbre du plan
+        parents, lignes = {r[0]: r[1] for r in rows}, []
+        for id_, parent, _, detail in rows:
+            profondeur = 0
+            while parent in parents: profondeur += 1; parent = parents[parent]
+            lignes.append(f"  {'  ' * profondeur}{detail}")
+        return "\n".join(lignes)
+
+    def lignes(self):
+        """[(requête normalisée, nombre, total ms, p50 ms, p99 ms)], par temps total décroissant."""
+        with self._lock:
+            lignes = [(cle, m.count, m.total * 1000, m.percentile(0.5) * 1000, m.percentile(0.99) * 1000)
+                      for cle, m in self._mesures.items()]
+        return sorted(lignes, key=lambda l: l[2], reverse=True)
+
+    def rapport(self, limite=None):
+        """Tableau texte des statistiques, prêt à journaliser ou afficher."""
+        lignes = self.lignes()[:limite]
+        entete = f"{'Nombre':>8} {'Total ms':>10} {'p50 ms':>8} {'p99 ms':>8}  Requête"
+        return "\n".join([entete] + [f"{n:>8} {total:>10.1f} {p50:>8.2f} {p99:>8.2f}  {cle}" for cle, n, total, p50, p99 in lignes])
+
+    def reinitialiser(self):
+        with self._lock:
+            self._mesures.clear(); self._plans.clear()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Curseur qui chronomètre chaque requête, de l'exécution à la dernière ligne lue."""
+    _en_cours = None   # [sql, params, durée cumulée] de la requête dont il reste des lignes à lire
+
+    def _terminer(self):
+        en_cours, self._en_cours = self._en_cours, None
+        if en_cours: self.connection.stats.enregistrer(self.connection, *en_cours)
+
+    def _chronometrer(self, methode, sql, params, plan_params):
+        self._terminer()
+        debut = perf_counter()
+        try:
+            methode(sql, params)
+        except BaseException:
+            self.connection.stats.enregistrer(self.connection, sql, None, perf_counter() - debut); raise
+        self._en_cours = [sql, plan_params, perf_counter() - debut]
+        if self.description is None: self._terminer() # Pas de lignes à lire
+        return self
+
+    def execute(self, sql, params=()):
+        return self._chronometrer(super().execute, sql, params, params)
+
+    def executemany(self, sql, seq_of_params):
+        # Le plan est relevé avec le premier jeu de paramètres, quand la séquence est indexable
+        plan_params = seq_of_params[0] if isinstance(seq_of_params, (list, tuple)) and seq_of_params else None
+        return self._chronometrer(super().executemany, sql, seq_of_params, plan_params)
+
+    def _lire(self, methode, *args):
+        debut = perf_counter()
+        resultat = methode(*args)
+        if self._en_cours: self._en_cours[2] += perf_counter() - debut
+        return resultat
+
+    def fetchone(self):
+        row = self._lire(super().fetchone)
+        if row is None: self._terminer()
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._lire(super().fetchmany, self.arraysize if size is None else size)
+        if not rows: self._terminer()
+        return rows
+
+    def fetchall(self):
+        rows = self._lire(super().fetchall)
+        self._terminer()
+        return rows
+
+    def __next__(self):
+        try:
+            return self._lire(super().__next__)
+        except StopIteration:
+            self._terminer(); raise
+
+    def close(self):
+        self._terminer()
+        super().close()
+
+    def __del__(self):
+        if self._en_cours:
+            try: self._terminer()
+            except Exception: pass
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connexion dont tous les curseurs (y compris ceux de execute/executemany) sont instrumentés."""
+    stats = None   # QueryStats, affecté par ConnectionManager
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
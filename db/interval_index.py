@@ -0,0 +1,127 @@
+# db/interval_index.py
+"""
+Index d'intervalles en mémoire des congés actifs, par agent.
+
+Pour chaque agent, les congés actifs sont conservés triés par date de début
+(en ordinaux de jours), avec le maximum cumulé de leurs dates de fin. La recherche
+des congés qui intersectent [d1, d2] se fait par deux recherches dichotomiques :
+O(log n + k) quand les congés de l'agent ne se chevauchent pas (cas garanti par la
+validation). Sinon, s'y ajoutent les congés inclus dans un congé plus long commencé avant d1.
+Ajout et suppression sont en O(n) pour l'agent (insertion dans une liste triée).
+L'index est construit paresseusement depuis la table `conges` et maintenu
+par les chemins d'ajout/modification/suppression de `DatabaseManager`, qui
+l'invalide quand une autre connexion a écrit dans la base (PRAGMA data_version).
+"""
+from bisect import bisect_left, bisect_right
+
+
+def _ordinal(d):
+    return d.toordinal()
+
+
+class _AgentIntervals:
+    """Congés actifs d'un agent, triés par (début, id)."""
+    __slots__ = ("keys", "entries", "max_ends")
+
+    def __init__(self):
+        self.keys = []      # (debut_ordinal, conge_id)
+        self.entries = []   # (fin_ordinal, conge)
+        self.max_ends = []  # max_ends[i] : plus grande fin parmi entries[0..i] (croissant)
+
+    def _recalculer_fins(self, i):
+        # Maximum cumulé des fins, à recalculer à partir de la position modifiée
+        del self.max_ends[i:]
+        courant = self.max_ends[-1] if self.max_ends else float("-inf")
+        for end, _ in self.entries[i:]:
+            courant = max(courant, end)
+            self.max_ends.append(courant)
+
+    def add(self, conge):
+        start, end = _ordinal(conge.date_debut), _ordinal(conge.date_fin)
+        key = (start, conge.id)
+        i = bisect_left(self.keys, key)
+        self.keys.insert(i, key)
+        self.entries.insert(i, (end, conge))
+        self._recalculer_fins(i)
+        return key
+
+    def remove(self, key):
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            del self.keys[i]
+            del self.entries[i]
+            self._recalculer_fins(i)
+
+    def overlapping(self, d1, d2):
+        # Un congé [s, e] intersecte [d1, d2] si s <= d2 et e >= d1. Aucun congé placé avant le premier
+        # indice où le maximum cumulé des fins atteint d1 ne peut finir après d1 : la recherche commence là.
+        lo = bisect_left(self.max_ends, d1)
+        hi = bisect_right(self.keys, (d2, float("inf")))
+        return [conge for end, conge in self.entries[lo:hi] if end >= d1]
+
+
+class LeaveIntervalIndex:
+    """
+    Index des congés actifs de tous les agents.
+    `loader(agent_id)` retourne les congés actifs d'un agent, d'une liste d'agents, ou de tous si agent_id est None.
+    """
+    def __init__(self, loader):
+        self._loader = loader
+        self._agents = {}   # agent_id -> _AgentIntervals
+        self._by_id = {}    # conge_id -> (agent_id, clé)
+
+    def _get(self, agent_id):
+        intervals = self._agents.get(agent_id)
+        if intervals is None:
+            intervals = self._agents[agent_id] = _AgentIntervals()
+            for conge in self._loader(agent_id):
+                self._by_id[conge.id] = (agent_id, intervals.add(conge))
+        return intervals
+
+    def warm(self, agent_ids=None):
+        """
+        Charge en une seule requête les congés actifs de tous les agents, ou seulement
+        ceux des agents `agent_ids` pas encore chargés (opérations en masse).
+        """
+        if agent_ids is None:
+            self.invalidate()
+        else:
+            agent_ids = [a for a in dict.fromkeys(agent_ids) if a not in self._agents]
+            if not agent_ids: return
+            for agent_id in agent_ids: self._agents[agent_id] = _AgentIntervals() # Agents sans congé compris
+        for conge in self._loader(agent_ids):
+            intervals = self._agents.get(conge.agent_id)
+            if intervals is None:
+                intervals = self._agents[conge.agent_id] = _AgentIntervals()
+            self._by_id[conge.id] = (conge.agent_id, intervals.add(conge))
+
+    def overlapping(self, agent_id, start_date, end_date, exclude_id=None):
+        """Congés actifs de l'agent qui intersectent [start_date, end_date], triés par date de début."""
+        found = self._get(agent_id).overlapping(_ordinal(start_date), _ordinal(end_date))
+        if exclude_id is not None:
+            found = [c for c in found if c.id != exclude_id]
+        return found
+
+    def add(self, conge):
+        """Enregistre un congé actif. Ignoré si l'agent n'est pas encore chargé (il le sera depuis la base)."""
+        intervals = self._agents.get(conge.agent_id)
+        if intervals is None or conge.statut != 'Actif' or conge.id in self._by_id:
+            return
+        self._by_id[conge.id] = (conge.agent_id, intervals.add(conge))
+
+    def remove(self, conge_id):
+        entry = self._by_id.pop(conge_id, None)
+        if entry:
+            agent_id, key = entry
+            self._agents[agent_id].remove(key)
+
+    def invalidate(self, agent_id=None):
+        """Oublie un agent (ou tout l'index) : il sera reconstruit à la prochaine interrogation."""
+        if agent_id is None:
+            self._agents.clear()
+            self._by_id.clear()
+            return
+        intervals = self._agents.pop(agent_id, None)
+        if intervals:
+            for _, conge_id in intervals.keys:
+                self._by_id.pop(conge_id, None)
@@ -0,0 +1,163 @@
+# db/migrations.py
+"""
+Migrations de schéma versionnées.
+
+La version courante du schéma est stockée dans `PRAGMA user_version`.
+Chaque migration est appliquée une seule fois, dans sa propre transaction,
+ce qui permet de mettre à niveau un fichier `conges_v3.db` existant sur place.
+"""
+import logging
+import sqlite3
+
+from utils.text_utils import valeurs_recherche
+
+def _colonnes_recherche_agents(cursor):
+    """
+    Noms, prénoms et PPR normalisés dans de vraies colonnes de agents, écrites par DatabaseManager, et index plein
+    texte (trigrammes) à contenu externe sur ces colonnes. Les triggers de synchronisation ne recopient que des
+    valeurs de colonnes : une écriture sur agents depuis une autre connexion (shell sqlite3, script) reste possible.
+    """
+    for colonne in ("nom_recherche", "prenom_recherche", "ppr_recherche"):
+        cursor.execute(f"ALTER TABLE agents ADD COLUMN {colonne} TEXT NOT NULL DEFAULT ''")
+    rows = cursor.execute("SELECT id, nom, prenom, ppr FROM agents").fetchall()
+    cursor.executemany("UPDATE agents SET nom_recherche = ?, prenom_recherche = ?, ppr_recherche = ? WHERE id = ?",
+                       [(*valeurs_recherche(nom, prenom, ppr), agent_id) for agent_id, nom, prenom, ppr in rows])
+    try:
+        cursor.execute("""CREATE VIRTUAL TABLE agents_fts USING fts5(nom_recherche, prenom_recherche, ppr_recherche,
+                          content='agents', content_rowid='id', tokenize='trigram')""")
+    except sqlite3.OperationalError as e:
+        logging.warning(f"FTS5 (trigram) indisponible, la recherche d'agents utilisera LIKE : {e}")
+        return
+    cursor.execute("""CREATE TRIGGER trg_agents_fts_ai AFTER INSERT ON agents BEGIN
+                          INSERT INTO agents_fts (rowid, nom_recherche, prenom_recherche, ppr_recherche)
+                          VALUES (new.id, new.nom_recherche, new.prenom_recherche, new.ppr_recherche);
+                      END""")
+    cursor.execute("""CREATE TRIGGER trg_agents_fts_ad AFTER DELETE ON agents BEGIN
+                          INSERT INTO agents_fts (agents_fts, rowid, nom_recherche, prenom_recherche, ppr_recherche)
+                          VALUES ('delete', old.id, old.nom_recherche, old.prenom_recherche, old.ppr_recherche);
+                      END""")
+    cursor.execute("""CREATE TRIGGER trg_agents_fts_au AFTER UPDATE OF nom_recherche, prenom_recherche, ppr_recherche ON agents BEGIN
+                          INSERT INTO agents_fts (agents_fts, rowid, nom_recherche, prenom_recherche, ppr_recherche)
+                          VALUES ('delete', old.id, old.nom_recherche, old.prenom_recherche, old.ppr_recherche);
+                          INSERT INTO agents_fts (rowid, nom_recherche, prenom_recherche, ppr_recherche)
+                          VALUES (new.id, new.nom_recherche, new.prenom_recherche, new.ppr_recherche);
+                      END""")
+    cursor.execute("INSERT INTO agents_fts (agents_fts) VALUES ('rebuild')")
+
+# Chaque entrée : (version, description, liste d'instructions SQL ou de fonctions cursor -> None)
+MIGRATIONS = [
+    (1, "Index composites pour les requêtes fréquentes", [
+        # get_overlapping_leaves, recherche du parent dans revoke_split_on_delete, congés actifs d'un agent
+        "CREATE INDEX IF NOT EXISTS idx_conges_agent_statut_dates ON conges(agent_id, statut, date_debut, date_fin)",
+        # get_conges(agent_id=...) trié par date de début
+        "CREATE INDEX IF NOT EXISTS idx_conges_agent_debut ON conges(agent_id, date_debut)",
+        # get_conges() global trié par date de début
+        "CREATE INDEX IF NOT EXISTS idx_conges_debut ON conges(date_debut)",
+        # ON DELETE SET NULL sur interim_id lors de la suppression d'un agent
+        "CREATE INDEX IF NOT EXISTS idx_conges_interim ON conges(interim_id)",
+        # Liste des agents triée par nom, prénom
+        "CREATE INDEX IF NOT EXISTS idx_agents_nom_prenom ON agents(nom, prenom)",
+    ]),
+    (2, "Dates des congés normalisées au format ISO (YYYY-MM-DD)", [
+        # Les anciennes versions enregistraient des datetime ('YYYY-MM-DD HH:MM:SS'),
+        # ce qui fausse les comparaisons de chaînes utilisées par les index.
+        "UPDATE conges SET date_debut = substr(date_debut, 1, 10) WHERE length(date_debut) > 10",
+        "UPDATE conges SET date_fin = substr(date_fin, 1, 10) WHERE length(date_fin) > 10",
+    ]),
+    (3, "Suivi des années de jours fériés officiels déjà synchronisées", [
+        """CREATE TABLE IF NOT EXISTS jours_feries_sync (annee INTEGER NOT NULL, pays TEXT NOT NULL, empreinte TEXT NOT NULL,
+           date_sync TEXT NOT NULL, PRIMARY KEY (annee, pays))""",
+    ]),
+    (4, "Statistiques des congés maintenues par triggers", [
+        """CREATE TABLE IF NOT EXISTS stats_conges (type_conge TEXT NOT NULL, statut TEXT NOT NULL, annee INTEGER NOT NULL,
+           nombre INTEGER NOT NULL, jours INTEGER NOT NULL, PRIMARY KEY (type_conge, statut, annee)) WITHOUT ROWID""",
+        """CREATE TRIGGER IF NOT EXISTS trg_stats_conges_ai AFTER INSERT ON conges BEGIN
+               INSERT INTO stats_conges (type_conge, statut, annee, nombre, jours)
+               VALUES (new.type_conge, new.statut, CAST(substr(new.date_debut, 1, 4) AS INTEGER), 1, new.jours_pris)
+               ON CONFLICT (type_conge, statut, annee) DO UPDATE SET nombre = nombre + 1, jours = jours + excluded.jours;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_stats_conges_ad AFTER DELETE ON conges BEGIN
+               UPDATE stats_conges SET nombre = nombre - 1, jours = jours - old.jours_pris
+               WHERE type_conge = old.type_conge AND statut = old.statut AND annee = CAST(substr(old.date_debut, 1, 4) AS INTEGER);
+               DELETE FROM stats_conges WHERE nombre <= 0;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_stats_conges_au AFTER UPDATE OF type_conge, statut, date_debut, jours_pris ON conges BEGIN
+               UPDATE stats_conges SET nombre = nombre - 1, jours = jours - old.jours_pris
+               WHERE type_conge = old.type_conge AND statut = old.statut AND annee = CAST(substr(old.date_debut, 1, 4) AS INTEGER);
+               DELETE FROM stats_conges WHERE nombre <= 0;
+               INSERT INTO stats_conges (type_conge, statut, annee, nombre, jours)
+               VALUES (new.type_conge, new.statut, CAST(substr(new.date_debut, 1, 4) AS INTEGER), 1, new.jours_pris)
+               ON CONFLICT (type_conge, statut, annee) DO UPDATE SET nombre = nombre + 1, jours = jours + excluded.jours;
+           END""",
+        """INSERT INTO stats_conges (type_conge, statut, annee, nombre, jours)
+           SELECT type_conge, statut, CAST(substr(date_debut, 1, 4) AS INTEGER), COUNT(*), SUM(jours_pris)
+           FROM conges GROUP BY 1, 2, 3""",
+    ]),
+    (5, "Colonnes de recherche normalisées des agents et index plein texte à contenu externe", [
+        _colonnes_recherche_agents,
+    ]),
+    (6, "Index de pagination par clé (nom, prénom, id) des agents", [
+        "DROP INDEX IF EXISTS idx_agents_nom_prenom",
+        "CREATE INDEX IF NOT EXISTS idx_agents_tri ON agents(nom, IFNULL(prenom, ''), id)",
+    ]),
+    (7, "Historique des reports annuels des soldes", [
+        # Une ligne par année clôturée : empêche d'appliquer deux fois l'acquisition annuelle
+        """CREATE TABLE IF NOT EXISTS reports_annuels (annee INTEGER PRIMARY KEY, date_execution TEXT NOT NULL,
+           agents INTEGER NOT NULL, regles TEXT NOT NULL)""",
+    ]),
+    (8, "Journal des mouvements de solde et instantanés périodiques", [
+        # Journal en ajout seul : chaque variation de agents.solde, écrite dans la même transaction. Sans clé étrangère
+        # vers agents : l'historique d'un agent supprimé est conservé (clos par DatabaseManager.supprimer_agent)
+        """CREATE TABLE IF NOT EXISTS mouvements_solde (id INTEGER PRIMARY KEY, agent_id INTEGER NOT NULL, date_mouvement TEXT NOT NULL,
+           delta REAL NOT NULL, motif TEXT NOT NULL, conge_id INTEGER)""",
+        "CREATE INDEX IF NOT EXISTS idx_mouvements_agent ON mouvements_solde(agent_id, id)",
+        """CREATE TRIGGER IF NOT EXISTS trg_mouvements_solde_bu BEFORE UPDATE ON mouvements_solde BEGIN
+               SELECT RAISE(ABORT, 'Le journal des soldes ne peut pas être modifié');
+           END""",
+        # Solde d'un agent à une date : dernier instantané + mouvements d'identifiant supérieur à `mouvement_id`
+        """CREATE TABLE IF NOT EXISTS snapshots_solde (agent_id INTEGER NOT NULL, date_snapshot TEXT NOT NULL, solde REAL NOT NULL,
+           mouvement_id INTEGER NOT NULL, PRIMARY KEY (agent_id, date_snapshot)) WITHOUT ROWID""",
+        "CREATE INDEX IF NOT EXISTS idx_snapshots_date ON snapshots_solde(date_snapshot)",
+        # Point de départ : les soldes actuels, sans historique antérieur
+        "INSERT INTO snapshots_solde (agent_id, date_snapshot, solde, mouvement_id) SELECT id, datetime('now', 'localtime'), solde, 0 FROM agents",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def get_schema_version(conn):
+    """Retourne la version du schéma enregistrée dans le fichier de base de données."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn):
+    """
+    Applique, dans l'ordre, toutes les migrations plus récentes que la version du fichier.
+    Retourne la liste des versions appliquées.
+    """
+    current = get_schema_version(conn)
+    applied = []
+    for version, description, steps in MIGRATIONS:
+        if version <= current:
+            continue
+        logging.info(f"Migration du schéma vers la version {version} : {description}")
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN")
+            for step in steps:
+                if callable(step): step(cursor)
+                else: cursor.execute(step)
+            cursor.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            logging.error(f"Échec de la migration {version}", exc_info=True)
+            raise
+        applied.append(version)
+
+    if applied:
+        # Met à jour les statistiques de l'optimiseur pour que les nouveaux index soient utilisés
+        conn.execute("ANALYZE")
+        conn.commit()
+    return applied
@@ -0,0 +1,103 @@
+# db/read_executor.py
+"""
+Exécution des lectures SQLite hors du thread Tk.
+
+Chaque thread de travail ouvre sa propre connexion en lecture seule
+(DatabaseManager.open_reader). Les résultats sont déposés dans une file que
+le thread Tk relève avec after() : les callbacks ne s'exécutent jamais depuis
+un thread de travail. Les demandes sont regroupées par vue : une demande plus
+récente pour la même vue annule la précédente, ou fait ignorer son résultat
+si elle a déjà commencé.
+"""
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.profiler import PROFILEUR
+
+
+class ReadExecutor:
+    POLL_MS = 20
+
+    def __init__(self, db_manager, widget, workers=2):
+        self.db = db_manager
+        self.widget = widget              # Widget Tk servant à planifier after()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lecture-bd")
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._results = queue.SimpleQueue()
+        self._generations = {}            # vue -> numéro de la dernière demande
+        self._pending = {}                # vue -> Future de la dernière demande
+        self._outstanding = 0
+        self._poll_job = None
+
+    def _reader(self):
+        """Connexion en lecture seule propre au thread courant, ouverte au premier usage."""
+        reader = getattr(self._local, 'db', None)
+        if reader is None:
+            reader = self._local.db = self.db.open_reader()
+            with self._readers_lock: self._readers.append(reader)
+        return reader
+
+    @staticmethod
+    def _nom_profil(action, etape, view):
+        # Rattache les profils de la lecture et de son affichage à l'action de l'interface qui l'a demandée
+        return f"{action}_{etape}_{view}" if action else f"{etape}_{view}"
+
+    def _run(self, view, fn, args, action):
+        # Profilage des actions actif : la lecture et son affichage ont chacun leur profil
+        return PROFILEUR.executer(self._nom_profil(action, "lecture", view), fn, self._reader(), *args)
+
+    def submit(self, view, fn, *args, on_result=None, on_error=None):
+        """
+        Exécute fn(db, *args) sur un thread de lecture et retourne le Future.
+        on_result(résultat) / on_error(exception) sont appelés dans le thread Tk,
+        seulement si aucune demande plus récente n'a été faite pour la même vue.
+        Soumise pendant une action profilée, ses profils portent le numéro et le nom de cette action.
+        """
+        action = PROFILEUR.action_en_cours()
+        gen = self._generations[view] = self._generations.get(view, 0) + 1
+        previous = self._pending.get(view)
+        if previous is not None: previous.cancel() # Sans effet si elle a déjà commencé : son résultat sera ignoré
+        future = self._pending[view] = self._pool.submit(self._run, view, fn, args, action)
+        self._outstanding += 1
+        future.add_done_callback(lambda f: self._results.put((view, gen, f, on_result, on_error, action)))
+        if self._poll_job is None:
+            self._poll_job = self.widget.after(self.POLL_MS, self._poll)
+        return future
+
+    def cancel(self, view):
+        """Rend obsolète toute demande en cours pour la vue."""
+        self._generations[view] = self._generations.get(view, 0) + 1
+        pending = self._pending.pop(view, None)
+        if pending is not None: pending.cancel()
+
+    def _poll(self):
+        self._poll_job = None
+        while True:
+            try: view, gen, future, on_result, on_error, action = self._results.get_nowait()
+            except queue.Empty: break
+            self._outstanding -= 1
+            if future.cancelled() or self._generations.get(view) != gen:
+                continue # Résultat obsolète
+            if self._pending.get(view) is future: del self._pending[view]
+            error = future.exception()
+            if error is None:
+                if on_result: PROFILEUR.executer(self._nom_profil(action, "affichage", view), on_result, future.result())
+            elif on_error:
+                on_error(error)
+            else:
+                logging.error(f"Erreur de lecture en arrière-plan ({view}): {error}", exc_info=error)
+        if self._outstanding > 0:
+            self._poll_job = self.widget.after(self.POLL_MS, self._poll)
+
+    def shutdown(self):
+        """Annule les demandes en attente, attend celles en cours et ferme les connexions de lecture."""
+        if self._poll_job is not None:
+            self.widget.after_cancel(self._poll_job); self._poll_job = None
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        with self._readers_lock:
+            for reader in self._readers: reader.close()
+            self._readers.clear()
@@ -4,6 +4,7 @@ from tkinter import messagebox
 import sys
 import os
 import logging
+import sqlite3
 
 # --- Étape 1 : Définir les chemins de base ---
 # C'est la clé pour que l'application trouve ses fichiers, peu importe d'où elle est lancée.
@@ -66,18 +67,20 @@ if __name__ == "__main__":
     # 6.1. Créer le gestionnaire de base de données
     db_manager = DatabaseManager(DB_PATH_ABS)
     
-    # 6.2. Tenter la connexion à la base de données
-    if not db_manager.connect():
-        # Si la connexion échoue, un message d'erreur est déjà affiché. On arrête.
+    # 6.2. Se connecter et s'assurer que les tables existent
+    try:
+        db_manager.connect()
+        db_manager.create_db_tables()
+        db_manager.snapshot_soldes(CONFIG['conges'].get('snapshot_soldes_jours', 30))
+    except (sqlite3.Error, ValueError) as e:
+        root = tk.Tk(); root.withdraw()
+        messagebox.showerror("Erreur Base de Données", f"Impossible d'ouvrir la base de données :\n{e}")
         sys.exit(1)
-        
-    # 6.3. S'assurer que les tables existent
-    db_manager.create_db_tables()
     
-    # 6.4. Créer le "cerveau" de l'application
+    # 6.3. Créer le "cerveau" de l'application
     conge_manager = CongeManager(db_manager, CERTIFICATS_DIR_ABS)
     
-    # 6.5. Créer et lancer la fenêtre principale
+    # 6.4. Créer et lancer la fenêtre principale
     print(f"--- Lancement de {CONFIG['app']['title']} v{CONFIG['app']['version']} ---")
     app = MainWindow(conge_manager)
     app.mainloop()
\ No newline at end of file
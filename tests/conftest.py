@@ -0,0 +1,53 @@
+# tests/conftest.py
+"""Fixtures communes : configuration de l'application et base SQLite temporaire au schéma courant."""
+import csv
+import os
+import sys
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path: sys.path.insert(0, BASE_DIR)
+
+from utils.config_loader import load_config, CONFIG
+
+
+@pytest.fixture(scope="session", autouse=True)
+def config():
+    load_config(os.path.join(BASE_DIR, "config.yaml"))
+    CONFIG['db'].setdefault('instrumentation', {})['actif'] = False
+    return CONFIG
+
+
+@pytest.fixture
+def db(tmp_path):
+    from db.database import DatabaseManager
+    manager = DatabaseManager(str(tmp_path / "conges.db"))
+    manager.connect()
+    manager.create_db_tables()
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def service(db, tmp_path):
+    from core.conges.service import CongeService
+    return CongeService(db, str(tmp_path / "certificats"))
+
+
+@pytest.fixture
+def agent_id(db):
+    """Agent de PPR 'P1' avec un solde de 22 jours."""
+    db.ajouter_agent("Alaoui", "Fatima", "P1", "PA", 22.0)
+    return db.get_agent_ids_by_ppr()["P1"]
+
+
+def compter(db, table):
+    return db.execute_query(f"SELECT COUNT(*) FROM {table}", fetch="one")[0]
+
+
+def ecrire_csv(chemin, lignes):
+    """Fichier CSV (séparateur ';') à importer ; retourne son chemin."""
+    with open(chemin, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f, delimiter=";").writerows(lignes)
+    return str(chemin)
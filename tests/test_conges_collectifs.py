@@ -0,0 +1,20 @@
+# tests/test_conges_collectifs.py
+
+
+def test_conge_collectif_signale_chaque_identifiant_demande(db, service, agent_id):
+    db.ajouter_agent("Benali", "Omar", "P2", "Professeur", 10.0)
+    autre_id = db.get_agent_ids_by_ppr()["P2"]
+    bilan = service.submit_conge_collectif("Congé exceptionnel", "03/03/2025", "07/03/2025", grade="PA",
+                                           agent_ids=[agent_id, autre_id, 999, agent_id])
+    assert [agent.id for agent, _ in bilan.ajoutes] == [agent_id]
+    assert [(agent.id if agent else None, motif) for agent, motif in bilan.ecartes] == [
+        (autre_id, "ne correspond pas au grade ou à la recherche demandés."),
+        (None, "aucun agent d'identifiant 999.")]
+    assert list(bilan.lignes())[-1] == "Agent introuvable: écarté, aucun agent d'identifiant 999."
+
+
+def test_conge_collectif_ne_charge_que_les_agents_selectionnes(db, service, agent_id):
+    db.ajouter_agent("Benali", "Omar", "P2", "Professeur", 10.0)
+    db.intervals.invalidate()
+    service.submit_conge_collectif("Congé exceptionnel", "03/03/2025", "07/03/2025", agent_ids=[agent_id])
+    assert set(db.intervals._agents) == {agent_id}
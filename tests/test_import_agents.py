@@ -0,0 +1,30 @@
+# tests/test_import_agents.py
+import pytest
+
+from conftest import compter, ecrire_csv
+
+
+def test_import_agents_une_ligne_invalide_n_ecrit_rien(db, service, tmp_path):
+    fichier = ecrire_csv(tmp_path / "agents.csv", [["Nom", "Prénom", "PPR", "Grade", "Solde"],
+                                                   ["Alaoui", "Fatima", "P1", "PA", "22"],
+                                                   ["Benali", "Omar", "P2", "Inconnu", "10"],
+                                                   ["Chraibi", "Sara", "P3", "Professeur", "5,5"]])
+    report = service.import_agents(fichier)
+    assert not report.ok
+    assert report.errors == ["Ligne 3: Grade 'Inconnu' invalide."]
+    assert (report.added, report.updated) == (0, 0)
+    assert compter(db, "agents") == 0
+    assert compter(db, "mouvements_solde") == 0
+
+
+def test_fichier_ferme_si_des_colonnes_manquent(db, tmp_path, monkeypatch):
+    from utils import excel_import
+    fermetures, ouvrir = [], excel_import._open_rows
+    def ouvrir_suivi(filename):
+        rows, close = ouvrir(filename)
+        return rows, lambda: (fermetures.append(filename), close())
+    monkeypatch.setattr(excel_import, "_open_rows", ouvrir_suivi)
+    fichier = ecrire_csv(tmp_path / "agents.csv", [["Nom", "PPR"], ["Alaoui", "P1"]])
+    with pytest.raises(ValueError):
+        excel_import.import_agents_from_file(db, fichier)
+    assert fermetures == [fichier]
@@ -0,0 +1,50 @@
+# tests/test_import_conges.py
+import pytest
+
+from conftest import compter, ecrire_csv
+
+
+def test_import_conges_une_ligne_invalide_n_ecrit_rien(db, service, agent_id, tmp_path):
+    mouvements = compter(db, "mouvements_solde")
+    fichier = ecrire_csv(tmp_path / "conges.csv", [["PPR", "Type", "Début", "Fin"],
+                                                   ["P1", "Congé annuel", "04/03/2024", "08/03/2024"],
+                                                   ["P1", "Congé annuel", "09/03/2024", "10/03/2024"]])  # Samedi et dimanche
+    report = service.import_conges(fichier)
+    assert not report.ok
+    assert len(report.errors) == 1 and report.errors[0].startswith("Ligne 3: aucun jour décompté")
+    assert compter(db, "conges") == 0
+    assert compter(db, "mouvements_solde") == mouvements
+    assert db.get_agent_by_id(agent_id).solde == 22.0
+
+
+def test_import_conges_valide(db, service, agent_id, tmp_path):
+    fichier = ecrire_csv(tmp_path / "conges.csv", [["PPR", "Type", "Début", "Fin"], ["P1", "Congé annuel", "04/03/2024", "08/03/2024"]])
+    report = service.import_conges(fichier)
+    assert report.ok and report.added == 1
+    assert db.get_agent_by_id(agent_id).solde == 17.0
+
+
+def test_chevauchements_verifies_sur_les_seuls_agents_du_fichier(db, service, agent_id, tmp_path):
+    db.ajouter_agent("Benali", "Omar", "P2", "PA", 10.0)
+    existant = ecrire_csv(tmp_path / "existant.csv", [["PPR", "Type", "Début", "Fin"], ["P1", "Congé annuel", "04/03/2024", "08/03/2024"],
+                                                        ["P2", "Congé annuel", "04/03/2024", "08/03/2024"]])
+    assert service.import_conges(existant).ok
+    db.intervals.invalidate()
+    fichier = ecrire_csv(tmp_path / "conges.csv", [["PPR", "Type", "Début", "Fin"], ["P1", "Congé annuel", "06/03/2024", "12/03/2024"]])
+    report = service.import_conges(fichier)
+    assert report.errors == ["Ligne 2: chevauche le congé existant du 04/03/2024 au 08/03/2024 (PPR P1)."]
+    assert set(db.intervals._agents) == {agent_id}
+
+
+def test_fichier_ferme_si_des_colonnes_manquent(db, tmp_path, monkeypatch):
+    from core.conges import importer
+    from utils import excel_import
+    fermetures, ouvrir = [], excel_import._open_rows
+    def ouvrir_suivi(filename):
+        rows, close = ouvrir(filename)
+        return rows, lambda: (fermetures.append(filename), close())
+    monkeypatch.setattr(excel_import, "_open_rows", ouvrir_suivi)
+    fichier = ecrire_csv(tmp_path / "conges.csv", [["PPR", "Type"], ["P1", "Congé annuel"]])
+    with pytest.raises(ValueError):
+        importer.import_conges_from_file(db, fichier)
+    assert fermetures == [fichier]
@@ -0,0 +1,80 @@
+# tests/test_interval_index.py
+import random
+from datetime import date, timedelta
+
+from core.conges.service import CongeService
+from db.database import DatabaseManager
+from db.interval_index import LeaveIntervalIndex
+from db.models import Conge
+
+
+def _conge(conge_id, debut, fin, agent_id=1):
+    return Conge(conge_id, agent_id, "Congé annuel", None, None, f"{debut:%Y-%m-%d}", f"{fin:%Y-%m-%d}", 1)
+
+
+def _index(conges):
+    actifs = list(conges)
+    def charger(agent_id):
+        if agent_id is None: return list(actifs)
+        ids = agent_id if isinstance(agent_id, list) else [agent_id]
+        return [c for c in actifs if c.agent_id in ids]
+    return LeaveIntervalIndex(charger)
+
+
+def _ids(index, debut, fin, agent_id=1, exclude_id=None):
+    return [c.id for c in index.overlapping(agent_id, debut, fin, exclude_id=exclude_id)]
+
+
+def test_conges_imbriques_dans_un_conge_long():
+    # Le congé 1 couvre tout mars : il doit être trouvé après des congés plus courts qui finissent avant d1
+    index = _index([_conge(1, date(2024, 3, 1), date(2024, 3, 31)), _conge(2, date(2024, 3, 4), date(2024, 3, 8)),
+                    _conge(3, date(2024, 3, 11), date(2024, 3, 12)), _conge(4, date(2024, 4, 1), date(2024, 4, 5))])
+    assert _ids(index, date(2024, 3, 20), date(2024, 3, 22)) == [1]
+    assert _ids(index, date(2024, 3, 8), date(2024, 3, 11)) == [1, 2, 3]
+    assert _ids(index, date(2024, 3, 31), date(2024, 4, 1)) == [1, 4]     # Bornes incluses
+    assert _ids(index, date(2024, 2, 1), date(2024, 2, 29)) == []
+    assert _ids(index, date(2024, 3, 8), date(2024, 3, 11), exclude_id=1) == [2, 3]
+    index.remove(1)
+    assert _ids(index, date(2024, 3, 20), date(2024, 3, 22)) == []
+    assert _ids(index, date(2024, 3, 8), date(2024, 3, 11)) == [2, 3]
+
+
+def test_ajouts_et_suppressions_conformes_au_parcours_complet():
+    rng = random.Random(7)
+    origine, conges, index = date(2024, 1, 1), {}, _index([])
+    index.warm([1])
+    for conge_id in range(1, 301):
+        if conges and rng.random() < 0.3:
+            index.remove(conges.pop(rng.choice(sorted(conges))).id)
+        else:
+            debut = origine + timedelta(days=rng.randrange(365))
+            conges[conge_id] = _conge(conge_id, debut, debut + timedelta(days=rng.choice((0, 2, 4, 30, 90))))
+            index.add(conges[conge_id])
+        d1 = origine + timedelta(days=rng.randrange(-10, 375))
+        d2 = d1 + timedelta(days=rng.randrange(15))
+        attendus = sorted((c for c in conges.values() if c.date_debut.date() <= d2 and c.date_fin.date() >= d1),
+                          key=lambda c: (c.date_debut, c.id))
+        assert _ids(index, d1, d2) == [c.id for c in attendus]
+
+
+def test_warm_ne_charge_que_les_agents_demandes():
+    index = _index([_conge(1, date(2024, 3, 4), date(2024, 3, 8), agent_id=1), _conge(2, date(2024, 3, 4), date(2024, 3, 8), agent_id=2)])
+    index.warm([1, 3])
+    assert set(index._agents) == {1, 3}
+    index.add(_conge(5, date(2024, 3, 4), date(2024, 3, 8), agent_id=2))  # Agent non chargé : ignoré, relu depuis la base
+    assert _ids(index, date(2024, 3, 1), date(2024, 3, 31), agent_id=2) == [2]
+
+
+def test_ecritures_d_une_autre_connexion_invalident_l_index(db, service, agent_id):
+    assert db.get_overlapping_leaves(agent_id, date(2025, 3, 3), date(2025, 3, 7)) == []
+    assert db.get_agents_count() == 1
+    # Un second processus (CLI...) écrit dans le même fichier
+    autre = DatabaseManager(db.db_file)
+    autre.connect()
+    try:
+        CongeService(autre, service.certificats_dir).submit_conge_collectif("Congé exceptionnel", "03/03/2025", "07/03/2025", agent_ids=[agent_id])
+        autre.ajouter_agent("Benali", "Omar", "P2", "PA", 10.0)
+    finally:
+        autre.close()
+    assert [c.type_conge for c in db.get_overlapping_leaves(agent_id, date(2025, 3, 3), date(2025, 3, 7))] == ["Congé exceptionnel"]
+    assert db.get_agents_count() == 2
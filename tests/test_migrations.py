@@ -0,0 +1,53 @@
+# tests/test_migrations.py
+import sqlite3
+
+from db.database import DatabaseManager
+from db.migrations import LATEST_VERSION, get_schema_version
+
+# Schéma de la première version de l'application, sans aucune migration (user_version = 0)
+SCHEMA_INITIAL = [
+    """CREATE TABLE agents (id INTEGER PRIMARY KEY, nom TEXT NOT NULL, prenom TEXT, ppr TEXT UNIQUE NOT NULL, grade TEXT NOT NULL, solde REAL NOT NULL CHECK(solde >= 0))""",
+    """CREATE TABLE conges (id INTEGER PRIMARY KEY, agent_id INTEGER NOT NULL, type_conge TEXT NOT NULL, justif TEXT, interim_id INTEGER, date_debut TEXT NOT NULL, date_fin TEXT NOT NULL, jours_pris INTEGER NOT NULL CHECK(jours_pris >= 0), statut TEXT NOT NULL DEFAULT 'Actif', FOREIGN KEY (agent_id) REFERENCES agents(id) ON DELETE CASCADE, FOREIGN KEY (interim_id) REFERENCES agents(id) ON DELETE SET NULL)""",
+    """CREATE TABLE jours_feries_personnalises (date TEXT PRIMARY KEY, nom TEXT NOT NULL, type TEXT NOT NULL)""",
+    """CREATE TABLE certificats_medicaux (id INTEGER PRIMARY KEY, conge_id INTEGER NOT NULL UNIQUE, nom_medecin TEXT, duree_jours INTEGER, chemin_fichier TEXT NOT NULL, FOREIGN KEY (conge_id) REFERENCES conges(id) ON DELETE CASCADE)""",
+]
+
+
+def _base_initiale(chemin):
+    conn = sqlite3.connect(chemin)
+    for requete in SCHEMA_INITIAL: conn.execute(requete)
+    conn.execute("INSERT INTO agents (nom, prenom, ppr, grade, solde) VALUES ('Lefèvre', 'Éric', 'P1', 'PA', 17.5)")
+    # Les anciennes versions enregistraient des datetime complets
+    conn.execute("""INSERT INTO conges (agent_id, type_conge, date_debut, date_fin, jours_pris)
+                    VALUES (1, 'Congé annuel', '2023-05-02 00:00:00', '2023-05-05 00:00:00', 4)""")
+    conn.commit()
+    conn.close()
+
+
+def test_migration_depuis_le_schema_initial(tmp_path):
+    chemin = str(tmp_path / "ancienne.db")
+    _base_initiale(chemin)
+    db = DatabaseManager(chemin)
+    db.connect()
+    try:
+        db.create_db_tables()
+        assert get_schema_version(db.conn) == LATEST_VERSION
+        assert db.execute_query("SELECT date_debut, date_fin FROM conges", fetch="one") == ("2023-05-02", "2023-05-05")
+        assert db.get_stats_conges() == [("Congé annuel", 1, 4)]
+        assert db.execute_query("PRAGMA integrity_check", fetch="one") == ("ok",)
+    finally:
+        db.close()
+
+
+def test_migrations_idempotentes(tmp_path):
+    chemin = str(tmp_path / "ancienne.db")
+    _base_initiale(chemin)
+    for _ in range(2):
+        db = DatabaseManager(chemin)
+        db.connect()
+        try:
+            db.create_db_tables()
+            assert get_schema_version(db.conn) == LATEST_VERSION
+            assert db.get_agents_count() == 1
+        finally:
+            db.close()
@@ -0,0 +1,43 @@
+# tests/test_recherche_agents.py
+import sqlite3
+
+from db.database import DatabaseManager
+from test_migrations import _base_initiale
+
+
+def test_recherche_sans_accents_ni_majuscules(db):
+    db.ajouter_agent("Lefèvre", "Éric", "P1", "PA", 10.0)
+    db.ajouter_agent("العلوي", "فاطمة", "P2", "PA", 10.0)
+    assert [a.ppr for a in db.get_agents(term="LEFEVRE")] == ["P1"]
+    assert [a.ppr for a in db.get_agents(term="eri")] == ["P1"]   # Trigrammes
+    assert [a.ppr for a in db.get_agents(term="le")] == ["P1"]    # Moins de 3 caractères : LIKE
+    assert [a.ppr for a in db.get_agents(term="العلوي")] == ["P2"]
+    assert db.get_agents_count("lefevre") == 1
+
+
+def test_index_maintenu_par_une_connexion_externe(db):
+    # Les triggers ne dépendent d'aucune fonction SQL de l'application : sqlite3 seul peut écrire dans agents
+    db.ajouter_agent("Lefèvre", "Éric", "P1", "PA", 10.0)
+    conn = sqlite3.connect(db.db_file)
+    try:
+        conn.execute("UPDATE agents SET nom = 'Martin', nom_recherche = 'martin' WHERE ppr = 'P1'")
+        conn.commit()
+        conn.execute("INSERT INTO agents_fts (agents_fts) VALUES ('integrity-check')")
+    finally:
+        conn.close()
+    assert [a.ppr for a in db.get_agents(term="martin")] == ["P1"]
+    assert db.get_agents(term="lefevre") == []
+
+
+def test_recherche_apres_migration_du_schema_initial(tmp_path):
+    chemin = str(tmp_path / "ancienne.db")
+    _base_initiale(chemin)
+    db = DatabaseManager(chemin)
+    db.connect()
+    try:
+        db.create_db_tables()
+        assert db.has_agents_fts
+        assert [a.ppr for a in db.get_agents(term="lefevre")] == ["P1"]
+        assert [a.ppr for a in db.get_agents(term="ERIC")] == ["P1"]
+    finally:
+        db.close()
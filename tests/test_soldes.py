@@ -0,0 +1,70 @@
+# tests/test_soldes.py
+import sqlite3
+
+import pytest
+
+from conftest import ecrire_csv
+from db.database import DatabaseManager
+from test_migrations import _base_initiale
+
+
+def _journal(db, agent_id):
+    return db.execute_query("SELECT delta, motif FROM mouvements_solde WHERE agent_id = ? ORDER BY id", (agent_id,), fetch="all")
+
+
+def test_modification_ecrit_le_solde_saisi(db, agent_id):
+    db.modifier_agent(agent_id, "Alaoui", "Fatima", "P1", "PA", 7.3)
+    assert db.get_agent_by_id(agent_id).solde == 7.3
+    assert [motif for _, motif in _journal(db, agent_id)] == ["Solde initial", "Correction manuelle"]
+    assert sum(delta for delta, _ in _journal(db, agent_id)) == pytest.approx(7.3)
+
+
+def test_journal_en_ajout_seul(db, agent_id):
+    with pytest.raises(sqlite3.IntegrityError):
+        db.execute_query("UPDATE mouvements_solde SET delta = 0")
+
+
+def test_journal_conserve_a_la_suppression_de_l_agent(db, agent_id):
+    db.snapshot_soldes()
+    db.supprimer_agent(agent_id)
+    assert _journal(db, agent_id) == [(22.0, "Solde initial"), (-22.0, "Suppression de l'agent")]
+    assert db.execute_query("SELECT COUNT(*) FROM snapshots_solde WHERE agent_id = ?", (agent_id,), fetch="one") == (1,)
+
+
+def test_journal_sans_cle_etrangere_apres_migration(tmp_path):
+    chemin = str(tmp_path / "ancienne.db")
+    _base_initiale(chemin)
+    db = DatabaseManager(chemin)
+    db.connect()
+    try:
+        db.create_db_tables()
+        for table in ("mouvements_solde", "snapshots_solde"):
+            assert db.execute_query(f"PRAGMA foreign_key_list({table})", fetch="all") == []
+        assert db.execute_query("SELECT solde FROM snapshots_solde WHERE agent_id = 1", fetch="one") == (17.5,)
+        db.supprimer_agent(1)
+        assert db.execute_query("SELECT COUNT(*) FROM snapshots_solde WHERE agent_id = 1", fetch="one") == (1,)
+    finally:
+        db.close()
+
+
+def test_aucun_ecart_apres_imports_et_modifications(db, service, agent_id, tmp_path):
+    agents = ecrire_csv(tmp_path / "agents.csv", [["Nom", "Prénom", "PPR", "Grade", "Solde"],
+                                                  ["Alaoui", "Fatima", "P1", "PA", "20,5"], ["Benali", "Omar", "P2", "PA", "10"]])
+    assert service.import_agents(agents).ok
+    conges = ecrire_csv(tmp_path / "conges.csv", [["PPR", "Type", "Début", "Fin"], ["P2", "Congé annuel", "04/03/2024", "08/03/2024"]])
+    assert service.import_conges(conges).ok
+    db.snapshot_soldes()
+    service.delete_conge(db.get_conges()[0].id)
+    db.modifier_agent(agent_id, "Alaoui", "Fatima", "P1", "PA", 3.25)
+    assert db.verifier_soldes() == []
+
+
+def test_corriger_aligne_un_solde_modifie_hors_application(db, agent_id):
+    connexion = sqlite3.connect(db.db_file)
+    with connexion:
+        connexion.execute("UPDATE agents SET solde = 99 WHERE id = ?", (agent_id,))
+    connexion.close()
+    assert [(e[0], e[4], e[5]) for e in db.verifier_soldes()] == [(agent_id, 99.0, 22.0)]
+    assert len(db.verifier_soldes(corriger=True)) == 1
+    assert db.get_agent_by_id(agent_id).solde == 22.0
+    assert db.verifier_soldes() == []
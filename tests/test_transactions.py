@@ -0,0 +1,87 @@
+# tests/test_transactions.py
+import os
+import sqlite3
+from datetime import date
+
+import pytest
+
+from conftest import compter
+
+
+def _solde(db, agent_id):
+    return db.execute_query("SELECT solde FROM agents WHERE id = ?", (agent_id,), fetch="one")[0]
+
+
+def test_savepoint_imbrique_annule_seulement_ses_ecritures(db, agent_id):
+    with db.transaction() as cursor:
+        cursor.execute("UPDATE agents SET grade = 'Professeur' WHERE id = ?", (agent_id,))
+        with pytest.raises(RuntimeError):
+            with db.transaction() as interne:
+                interne.execute("UPDATE agents SET solde = 1 WHERE id = ?", (agent_id,))
+                raise RuntimeError("échec du bloc imbriqué")
+        assert db._tx_depth == 1
+    assert db.get_agent_by_id(agent_id).grade == "Professeur"
+    assert _solde(db, agent_id) == 22.0
+    assert not db.conn.in_transaction
+
+
+def test_echec_externe_annule_le_savepoint_deja_libere(db, agent_id):
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            with db.transaction() as interne:
+                interne.execute("UPDATE agents SET solde = 1 WHERE id = ?", (agent_id,))
+            raise RuntimeError("échec après le bloc imbriqué")
+    assert _solde(db, agent_id) == 22.0
+    assert db._tx_depth == 0
+
+
+def test_echec_de_submit_conge_ne_modifie_ni_solde_ni_journal(db, service, agent_id, monkeypatch):
+    mouvements = compter(db, "mouvements_solde")
+    def journal_en_echec(*args):
+        raise sqlite3.OperationalError("disque plein")
+    # Échec après l'insertion du congé et la mise à jour de agents.solde, dans la même transaction
+    monkeypatch.setattr(db, "_journaliser_soldes_no_commit", journal_en_echec)
+    form_data = {'agent_id': agent_id, 'type_conge': "Congé annuel", 'justif': None, 'interim_id': None,
+                 'date_debut': "04/03/2024", 'date_fin': "08/03/2024", 'jours_pris': 5}
+    with pytest.raises(sqlite3.OperationalError):
+        service.submit_conge(form_data, is_modification=False)
+    assert _solde(db, agent_id) == 22.0
+    assert compter(db, "mouvements_solde") == mouvements
+    assert compter(db, "conges") == 0
+    assert db.get_overlapping_leaves(agent_id, date(2024, 3, 4), date(2024, 3, 8)) == []
+
+
+def _conge_maladie(service, agent_id, tmp_path, nom, original=None, conge_id=None):
+    justificatif = tmp_path / nom
+    justificatif.write_text("certificat")
+    return {'agent_id': agent_id, 'agent_ppr': "P1", 'type_conge': "Congé de maladie", 'justif': None, 'interim_id': None,
+            'date_debut': "04/03/2024", 'date_fin': "08/03/2024", 'jours_pris': 5, 'conge_id': conge_id,
+            'cert_path': str(justificatif), 'original_cert_path': original}
+
+
+def _certificat(db):
+    return db.execute_query("SELECT chemin_fichier FROM certificats_medicaux", fetch="one")[0]
+
+
+def test_certificat_remplace_apres_validation(db, service, agent_id, tmp_path):
+    os.makedirs(service.certificats_dir)
+    service.submit_conge(_conge_maladie(service, agent_id, tmp_path, "a.pdf"), is_modification=False)
+    ancien, conge_id = _certificat(db), db.get_conges(agent_id=agent_id)[0].id
+    service.submit_conge(_conge_maladie(service, agent_id, tmp_path, "b.pdf", ancien, conge_id), is_modification=True)
+    assert _certificat(db) != ancien and os.path.exists(_certificat(db))
+    assert not os.path.exists(ancien)
+
+
+def test_certificat_conserve_si_la_transaction_est_annulee(db, service, agent_id, tmp_path, monkeypatch):
+    os.makedirs(service.certificats_dir)
+    service.submit_conge(_conge_maladie(service, agent_id, tmp_path, "a.pdf"), is_modification=False)
+    ancien, conge_id = _certificat(db), db.get_conges(agent_id=agent_id)[0].id
+    enregistrer = service._handle_certificat_save
+    def enregistrer_puis_echouer(*args):
+        enregistrer(*args)
+        raise sqlite3.OperationalError("échec après la copie du certificat")
+    monkeypatch.setattr(service, "_handle_certificat_save", enregistrer_puis_echouer)
+    with pytest.raises(sqlite3.OperationalError):
+        service.submit_conge(_conge_maladie(service, agent_id, tmp_path, "b.pdf", ancien, conge_id), is_modification=True)
+    assert _certificat(db) == ancien and os.path.exists(ancien)
+    assert os.listdir(service.certificats_dir) == [os.path.basename(ancien)]
@@ -0,0 +1,54 @@
+# tests/test_working_days.py
+import random
+from datetime import date, datetime, timedelta
+
+from utils.working_days import WorkingDayCalendar
+
+FERIES = frozenset({date(2024, 1, 1), date(2024, 5, 1), date(2024, 7, 30), date(2024, 12, 25), date(2025, 1, 1), date(2025, 5, 1)})
+
+
+def _ouvre(d):
+    return d.weekday() < 5 and d not in FERIES
+
+
+def _compter(d1, d2):
+    return sum(1 for i in range((d2 - d1).days + 1) if _ouvre(d1 + timedelta(days=i)))
+
+
+def _ajouter(d, n):
+    while True:
+        if _ouvre(d):
+            n -= 1
+            if n == 0: return d
+        d += timedelta(days=1)
+
+
+def test_count_autour_des_feries_et_week_ends():
+    calendrier = WorkingDayCalendar.for_holidays(FERIES)
+    assert calendrier.count(date(2024, 4, 29), date(2024, 5, 5)) == 4       # 1er mai un mercredi
+    assert calendrier.count(date(2024, 5, 4), date(2024, 5, 5)) == 0        # Samedi et dimanche
+    assert calendrier.count(date(2024, 12, 23), date(2025, 1, 3)) == 8      # Noël et jour de l'an
+    assert calendrier.count(date(2024, 3, 8), date(2024, 3, 4)) == 0        # Période inversée
+    assert calendrier.count(datetime(2024, 7, 29), datetime(2024, 7, 31)) == 2
+    rng = random.Random(3)
+    for _ in range(500):
+        # Bornes comprises entre 2023 et 2026 : au-delà de la plage précalculée (2024-2025) comprise
+        d1 = date(2023, 6, 1) + timedelta(days=rng.randrange(1100))
+        d2 = d1 + timedelta(days=rng.randrange(60))
+        assert calendrier.count(d1, d2) == _compter(d1, d2), (d1, d2)
+
+
+def test_add_working_days_autour_des_feries_et_week_ends():
+    calendrier = WorkingDayCalendar.for_holidays(FERIES)
+    assert calendrier.add_working_days(date(2024, 4, 30), 2) == date(2024, 5, 2)    # Saute le 1er mai
+    assert calendrier.add_working_days(date(2024, 5, 4), 1) == date(2024, 5, 6)     # Départ un samedi
+    assert calendrier.add_working_days(date(2024, 12, 24), 3) == date(2024, 12, 27)
+    assert calendrier.add_working_days(date(2025, 12, 30), 5) == date(2026, 1, 5)   # Sortie de la plage précalculée
+    assert calendrier.add_working_days(date(2024, 3, 4), 0) == date(2024, 3, 4)
+    rng = random.Random(5)
+    for _ in range(500):
+        d = date(2023, 6, 1) + timedelta(days=rng.randrange(1100))
+        n = rng.randrange(1, 40)
+        fin = calendrier.add_working_days(d, n)
+        assert fin == _ajouter(d, n), (d, n)
+        assert calendrier.count(d, fin) == n
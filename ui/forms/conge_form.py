@@ -4,27 +4,18 @@ from tkinter import ttk, messagebox, filedialog
 import os
 
 # Import des composants de l'architecture
-from core.conges.strategies import (
-    CongeAnnuelStrategy, CongeMaladieStrategy, CongeMaterniteStrategy,
-    CongePaterniteStrategy, CongeCalendaireStrategy
-)
+from core.conges.strategies import strategies_par_type
 from ui.widgets.date_picker import DatePickerWindow
-from utils.date_utils import validate_date, format_date_for_display, get_holidays_set_for_period
+from utils.date_utils import validate_date, format_date_for_display
+from utils.holiday_calendar import HOLIDAY_CALENDAR
 from utils.config_loader import CONFIG
+from utils.profiler import profiler_action
 
 class CongeForm(tk.Toplevel):
     """
     Fenêtre de formulaire pour ajouter ou modifier un congé.
     Elle est pilotée par des stratégies et communique avec le manager.
     """
-    STRATEGIES = {
-        "Congé annuel": CongeAnnuelStrategy(),
-        "Congé exceptionnel": CongeCalendaireStrategy(),
-        "Congé de maladie": CongeMaladieStrategy(),
-        "Congé de maternité": CongeMaterniteStrategy(),
-        "Congé de paternité": CongePaterniteStrategy(),
-    }
-
     def __init__(self, parent, manager, agent_id, conge_id=None):
         super().__init__(parent)
         self.parent = parent
@@ -71,7 +62,7 @@ class CongeForm(tk.Toplevel):
         for i, text in enumerate(labels):
             ttk.Label(form_frame, text=text).grid(row=i, column=0, sticky="w", padx=5, pady=8)
 
-        self.type_combo = ttk.Combobox(form_frame, textvariable=self.type_var, values=list(self.STRATEGIES.keys()), state="readonly", width=38)
+        self.type_combo = ttk.Combobox(form_frame, textvariable=self.type_var, values=list(strategies_par_type()), state="readonly", width=38)
         self.type_combo.grid(row=0, column=1, sticky="ew", columnspan=2)
         
         self.start_date_entry = ttk.Entry(form_frame, width=30)
@@ -117,7 +108,7 @@ class CongeForm(tk.Toplevel):
     def _on_type_change(self, event=None):
         type_conge = self.type_var.get()
         if not type_conge: return
-        self.current_strategy = self.STRATEGIES[type_conge]
+        self.current_strategy = strategies_par_type()[type_conge]
         self.current_strategy.configure_ui(self)
         
         # ================== MODIFICATION APPLIQUÉE ICI ==================
@@ -131,7 +122,7 @@ class CongeForm(tk.Toplevel):
             days = int(self.days_var.get())
             start_date = validate_date(self.start_date_entry.get())
             if not start_date or days < 0: return
-            holidays_set = get_holidays_set_for_period(self.db, start_date.year, start_date.year + 2)
+            holidays_set = HOLIDAY_CALENDAR.holidays_for_period(self.db, start_date.year, start_date.year + 2)
             end_date = self.current_strategy.calculate_end_date(start_date, days, holidays_set)
             
             # On réactive le champ temporairement pour pouvoir le modifier
@@ -151,7 +142,7 @@ class CongeForm(tk.Toplevel):
                 self.days_var.set("0")
                 return
             
-            holidays_set = get_holidays_set_for_period(self.db, start_date.year, end_date.year)
+            holidays_set = HOLIDAY_CALENDAR.holidays_for_period(self.db, start_date.year, end_date.year)
             days = self.current_strategy.calculate_days(start_date, end_date, holidays_set)
             
             # On réactive le champ temporairement pour pouvoir le modifier
@@ -197,6 +188,7 @@ class CongeForm(tk.Toplevel):
             self.cert_path_var.set("")
             self.current_strategy._update_certificat_display(self)
     
+    @profiler_action
     def _on_validate(self):
         try:
             form_data = {
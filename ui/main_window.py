@@ -2,55 +2,29 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-from collections import defaultdict, Counter
-from dateutil import parser
+from collections import defaultdict
 import logging
 import os
 import sqlite3
 
 # Import des composants de votre architecture
 from core.conges.manager import CongeManager
+from db.read_executor import ReadExecutor
 from db.models import Agent, Conge
 from ui.forms.agent_form import AgentForm
 from ui.forms.conge_form import CongeForm
 from ui.widgets.secondary_windows import HolidaysManagerWindow, JustificatifsWindow 
 from ui.widgets.arabic_keyboard import ArabicKeyboard
 from ui.widgets.date_picker import DatePickerWindow
-from utils.file_utils import export_agents_to_excel, export_all_conges_to_excel, import_agents_from_excel
-from utils.date_utils import format_date_for_display
+from ui.widgets.virtual_tree import VirtualTreeview
+from utils.file_utils import export_agents_to_excel, export_all_conges_to_excel, import_agents_from_excel, import_conges_from_excel
+from utils.date_utils import format_date_for_display, format_date_for_display_short
 from utils.config_loader import CONFIG
-
-# --- MODIFICATION N°1 : Ajout d'une fonction de formatage courte ---
-def format_date_for_display_short(date_obj):
-    """Convertit un objet date en format affichable court (JJ/MM/AA)."""
-    if not date_obj: return ""
-    try:
-        # Si c'est déjà un objet datetime, on le formate directement
-        if hasattr(date_obj, 'strftime'):
-            return date_obj.strftime("%d/%m/%y")
-        # Sinon, on essaie de le parser depuis une chaîne
-        return parser.parse(str(date_obj)).strftime("%d/%m/%y")
-    except (ValueError, TypeError):
-        return str(date_obj)
-
-def treeview_sort_column(tv, col, reverse):
-    l = [(tv.set(k, col), k) for k in tv.get_children('')]
-    numeric_cols = ['Solde', 'Jours', 'PPR']
-    try:
-        if col in numeric_cols:
-            l.sort(key=lambda t: float(str(t[0]).replace(',', '.')), reverse=reverse)
-        else:
-            l.sort(key=lambda t: str(t[0]).lower(), reverse=reverse)
-    except (ValueError, IndexError):
-        l.sort(key=lambda t: str(t[0]), reverse=reverse)
-    
-    for index, (val, k) in enumerate(l):
-        tv.move(k, '', index)
-    
-    tv.heading(col, command=lambda: treeview_sort_column(tv, col, not reverse))
-
+from utils.profiler import PROFILEUR, profiler_action
 
 class MainWindow(tk.Tk):
+    SEARCH_DEBOUNCE_MS = 250
+
     def __init__(self, manager: CongeManager):
         super().__init__()
         self.manager = manager
@@ -63,15 +37,29 @@ class MainWindow(tk.Tk):
         self.current_page = 1
         self.items_per_page = 50
         self.total_pages = 1
+        self._page_after = None   # Curseur (nom, prénom, id) précédant la page affichée
+        self._page_last_key = None
+        self._search_job = None
+        # Les lectures des listes et des statistiques se font hors du thread Tk
+        self.reader = ReadExecutor(self.db, self)
         
         self.create_widgets()
+        # Raccourci caché : profilage des actions (utils/profiler.py), pour diagnostiquer une lenteur sur le poste d'un utilisateur
+        self.bind_all("<Control-Shift-P>", self.toggle_profiler)
         self.refresh_all()
 
     def on_close(self):
         if messagebox.askokcancel("Quitter", "Voulez-vous vraiment quitter ?"):
+            self.reader.shutdown()
+            rapport = self.db.rapport_requetes()
+            if rapport: logging.info(f"Statistiques des requêtes SQL :\n{rapport}")
             self.db.close()
             self.destroy()
 
+    def toggle_profiler(self, event=None):
+        if PROFILEUR.basculer(): self.set_status(f"Profilage activé : un profil par action dans {PROFILEUR.dossier}")
+        else: self.set_status("Profilage désactivé.")
+
     def set_status(self, message):
         self.status_var.set(message)
         self.update_idletasks()
@@ -90,21 +78,25 @@ class MainWindow(tk.Tk):
         left_pane = ttk.Frame(main_pane, padding=5); main_pane.add(left_pane, weight=2)
         agents_frame = ttk.LabelFrame(left_pane, text="Agents"); agents_frame.pack(fill=tk.BOTH, expand=True)
         search_frame = ttk.Frame(agents_frame); search_frame.pack(fill=tk.X, padx=5, pady=5); ttk.Label(search_frame, text="Rechercher:").pack(side=tk.LEFT, padx=(0, 5))
-        self.search_var = tk.StringVar(); self.search_var.trace_add("write", lambda *args: self.search_agents())
+        self.search_var = tk.StringVar(); self.search_var.trace_add("write", lambda *args: self._schedule_search())
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var); search_entry.pack(fill=tk.X, expand=True, side=tk.LEFT)
         
         cols_agents = ("ID", "Nom", "Prénom", "PPR", "Grade", "Solde");
-        self.list_agents = ttk.Treeview(agents_frame, columns=cols_agents, show="headings", selectmode="browse")
-        for col in cols_agents: self.list_agents.heading(col, text=col, command=lambda c=col: treeview_sort_column(self.list_agents, c, False))
+        # Liste virtualisée : seules les lignes visibles sont créées côté Tk
+        self.list_agents = VirtualTreeview(agents_frame, cols_agents, numeric_columns=('PPR', 'Solde'))
         self.list_agents.column("ID", width=0, stretch=False); self.list_agents.column("Nom", width=120); self.list_agents.column("Prénom", width=120); self.list_agents.column("PPR", width=80, anchor="center"); self.list_agents.column("Grade", width=100); self.list_agents.column("Solde", width=60, anchor="center")
         self.list_agents.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        self.list_agents.bind("<<TreeviewSelect>>", self.on_agent_select)
+        self.list_agents.bind("<<VirtualSelect>>", self.on_agent_select)
         self.list_agents.bind("<Double-1>", lambda e: self.modify_selected_agent())
         
         pagination_frame = ttk.Frame(agents_frame); pagination_frame.pack(fill=tk.X, padx=5, pady=5)
         self.prev_button = ttk.Button(pagination_frame, text="<< Précédent", command=self.prev_page); self.prev_button.pack(side=tk.LEFT)
         self.page_label = ttk.Label(pagination_frame, text="Page 1 / 1"); self.page_label.pack(side=tk.LEFT, expand=True)
         self.next_button = ttk.Button(pagination_frame, text="Suivant >>", command=self.next_page); self.next_button.pack(side=tk.RIGHT)
+        self.goto_page_var = tk.StringVar()
+        goto_entry = ttk.Entry(pagination_frame, textvariable=self.goto_page_var, width=5); goto_entry.pack(side=tk.RIGHT, padx=(0, 5))
+        goto_entry.bind("<Return>", lambda e: self.goto_page())
+        ttk.Label(pagination_frame, text="Aller à:").pack(side=tk.RIGHT, padx=(0, 2))
         
         btn_frame_agents = ttk.Frame(agents_frame); btn_frame_agents.pack(fill=tk.X, padx=5, pady=(0, 5))
         ttk.Button(btn_frame_agents, text="Ajouter", command=self.add_agent_ui).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
@@ -121,8 +113,8 @@ class MainWindow(tk.Tk):
         self.conge_filter_var = tk.StringVar(value="Tous"); conge_filter_combo = ttk.Combobox(filter_frame, textvariable=self.conge_filter_var, values=["Tous"] + CONFIG['ui']['types_conge'], state="readonly"); conge_filter_combo.pack(side=tk.LEFT, fill=tk.X, expand=True); conge_filter_combo.bind("<<ComboboxSelected>>", self.on_agent_select)
         
         cols_conges = ("CongeID", "Certificat", "Type", "Début", "Fin", "Jours", "Justification", "Intérimaire");
-        self.list_conges = ttk.Treeview(conges_frame, columns=cols_conges, show="headings", selectmode="browse")
-        for col in cols_conges: self.list_conges.heading(col, text=col, command=lambda c=col: treeview_sort_column(self.list_conges, c, False))
+        # Les années sont des lignes d'en-tête « summary » ; le tri se fait à l'intérieur de chaque année
+        self.list_conges = VirtualTreeview(conges_frame, cols_conges, numeric_columns=('Jours',), group_tag="summary")
         self.list_conges.column("CongeID", width=0, stretch=False); self.list_conges.column("Certificat", width=80, anchor="center"); self.list_conges.column("Type", width=120); self.list_conges.column("Début", width=90, anchor="center"); self.list_conges.column("Fin", width=90, anchor="center"); self.list_conges.column("Jours", width=50, anchor="center"); self.list_conges.column("Intérimaire", width=150)
         self.list_conges.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         self.list_conges.tag_configure("summary", background="#e6f2ff", font=("Helvetica", 10, "bold"))
@@ -144,22 +136,16 @@ class MainWindow(tk.Tk):
         ttk.Button(global_actions_frame, text="Suivi Justificatifs", command=self.open_justificatifs_suivi).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
         ttk.Button(global_actions_frame, text="Gérer les Jours Fériés", command=self.open_holidays_manager).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
         ttk.Button(global_actions_frame, text="Exporter Tous les Congés", command=self.export_conges).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
+        ttk.Button(global_actions_frame, text="Importer des Congés", command=self.import_conges).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
         
         self.status_var = tk.StringVar(value="Prêt."); status_bar = ttk.Label(self, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W); status_bar.pack(side=tk.BOTTOM, fill=tk.X)
 
     def get_selected_agent_id(self):
-        selection = self.list_agents.selection()
-        return int(self.list_agents.item(selection[0])["values"][0]) if selection else None
+        return self.list_agents.selected_key()
 
     def get_selected_conge_id(self):
-        selection = self.list_conges.selection()
-        if not selection: return None
-        item = self.list_conges.item(selection[0])
-        
-        if "summary" in item["tags"]:
-            return None
-            
-        return int(item["values"][0]) if item["values"] else None
+        key = self.list_conges.selected_key()
+        return key if isinstance(key, int) else None # Les en-têtes d'année ont une clé ('annee', ...)
 
     def add_agent_ui(self): AgentForm(self, self.manager)
     def modify_selected_agent(self):
@@ -185,36 +171,54 @@ class MainWindow(tk.Tk):
         if conge_id and self.manager.delete_conge_with_confirmation(conge_id):
             self.set_status("Congé supprimé."); self.refresh_all(agent_id)
         elif not conge_id: messagebox.showwarning("Aucune sélection", "Veuillez sélectionner un congé à supprimer.")
+    @profiler_action
     def export_agents(self): export_agents_to_excel(self, self.db)
+    @profiler_action
     def export_conges(self): export_all_conges_to_excel(self, self.db)
+    @profiler_action
     def import_agents(self): 
         import_agents_from_excel(self, self.db)
+    @profiler_action
+    def import_conges(self): import_conges_from_excel(self, self.db)
     def open_holidays_manager(self): HolidaysManagerWindow(self, self.db)
     def open_justificatifs_suivi(self): JustificatifsWindow(self, self.db)
 
+    @profiler_action
     def refresh_all(self, agent_to_select_id=None):
         current_selection = agent_to_select_id or self.get_selected_agent_id()
         self.refresh_agents_list(current_selection)
         self.refresh_stats()
 
-    def refresh_agents_list(self, agent_to_select_id=None):
-        for row in self.list_agents.get_children(): self.list_agents.delete(row)
-        term = self.search_var.get().strip().lower() or None
-        total_items = self.manager.db.get_agents_count(term)
-        self.total_pages = max(1, (total_items + self.items_per_page - 1) // self.items_per_page)
-        self.current_page = min(self.current_page, self.total_pages)
-        offset = (self.current_page - 1) * self.items_per_page
-        agents = self.manager.get_all_agents(term=term, limit=self.items_per_page, offset=offset)
+    def refresh_agents_list(self, agent_to_select_id=None, resolve_cursor=False):
+        self.reader.submit("agents", self._load_agents_page, self._search_term(), self.current_page, self._page_after,
+                           self.items_per_page, resolve_cursor,
+                           on_result=lambda result: self._show_agents_page(result, agent_to_select_id),
+                           on_error=lambda e: self.set_status(f"Erreur de lecture des agents : {e}"))
 
-        selected_item_id = None
-        for agent in agents:
-            item_id = self.list_agents.insert("", "end", values=(agent.id, agent.nom, agent.prenom, agent.ppr, agent.grade, f"{agent.solde:.1f}"))
-            if agent.id == agent_to_select_id:
-                selected_item_id = item_id
+    @staticmethod
+    def _load_agents_page(db, term, page, after, page_size, resolve_cursor):
+        """Exécutée sur un thread de lecture : (page, curseur, agents, total)."""
+        total_items = db.get_agents_count(term)
+        total_pages = max(1, (total_items + page_size - 1) // page_size)
+        if page > total_pages:
+            page, resolve_cursor = total_pages, True
+        if resolve_cursor:
+            after = db.get_agent_page_cursor(term, page, page_size)
+        # Pagination par clé : on reprend juste après le curseur de la page, sans OFFSET
+        agents = db.get_agents(term=term, limit=page_size, after=after)
+        if not agents and page > 1:
+            page, after = 1, None
+            agents = db.get_agents(term=term, limit=page_size)
+        return page, after, agents, total_items
+
+    def _show_agents_page(self, result, agent_to_select_id):
+        self.current_page, self._page_after, agents, total_items = result
+        self.total_pages = max(1, (total_items + self.items_per_page - 1) // self.items_per_page)
+        self._page_last_key = self.db.agent_sort_key(agents[-1]) if agents else None
 
-        if selected_item_id:
-            self.list_agents.selection_set(selected_item_id)
-            self.list_agents.focus(selected_item_id)
+        self.list_agents.set_rows(
+            [(agent.id, (agent.id, agent.nom, agent.prenom, agent.ppr, agent.grade, f"{agent.solde:.1f}"), ()) for agent in agents],
+            selected_key=agent_to_select_id)
         self.on_agent_select()
         
         self.page_label.config(text=f"Page {self.current_page} / {self.total_pages}")
@@ -223,62 +227,63 @@ class MainWindow(tk.Tk):
         self.set_status(f"{len(agents)} agents affichés sur {total_items} au total.")
 
     def refresh_conges_list(self, agent_id):
-        self.list_conges.delete(*self.list_conges.get_children())
         filtre = self.conge_filter_var.get()
-        conges_data = self.manager.get_conges_for_agent(agent_id)
-        
+        # Une seule requête : certificats et intérimaires sont joints, le filtre est appliqué en SQL
+        self.reader.submit("conges", lambda db: db.get_conge_rows_for_agent(agent_id, None if filtre == "Tous" else filtre),
+                           on_result=self._show_conges_rows,
+                           on_error=lambda e: self.set_status(f"Erreur de lecture des congés : {e}"))
+
+    def _show_conges_rows(self, rows):
         conges_par_annee = defaultdict(list)
-        for c in conges_data:
-            if filtre != "Tous" and c.type_conge != filtre: continue
-            try:
-                conges_par_annee[c.date_debut.year].append(c)
-            except AttributeError:
-                logging.warning(f"Date invalide ou nulle pour congé ID {c.id}")
+        for row in rows:
+            if row[1] is None:
+                logging.warning(f"Date invalide ou nulle pour congé ID {row[0]}"); continue
+            conges_par_annee[row[1]].append(row)
         
-        for annee in sorted(conges_par_annee.keys(), reverse=True):
-            total_jours = sum(c.jours_pris for c in conges_par_annee[annee] if c.type_conge == 'Congé annuel' and c.statut == 'Actif')
-            summary_id = self.list_conges.insert("", "end", values=("", "", f"📅 ANNÉE {annee}", "", "", total_jours, f"{total_jours} jours pris"), tags=("summary",), open=True)
+        lignes_affichees = []
+        for annee, lignes in conges_par_annee.items(): # Déjà triées par année décroissante puis par date de début
+            total_jours = sum(r[5] for r in lignes if r[2] == 'Congé annuel' and r[7] == 'Actif')
+            lignes_affichees.append((('annee', annee), ("", "", f"📅 ANNÉE {annee}", "", "", total_jours, f"{total_jours} jours pris"), ("summary",)))
             
-            # --- MODIFICATION N°2 : Tri des congés par date de début ---
-            # On parcourt les congés de l'année triés par date
-            for conge in sorted(conges_par_annee[annee], key=lambda c: c.date_debut):
-                cert_status = ""
-                if conge.type_conge == 'Congé de maladie':
-                    cert = self.db.get_certificat_for_conge(conge.id)
-                    cert_status = "✅ Justifié" if cert else "❌ Manquant"
+            for conge_id, _, type_conge, date_debut, date_fin, jours_pris, justif, statut, certificat, interim_id, interim_nom, interim_prenom in lignes:
+                cert_status = "" if certificat is None else ("✅ Justifié" if certificat else "❌ Manquant")
                 
                 interim_info = ""
-                if conge.interim_id:
-                    interim = self.manager.get_agent_by_id(conge.interim_id)
-                    interim_info = f"{interim.nom} {interim.prenom}" if interim else "Agent Supprimé"
+                if interim_id:
+                    interim_info = f"{interim_nom} {interim_prenom}" if interim_nom is not None else "Agent Supprimé"
                 
-                tags_a_appliquer = ('annule',) if conge.statut == 'Annulé' else ()
+                tags_a_appliquer = ('annule',) if statut == 'Annulé' else ()
                 
-                # --- MODIFICATION N°1 (suite) : Utilisation de la nouvelle fonction ---
-                self.list_conges.insert(summary_id, "end", values=(
-                    conge.id, cert_status, conge.type_conge, 
-                    format_date_for_display_short(conge.date_debut), 
-                    format_date_for_display_short(conge.date_fin), 
-                    conge.jours_pris, conge.justif or "", interim_info
-                ), tags=tags_a_appliquer)
+                lignes_affichees.append((conge_id, (
+                    conge_id, cert_status, type_conge, 
+                    format_date_for_display_short(date_debut), 
+                    format_date_for_display_short(date_fin), 
+                    jours_pris, justif or "", interim_info
+                ), tags_a_appliquer))
+        self.list_conges.set_rows(lignes_affichees, selected_key=self.list_conges.selected_key())
 
     def refresh_stats(self):
+        # Lecture des agrégats maintenus par triggers (table stats_conges)
+        self.reader.submit("stats", lambda db: (db.get_stats_conges('Actif'), db.get_agents_count()),
+                           on_result=self._show_stats, on_error=self._show_stats)
+
+    def _show_stats(self, result):
         self.text_stats.config(state=tk.NORMAL)
         self.text_stats.delete("1.0", tk.END)
         try:
-            all_conges = self.manager.db.get_conges()
-            nb_agents = self.manager.db.get_agents_count()
+            if isinstance(result, Exception): raise result
+            repartition, nb_agents = result
 
-            active_conges = [c for c in all_conges if c.statut == 'Actif']
-            total_jours_pris = sum(c.jours_pris for c in active_conges)
+            nb_actifs = sum(nombre for _, nombre, _ in repartition)
+            total_jours_pris = sum(jours for _, _, jours in repartition)
             
             self.text_stats.insert(tk.END, f"{'Nombre total d\'agents':<25}: {nb_agents}\n")
             self.text_stats.insert(tk.END, f"{'Total des jours de congés actifs':<25}: {total_jours_pris}\n\n")
             self.text_stats.insert(tk.END, "Répartition par type de congé (actifs):\n")
             
-            if active_conges:
-                for type_conge, count in Counter(c.type_conge for c in active_conges).most_common():
-                    self.text_stats.insert(tk.END, f"  - {type_conge:<22}: {count} ({(count / len(active_conges)) * 100:.1f}%)\n")
+            if nb_actifs:
+                for type_conge, count, _ in repartition:
+                    self.text_stats.insert(tk.END, f"  - {type_conge:<22}: {count} ({(count / nb_actifs) * 100:.1f}%)\n")
         except sqlite3.Error as e:
             self.text_stats.insert(tk.END, f"Erreur de lecture des statistiques: {e}")
         finally:
@@ -288,8 +293,7 @@ class MainWindow(tk.Tk):
         conge_id = self.get_selected_conge_id()
         if not conge_id: return
         
-        item = self.list_conges.item(self.list_conges.selection()[0])
-        conge_type = item["values"][2]
+        conge_type = self.list_conges.selected_row()[1][2]
 
         if conge_type == "Congé de maladie":
             cert = self.db.get_certificat_for_conge(conge_id)
@@ -301,15 +305,34 @@ class MainWindow(tk.Tk):
         else:
              self.modify_selected_conge()
 
+    def _schedule_search(self):
+        # Anti-rebond : seule la dernière frappe déclenche la recherche, les précédentes sont annulées
+        if self._search_job: self.after_cancel(self._search_job)
+        self._search_job = self.after(self.SEARCH_DEBOUNCE_MS, self.search_agents)
+    def _search_term(self):
+        return self.search_var.get().strip().lower() or None
     def search_agents(self):
-        self.current_page = 1; self.refresh_agents_list()
+        self._search_job = None
+        self.current_page = 1; self._page_after = None; self.refresh_agents_list()
+    @profiler_action
     def on_agent_select(self, event=None):
         agent_id = self.get_selected_agent_id()
         if agent_id:
             self.refresh_conges_list(agent_id)
         else:
-            self.list_conges.delete(*self.list_conges.get_children())
+            self.reader.cancel("conges")
+            self.list_conges.clear()
     def prev_page(self):
-        if self.current_page > 1: self.current_page -= 1; self.refresh_agents_list(self.get_selected_agent_id())
+        if self.current_page > 1: self.goto_page(self.current_page - 1)
     def next_page(self):
-        if self.current_page < self.total_pages: self.current_page += 1; self.refresh_agents_list(self.get_selected_agent_id())
\ No newline at end of file
+        if self.current_page < self.total_pages and self._page_last_key:
+            self.current_page += 1; self._page_after = self._page_last_key
+            self.db.note_agent_page_cursor(self._search_term(), self.current_page, self.items_per_page, self._page_after)
+            self.refresh_agents_list(self.get_selected_agent_id())
+    def goto_page(self, page=None):
+        try: page = int(page if page is not None else self.goto_page_var.get())
+        except ValueError: return
+        page = max(1, min(page, self.total_pages))
+        self.current_page = page
+        self.goto_page_var.set("")
+        self.refresh_agents_list(self.get_selected_agent_id(), resolve_cursor=True)
\ No newline at end of file
@@ -5,7 +5,7 @@ from tkcalendar import Calendar
 from datetime import datetime
 
 # Import des utilitaires nécessaires
-from utils.date_utils import get_holidays_set_for_period
+from utils.holiday_calendar import HOLIDAY_CALENDAR
 from utils.config_loader import CONFIG
 
 class DatePickerWindow(tk.Toplevel):
@@ -43,7 +43,7 @@ class DatePickerWindow(tk.Toplevel):
         if self.conge_type in types_decompte:
             year = datetime.now().year
             # On charge les jours fériés pour l'année en cours, précédente et suivante
-            holidays_set = get_holidays_set_for_period(self.db, year - 1, year + 1)
+            holidays_set = HOLIDAY_CALENDAR.holidays_for_period(self.db, year - 1, year + 1)
             for h_date in holidays_set:
                 self.holidays_dict[h_date] = "Jour Férié"
 
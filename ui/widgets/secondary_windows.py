@@ -2,11 +2,12 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
-import holidays
+import sqlite3
 
 # Import des composants nécessaires
 from ui.widgets.date_picker import DatePickerWindow
 from utils.date_utils import validate_date, format_date_for_display
+from utils.holiday_calendar import HOLIDAY_CALENDAR
 
 class HolidaysManagerWindow(tk.Toplevel):
     """
@@ -85,10 +86,8 @@ class HolidaysManagerWindow(tk.Toplevel):
             self.holidays_tree.delete(row)
         try:
             year = int(self.year_var.get())
-            # On s'assure que les jours fériés officiels sont dans la DB
-            auto_holidays = holidays.country_holidays('MA', years=year)
-            for date_obj, name in auto_holidays.items():
-                self.db.add_or_update_holiday(date_obj.strftime("%Y-%m-%d"), name, "Automatique")
+            # On s'assure que les jours fériés officiels sont dans la DB (aucune écriture si l'année est déjà synchronisée)
+            HOLIDAY_CALENDAR.sync_official(self.db, [year])
             
             # On affiche tous les jours (officiels et perso)
             all_holidays = self.db.get_holidays_for_year(str(year))
@@ -111,6 +110,7 @@ class HolidaysManagerWindow(tk.Toplevel):
 
         date_sql = validated_date.strftime("%Y-%m-%d")
         if self.db.add_holiday(date_sql, desc, "Personnalisé"):
+            HOLIDAY_CALENDAR.invalidate(validated_date.year)
             self.desc_entry.delete(0, tk.END)
             self.date_entry.delete(0, tk.END)
             self.refresh_holidays_list()
@@ -143,13 +143,20 @@ class HolidaysManagerWindow(tk.Toplevel):
         
         if messagebox.askyesno("Confirmation", f"Êtes-vous sûr de vouloir supprimer :\n{desc} ({date_display}) ?", parent=self):
             if self.db.delete_holiday(date_sql):
+                HOLIDAY_CALENDAR.invalidate(date_sql[:4])
                 self.refresh_holidays_list()
             else:
                 messagebox.showerror("Erreur BD", "La suppression a échoué.", parent=self)
 
     def restore_auto_holidays(self):
-        # ... (La logique de cette fonction reste la même que dans la version 2.1.1)
-        pass
+        try:
+            year = int(self.year_var.get())
+            HOLIDAY_CALENDAR.sync_official(self.db, [year], force=True)
+        except (tk.TclError, ValueError):
+            return
+        except sqlite3.Error as e:
+            messagebox.showerror("Erreur BD", f"Impossible de restaurer les jours fériés: {e}", parent=self)
+        self.refresh_holidays_list()
 
 class JustificatifsWindow(tk.Toplevel):
     """
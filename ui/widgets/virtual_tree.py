@@ -0,0 +1,201 @@
+# ui/widgets/virtual_tree.py
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualTreeview(ttk.Frame):
+    """
+    Liste virtualisée basée sur un ttk.Treeview.
+    Les données restent dans un modèle Python (liste de lignes `(clé, valeurs, tags)`) ;
+    seules les lignes visibles, plus une petite marge, existent comme éléments Tcl.
+    Le tri et la sélection portent sur le modèle : la sélection survit au défilement.
+    Un événement virtuel <<VirtualSelect>> est émis quand l'utilisateur change la sélection.
+    """
+    BUFFER_ROWS = 2
+
+    def __init__(self, parent, columns, numeric_columns=(), group_tag=None, **tree_kwargs):
+        super().__init__(parent)
+        self.columns = tuple(columns)
+        self.numeric_columns = set(numeric_columns)
+        self.group_tag = group_tag   # Lignes d'en-tête de groupe : le tri se fait à l'intérieur de chaque groupe
+        self._rows = []
+        self._offset = 0
+        self._visible = 1
+        self._pool = []              # iid des éléments Tcl réutilisés
+        self._selected_key = None
+
+        tree_kwargs.setdefault("show", "headings")
+        tree_kwargs.setdefault("selectmode", "browse")
+        self.tree = ttk.Treeview(self, columns=self.columns, **tree_kwargs)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        for col in self.columns:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort(c, False))
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1, "units"))
+        self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self._move_selection(-self._visible))
+        self.tree.bind("<Next>", lambda e: self._move_selection(self._visible))
+
+    # --- Délégation au Treeview ---
+    def bind(self, sequence=None, func=None, add=None):
+        return self.tree.bind(sequence, func, add)
+
+    def column(self, col, **kwargs):
+        return self.tree.column(col, **kwargs)
+
+    def tag_configure(self, tag, **kwargs):
+        return self.tree.tag_configure(tag, **kwargs)
+
+    # --- Modèle ---
+    def set_rows(self, rows, selected_key=None):
+        """Remplace le modèle. `rows` : liste de (clé, valeurs, tags)."""
+        self._rows = list(rows)
+        keys = {row[0] for row in self._rows}
+        self._selected_key = selected_key if selected_key in keys else None
+        self._offset = 0
+        if self._selected_key is not None:
+            self._ensure_visible(self._index_of(self._selected_key))
+        self._render()
+
+    def clear(self):
+        self.set_rows([])
+
+    def selected_key(self):
+        return self._selected_key
+
+    def selected_row(self):
+        """(clé, valeurs, tags) de la ligne sélectionnée, ou None."""
+        i = self._index_of(self._selected_key)
+        return self._rows[i] if i is not None else None
+
+    def select(self, key):
+        i = self._index_of(key)
+        if i is None: return
+        self._selected_key = key
+        self._ensure_visible(i)
+        self._render()
+
+    def _index_of(self, key):
+        if key is None: return None
+        for i, row in enumerate(self._rows):
+            if row[0] == key: return i
+        return None
+
+    # --- Tri ---
+    def _sort_key(self, col):
+        idx = self.columns.index(col)
+        if col in self.numeric_columns:
+            def key(row):
+                try: return (0, float(str(row[1][idx]).replace(',', '.')), "")
+                except (ValueError, IndexError): return (1, 0.0, str(row[1][idx] if idx < len(row[1]) else ""))
+            return key
+        return lambda row: str(row[1][idx] if idx < len(row[1]) else "").lower()
+
+    def sort(self, col, reverse):
+        key = self._sort_key(col)
+        if self.group_tag is None:
+            self._rows.sort(key=key, reverse=reverse)
+        else:
+            # Tri à l'intérieur de chaque groupe ; les en-têtes de groupe restent à leur place
+            sorted_rows, group = [], []
+            for row in self._rows:
+                if self.group_tag in row[2]:
+                    sorted_rows.extend(sorted(group, key=key, reverse=reverse)); group = []
+                    sorted_rows.append(row)
+                else:
+                    group.append(row)
+            sorted_rows.extend(sorted(group, key=key, reverse=reverse))
+            self._rows = sorted_rows
+        self.tree.heading(col, command=lambda: self.sort(col, not reverse))
+        i = self._index_of(self._selected_key)
+        if i is not None: self._ensure_visible(i)
+        self._render()
+
+    # --- Défilement et rendu ---
+    def _on_configure(self, event):
+        rowheight = int(ttk.Style(self).lookup("Treeview", "rowheight") or 20)
+        visible = max(1, event.height // rowheight - 1) # -1 : ligne d'en-tête
+        if visible != self._visible:
+            self._visible = visible
+            self._render()
+
+    def _max_offset(self):
+        return max(0, len(self._rows) - self._visible)
+
+    def _ensure_visible(self, index):
+        if index is None: return
+        if index < self._offset: self._offset = index
+        elif index >= self._offset + self._visible: self._offset = index - self._visible + 1
+        self._offset = max(0, min(self._offset, self._max_offset()))
+
+    def scroll(self, amount, what="units"):
+        step = amount * (self._visible if what == "pages" else 1)
+        offset = max(0, min(self._offset + step, self._max_offset()))
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+        return "break"
+
+    def _on_scrollbar(self, action, value, what=None):
+        if action == "moveto":
+            self._offset = max(0, min(int(float(value) * len(self._rows)), self._max_offset()))
+            self._render()
+        elif action == "scroll":
+            self.scroll(int(value), what)
+
+    def _render(self):
+        window = self._rows[self._offset:self._offset + self._visible + self.BUFFER_ROWS]
+        while len(self._pool) < len(window):
+            self._pool.append(self.tree.insert("", "end"))
+        attached = set(self.tree.get_children(""))
+        selected_iid = None
+        for i, iid in enumerate(self._pool):
+            if i < len(window):
+                key, values, tags = window[i]
+                self.tree.item(iid, values=values, tags=tags)
+                self.tree.move(iid, "", i)
+                if key == self._selected_key: selected_iid = iid
+            elif iid in attached:
+                self.tree.detach(iid)
+        if selected_iid:
+            self.tree.selection_set(selected_iid)
+            self.tree.focus(selected_iid)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+        total = len(self._rows)
+        if total:
+            self.scrollbar.set(self._offset / total, min(1.0, (self._offset + self._visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # --- Sélection ---
+    def _on_tree_select(self, event=None):
+        selection = self.tree.selection()
+        if not selection: return # Ligne sélectionnée hors de la zone visible : la sélection du modèle est conservée
+        i = self._offset + self._pool.index(selection[0]) if selection[0] in self._pool else None
+        if i is None or i >= len(self._rows): return
+        key = self._rows[i][0]
+        if key != self._selected_key:
+            self._selected_key = key
+            self.tree.event_generate("<<VirtualSelect>>")
+
+    def _move_selection(self, step):
+        if not self._rows: return "break"
+        i = self._index_of(self._selected_key)
+        i = 0 if i is None else max(0, min(i + step, len(self._rows) - 1))
+        key = self._rows[i][0]
+        changed = key != self._selected_key
+        self._selected_key = key
+        self._ensure_visible(i)
+        self._render()
+        if changed: self.tree.event_generate("<<VirtualSelect>>")
+        return "break"
@@ -1,28 +1,21 @@
 # utils/config_loader.py
 import yaml
 import os
-import sys
-import tkinter as tk
-from tkinter import messagebox
 
-# On initialise une variable globale vide. Elle sera remplie par main.py.
+# On initialise une variable globale vide. Elle sera remplie par main.py (ou cli.py).
 CONFIG = {}
 
 def load_config(path):
     """
     Charge la configuration depuis un chemin absolu et la stocke dans la variable globale CONFIG.
+    Lève FileNotFoundError si le fichier est absent : c'est à l'appelant de l'afficher.
     """
-    global CONFIG
     if not os.path.exists(path):
-        root = tk.Tk()
-        root.withdraw()
-        messagebox.showerror(
-            "Fichier de Configuration Manquant",
+        raise FileNotFoundError(
             f"Le fichier de configuration '{os.path.basename(path)}' est introuvable.\n"
             f"Il doit se trouver ici : {os.path.dirname(path)}"
         )
-        sys.exit(1) 
         
     with open(path, 'r', encoding='utf-8') as f:
         config_data = yaml.safe_load(f)
-        CONFIG.update(config_data) # On remplit le dictionnaire global
\ No newline at end of file
+        CONFIG.update(config_data) # On remplit le dictionnaire global
@@ -1,51 +1,58 @@
 # utils/date_utils.py
-from datetime import datetime, timedelta, date
+from datetime import datetime, date
+from functools import lru_cache
 from dateutil import parser
-import holidays
-import sqlite3
-import logging
-from utils.config_loader import CONFIG
+from utils.working_days import WorkingDayCalendar
+
+# --- Codec des dates stockées en base (toujours au format ISO YYYY-MM-DD) ---
+
+@lru_cache(maxsize=8192)
+def _parse_iso(date_str):
+    try:
+        return datetime.fromisoformat(date_str)
+    except ValueError:
+        # Valeur non ISO (anciennes données) : analyse générique, année en premier
+        return parser.parse(date_str, dayfirst=False)
+
+def parse_sql_date(value):
+    """Convertit une date lue en base (YYYY-MM-DD) en objet datetime, sans passer par l'analyseur générique."""
+    if not value: return None
+    if isinstance(value, datetime): return value
+    if isinstance(value, date): return datetime(value.year, value.month, value.day)
+    try:
+        return _parse_iso(value)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+@lru_cache(maxsize=8192)
+def _format_sql_date(date_str_sql, fmt):
+    d = parse_sql_date(date_str_sql)
+    return d.strftime(fmt) if d else date_str_sql
 
 def format_date_for_display(date_str_sql):
     """Convertit une date du format SQL (YYYY-MM-DD) en format affichable (DD/MM/YYYY)."""
     if not date_str_sql: return ""
-    try:
-        return parser.parse(date_str_sql).strftime("%d/%m/%Y")
-    except (ValueError, TypeError):
-        return date_str_sql
+    if hasattr(date_str_sql, 'strftime'): return date_str_sql.strftime("%d/%m/%Y")
+    return _format_sql_date(date_str_sql, "%d/%m/%Y")
+
+def format_date_for_display_short(date_obj):
+    """Convertit une date (objet ou chaîne SQL) en format affichable court (JJ/MM/AA)."""
+    if not date_obj: return ""
+    if hasattr(date_obj, 'strftime'): return date_obj.strftime("%d/%m/%y")
+    return _format_sql_date(str(date_obj), "%d/%m/%y")
+
+# --- Saisie utilisateur (formulaires) : analyse souple, jour en premier ---
 
 def validate_date(date_str, dayfirst=True):
-    """Valide et convertit une chaîne de caractères en objet datetime."""
+    """Valide et convertit une chaîne de caractères saisie par l'utilisateur en objet datetime."""
     if not date_str: return None
     try:
         return parser.parse(date_str, dayfirst=dayfirst)
     except (ValueError, TypeError):
         return None
 
-def get_holidays_set_for_period(db_manager, start_year, end_year):
-    """Charge les jours fériés (officiels et personnalisés) pour une période donnée."""
-    country_code = CONFIG['conges']['holidays_country']
-    all_h = {}
-    for year in range(start_year, end_year + 2): # Prévoir une marge
-        all_h.update(holidays.country_holidays(country_code, years=year))
-        try:
-            if db_manager and db_manager.conn:
-                db_h = db_manager.get_holidays_for_year(str(year))
-                for date_str, name, type in db_h:
-                    all_h[validate_date(date_str).date()] = name
-        except sqlite3.Error as e:
-            logging.error(f"Erreur lors du chargement des jours fériés pour l'année {year}: {e}")
-    return set(all_h.keys())
-
 def jours_ouvres(date_debut, date_fin, holidays_set):
     """Calcule le nombre de jours ouvrés entre deux dates, en excluant les jours fériés."""
     if not date_debut or not date_fin or date_fin < date_debut:
         return 0
-    jours = 0
-    current_day = date_debut.date() if isinstance(date_debut, datetime) else date_debut
-    end_day = date_fin.date() if isinstance(date_fin, datetime) else date_fin
-    while current_day <= end_day:
-        if current_day.weekday() < 5 and current_day not in holidays_set: # Lundi=0, Dimanche=6
-            jours += 1
-        current_day += timedelta(days=1)
-    return jours
\ No newline at end of file
+    return WorkingDayCalendar.for_holidays(holidays_set).count(date_debut, date_fin)
\ No newline at end of file
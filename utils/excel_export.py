@@ -0,0 +1,73 @@
+# utils/excel_export.py
+"""
+Export Excel en flux, sans interface graphique.
+
+Le classeur est ouvert en mode `write_only` d'openpyxl : chaque ligne est écrite
+dans un fichier temporaire dès son ajout, la mémoire reste constante quel que
+soit le nombre de lignes. En contrepartie, openpyxl écrit les largeurs de
+colonnes avant la première ligne : elles sont mesurées au fil de l'eau sur les
+premières lignes (SAMPLE_ROWS), gardées en tampon, puis figées.
+"""
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+AGENTS_EXPORT_HEADERS = ["ID", "Nom", "Prénom", "PPR", "Grade", "Solde"]
+CONGES_EXPORT_HEADERS = ["PPR Agent", "Nom Agent", "Prénom Agent", "Type Congé", "Début", "Fin", "Jours Pris", "Justification", "Intérimaire", "Certificat"]
+
+
+class StreamingSheetWriter:
+    """Feuille en écriture seule avec en-tête en gras et largeurs de colonnes calculées pendant l'écriture."""
+    SAMPLE_ROWS = 1000
+
+    def __init__(self, workbook, title, headers, sample_rows=None):
+        self.ws = workbook.create_sheet(title)
+        self.headers = list(headers)
+        self.widths = [len(str(h)) for h in self.headers]
+        self.row_count = 0
+        self._sample_rows = sample_rows or self.SAMPLE_ROWS
+        self._sample = []   # None une fois les largeurs figées
+
+    def append(self, row):
+        self.row_count += 1
+        if self._sample is None:
+            self.ws.append(row); return
+        widths = self.widths
+        for i, value in enumerate(row):
+            if value is not None:
+                n = len(str(value))
+                if n > widths[i]: widths[i] = n
+        self._sample.append(row)
+        if len(self._sample) >= self._sample_rows:
+            self._flush_sample()
+
+    def _flush_sample(self):
+        for i, width in enumerate(self.widths, 1):
+            self.ws.column_dimensions[get_column_letter(i)].width = width + 2
+        header_font = Font(bold=True)
+        header = []
+        for h in self.headers:
+            cell = WriteOnlyCell(self.ws, value=h); cell.font = header_font
+            header.append(cell)
+        self.ws.append(header)
+        for row in self._sample: self.ws.append(row)
+        self._sample = None
+
+    def close(self):
+        if self._sample is not None: self._flush_sample()
+
+
+def export_rows_to_xlsx(filename, title, headers, rows, progress=None, progress_every=10000):
+    """
+    Écrit les lignes (itérable quelconque, consommé une seule fois) dans un nouveau classeur.
+    `progress(nombre_de_lignes)` est appelé toutes les `progress_every` lignes. Retourne le nombre de lignes écrites.
+    """
+    wb = Workbook(write_only=True)
+    sheet = StreamingSheetWriter(wb, title, headers)
+    for row in rows:
+        sheet.append(row)
+        if progress and sheet.row_count % progress_every == 0: progress(sheet.row_count)
+    sheet.close()
+    wb.save(filename)
+    return sheet.row_count
@@ -0,0 +1,141 @@
+# utils/excel_import.py
+"""
+Import d'agents depuis un classeur Excel (ou un fichier CSV), sans interface graphique.
+Les fonctions de lecture sont aussi utilisées par l'import des congés (core/conges/importer.py).
+
+Le classeur est lu en flux (mode `read_only` d'openpyxl). Les lignes sont
+validées par lots contre les grades configurés et les PPR déjà connus, puis
+appliquées par INSERT ... ON CONFLICT(ppr) DO UPDATE dans une seule
+transaction. Dès qu'une ligne est invalide, plus rien n'est écrit : la
+transaction est annulée à la fin et le rapport liste toutes les erreurs.
+"""
+import csv
+import os
+from itertools import islice
+
+import openpyxl
+
+from utils.config_loader import CONFIG
+from utils.text_utils import normaliser_recherche
+
+CHUNK_SIZE = 1000
+
+
+class ImportReport:
+    """Bilan d'un import : lignes ajoutées, mises à jour, et erreurs par ligne."""
+    def __init__(self):
+        self.added = 0
+        self.updated = 0
+        self.errors = []   # ["Ligne 12: ...", ...]
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+class ImportAnnule(Exception):
+    """Levée pendant l'écriture pour annuler la transaction quand des lignes sont invalides."""
+
+
+def _open_rows(filename):
+    """(itérateur des lignes, fonction de fermeture) d'un fichier .csv ou d'un classeur Excel."""
+    if os.path.splitext(filename)[1].lower() == ".csv":
+        f = open(filename, newline="", encoding="utf-8-sig")
+        try: dialect = csv.Sniffer().sniff(f.read(4096), delimiters=",;\t")
+        except csv.Error: dialect = csv.excel
+        f.seek(0)
+        return csv.reader(f, dialect), f.close
+    wb = openpyxl.load_workbook(filename, read_only=True, data_only=True)
+    return wb.active.iter_rows(values_only=True), wb.close
+
+def read_sheet_rows(filename):
+    """
+    En-tête normalisé (sans accents ni majuscules), générateur de (numéro de ligne, valeurs)
+    de la feuille active (ou du fichier CSV), lue en flux, et fonction de fermeture du fichier.
+    Les lignes vides sont ignorées. Le générateur ferme le fichier une fois parcouru ; un appelant
+    qui s'arrête avant (générateur jamais démarré compris) appelle la fonction de fermeture.
+    """
+    rows, close = _open_rows(filename)
+    first = next(rows, None)
+    if first is None:
+        close()
+        return [], (row for row in ()), close
+    header = [normaliser_recherche(v).strip() for v in first]
+
+    def generate():
+        try:
+            for i, row in enumerate(rows, start=2):
+                if any(v is not None and str(v).strip() for v in row): yield i, row
+        finally:
+            close()
+    return header, generate(), close
+
+
+def text_value(value):
+    return "" if value is None else str(value).strip()
+
+
+def ppr_value(value):
+    # Excel renvoie souvent les matricules numériques sous forme de float (1234567.0)
+    if isinstance(value, float) and value.is_integer(): value = int(value)
+    return text_value(value)
+
+
+def validate_agent_row(row, col_map, grades):
+    """(nom, prenom, ppr, grade, solde) d'une ligne du fichier. Lève ValueError si elle est invalide."""
+    cell = lambda name: row[col_map[name]] if col_map[name] < len(row) else None
+    ppr = ppr_value(cell('ppr'))
+    if not ppr: raise ValueError("PPR manquant.")
+    nom = text_value(cell('nom'))
+    if not nom: raise ValueError("Nom manquant.")
+    grade = text_value(cell('grade'))
+    if grade not in grades: raise ValueError(f"Grade '{grade}' invalide.")
+    try: solde = float(str(cell('solde')).replace(',', '.'))
+    except (TypeError, ValueError): raise ValueError(f"Solde '{cell('solde')}' invalide.")
+    if solde < 0: raise ValueError(f"Le solde '{solde}' ne peut être négatif.")
+    return nom, text_value(cell('prenom')), ppr, grade, solde
+
+
+def import_agents_from_file(db_manager, filename, chunk_size=CHUNK_SIZE):
+    """
+    Importe (ajoute ou met à jour par PPR) les agents d'un fichier Excel. Tout ou rien.
+    Lève ValueError si des colonnes requises manquent ; retourne un ImportReport sinon.
+    """
+    required = [normaliser_recherche(h).strip() for h in CONFIG['agent_import_headers']]
+    header, rows, close = read_sheet_rows(filename)
+    missing = [h for h in required if h not in header]
+    if missing:
+        close()  # rows.close() ne ferait rien : le générateur n'a pas démarré
+        raise ValueError(f"Colonnes requises : {', '.join(CONFIG['agent_import_headers'])}")
+    col_map = {name: header.index(name) for name in required}
+    grades = set(CONFIG['ui']['grades'])
+    known_pprs = db_manager.get_agent_ids_by_ppr()
+    seen = {}   # ppr -> première ligne du fichier
+    report = ImportReport()
+
+    def valid_chunks():
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk: break
+            valid = []
+            for i, row in chunk:
+                try:
+                    agent = validate_agent_row(row, col_map, grades)
+                except (ValueError, IndexError) as e:
+                    report.errors.append(f"Ligne {i}: {e}"); continue
+                ppr = agent[2]
+                if ppr in seen:
+                    report.errors.append(f"Ligne {i}: PPR {ppr} déjà présent à la ligne {seen[ppr]}."); continue
+                seen[ppr] = i
+                if ppr in known_pprs: report.updated += 1
+                else: report.added += 1
+                valid.append(agent)
+            # Après la première erreur, on continue la validation pour le rapport, sans plus rien écrire
+            if not report.errors: yield valid
+        if report.errors: raise ImportAnnule()
+
+    try:
+        db_manager.upsert_agents(valid_chunks())
+    except ImportAnnule:
+        report.added = report.updated = 0
+    return report
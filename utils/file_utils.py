@@ -1,51 +1,40 @@
 # utils/file_utils.py
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import openpyxl
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font
 from datetime import datetime
-from utils.config_loader import CONFIG
-from utils.date_utils import format_date_for_display
+from itertools import chain
+from utils.excel_export import export_rows_to_xlsx, AGENTS_EXPORT_HEADERS, CONGES_EXPORT_HEADERS
+from utils.excel_import import import_agents_from_file
+from core.conges.importer import import_conges_from_file
+
+def _export_stream(main_window, rows, filename, title, headers, libelle):
+    """Écrit un export en flux et affiche la progression dans la barre d'état."""
+    first = next(rows, None)
+    if first is None:
+        return 0
+    progress = lambda n: main_window.set_status(f"Exportation {libelle} : {n} lignes écrites...")
+    return export_rows_to_xlsx(filename, title, headers, chain((first,), rows), progress=progress)
 
 def export_agents_to_excel(main_window, db_manager):
     """Exporte la liste complète des agents vers un fichier Excel."""
+    filename = filedialog.asksaveasfilename(
+        defaultextension=".xlsx",
+        filetypes=[("Fichiers Excel", "*.xlsx")],
+        title="Exporter la liste des agents",
+        initialfile=f"Export_Agents_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
+    )
+    if not filename: return
+
     main_window.config(cursor="watch")
     main_window.update_idletasks()
     main_window.set_status("Exportation des agents en cours...")
     
     try:
-        agents = db_manager.get_agents()
-        if not agents:
+        count = _export_stream(main_window, db_manager.iter_agents_export_rows(), filename, "Agents", AGENTS_EXPORT_HEADERS, "des agents")
+        if count:
+            messagebox.showinfo("Succès", f"Liste des agents ({count}) exportée avec succès vers\n{filename}")
+        else:
             messagebox.showinfo("Information", "Aucun agent à exporter.")
-            return
-
-        filename = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Fichiers Excel", "*.xlsx")],
-            title="Exporter la liste des agents",
-            initialfile=f"Export_Agents_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
-        )
-        if not filename: return
-
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Agents"
-        headers = ["ID", "Nom", "Prénom", "PPR", "Grade", "Solde"]
-        ws.append(headers)
-        header_font = Font(bold=True)
-        for cell in ws[1]:
-            cell.font = header_font
-
-        for agent in agents:
-            ws.append(agent)
-
-        for col_idx, col_cells in enumerate(ws.columns, 1):
-            max_length = max(len(str(cell.value or "")) for cell in col_cells)
-            ws.column_dimensions[get_column_letter(col_idx)].width = max_length + 2
-        
-        wb.save(filename)
-        messagebox.showinfo("Succès", f"Liste des agents exportée avec succès vers\n{filename}")
     except Exception as e:
         messagebox.showerror("Erreur d'écriture", f"Impossible de sauvegarder le fichier : {e}")
     finally:
@@ -54,52 +43,24 @@ def export_agents_to_excel(main_window, db_manager):
 
 def export_all_conges_to_excel(main_window, db_manager):
     """Exporte la liste complète de tous les congés vers un fichier Excel."""
+    filename = filedialog.asksaveasfilename(
+        defaultextension=".xlsx",
+        filetypes=[("Fichiers Excel", "*.xlsx")],
+        title="Exporter tous les congés",
+        initialfile=f"Export_Conges_Total_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
+    )
+    if not filename: return
+
     main_window.config(cursor="watch")
     main_window.update_idletasks()
     main_window.set_status("Exportation totale en cours...")
     
     try:
-        conges = db_manager.get_conges()
-        if not conges:
+        count = _export_stream(main_window, db_manager.iter_conges_export_rows(), filename, "Tous les Congés", CONGES_EXPORT_HEADERS, "des congés")
+        if count:
+            messagebox.showinfo("Succès", f"Tous les congés ({count}) ont été exportés avec succès vers\n{filename}")
+        else:
             messagebox.showinfo("Information", "Aucun congé à exporter.")
-            return
-
-        filename = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Fichiers Excel", "*.xlsx")],
-            title="Exporter tous les congés",
-            initialfile=f"Export_Conges_Total_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
-        )
-        if not filename: return
-
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Tous les Congés"
-        headers = ["PPR Agent", "Nom Agent", "Prénom Agent", "Type Congé", "Début", "Fin", "Jours Pris", "Justification", "Intérimaire"]
-        ws.append(headers)
-        header_font = Font(bold=True)
-        for cell in ws[1]:
-            cell.font = header_font
-
-        for c in conges:
-            interim_info = ""
-            if c[6]: # interim_id
-                interim = db_manager.get_agent_by_id(c[6])
-                interim_info = f"{interim[1]} {interim[2]}" if interim else "Agent Supprimé"
-            row_data = [
-                c[10], c[1], c[2], c[4], 
-                format_date_for_display(c[7]), 
-                format_date_for_display(c[8]), 
-                c[9], c[5] or "", interim_info
-            ]
-            ws.append(row_data)
-
-        for col_idx, col_cells in enumerate(ws.columns, 1):
-            max_length = max(len(str(cell.value or "")) for cell in col_cells)
-            ws.column_dimensions[get_column_letter(col_idx)].width = max_length + 2
-            
-        wb.save(filename)
-        messagebox.showinfo("Succès", f"Tous les congés ont été exportés avec succès vers\n{filename}")
     except Exception as e:
         messagebox.showerror("Erreur d'écriture", f"Impossible de sauvegarder le fichier : {e}")
     finally:
@@ -119,65 +80,46 @@ def import_agents_from_excel(main_window, db_manager):
     main_window.update_idletasks()
     main_window.set_status("Importation en cours...")
     
-    errors = []
-    agent_import_headers = CONFIG['agent_import_headers']
-    grades = CONFIG['ui']['grades']
-
     try:
-        wb = openpyxl.load_workbook(filename)
-        ws = wb.active
-        header = [cell.value.lower().strip() for cell in ws[1]]
-        
-        if not all(h in header for h in agent_import_headers):
-            raise ValueError(f"Colonnes requises : {', '.join(agent_import_headers)}")
+        report = import_agents_from_file(db_manager, filename)
+        if report.ok:
+            summary = f"Importation réussie !\n\n- Agents ajoutés : {report.added}\n- Agents mis à jour : {report.updated}"
+            messagebox.showinfo("Rapport d'importation", summary)
+        else:
+            summary = (f"Échec de l'importation : {len(report.errors)} ligne(s) invalide(s).\n\nAucune modification n'a été enregistrée."
+                       "\n\nDétail des erreurs (premières 5):\n" + "\n".join(report.errors[:5]))
+            messagebox.showerror("Rapport d'importation", summary)
+    except Exception as e:
+        messagebox.showerror("Rapport d'importation", f"Échec de l'importation: {e}\n\nAucune modification n'a été enregistrée.")
+    finally:
+        main_window.config(cursor="")
+        main_window.set_status("Prêt.")
+        main_window.refresh_all()
 
-        col_map = {name: i for i, name in enumerate(header)}
-        added_count, updated_count, error_count = 0, 0, 0
-        
-        db_manager.conn.execute('BEGIN TRANSACTION')
-        for i, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-            try:
-                if all(c is None for c in row): continue
-                ppr = str(row[col_map['ppr']]).strip()
-                grade = str(row[col_map['grade']]).strip()
-                solde_str = str(row[col_map['solde']])
-                
-                if not ppr: raise ValueError("PPR manquant.")
-                if grade not in grades: raise ValueError(f"Grade '{grade}' invalide.")
-                
-                solde = float(solde_str)
-                if solde < 0: raise ValueError(f"Le solde '{solde}' ne peut être négatif.")
-                
-                nom = str(row[col_map['nom']]).strip()
-                prenom = str(row[col_map['prenom']]).strip()
-                
-                agent = db_manager.get_agent_by_ppr(ppr)
-                if agent:
-                    if not db_manager.modifier_agent(agent[0], nom, prenom, ppr, grade, solde):
-                        raise sqlite3.Error(f"Erreur de mise à jour pour PPR {ppr}.")
-                    updated_count += 1
-                else:
-                    if not db_manager.ajouter_agent(nom, prenom, ppr, grade, solde):
-                        raise sqlite3.Error(f"Erreur d'ajout pour PPR {ppr}.")
-                    added_count += 1
-            except (ValueError, TypeError, IndexError) as ve:
-                errors.append(f"Ligne {i}: {ve}"); error_count += 1
-            except Exception as e:
-                errors.append(f"Ligne {i}: Erreur BD - {e}"); error_count += 1
-        
-        if error_count > 0:
-            raise Exception("Des erreurs ont été détectées. L'importation est annulée.")
-        
-        db_manager.conn.commit()
-        summary = f"Importation réussie !\n\n- Agents ajoutés : {added_count}\n- Agents mis à jour : {updated_count}"
-        messagebox.showinfo("Rapport d'importation", summary)
+def import_conges_from_excel(main_window, db_manager):
+    """Importe un historique de congés depuis un fichier Excel ou CSV (tout ou rien)."""
+    filename = filedialog.askopenfilename(
+        title="Sélectionner un fichier de congés à importer",
+        filetypes=[("Fichiers Excel ou CSV", "*.xlsx *.csv"), ("Fichiers Excel", "*.xlsx"), ("Fichiers CSV", "*.csv")]
+    )
+    if not filename:
+        return
+
+    main_window.config(cursor="watch")
+    main_window.update_idletasks()
+    main_window.set_status("Importation des congés en cours...")
+    
+    try:
+        report = import_conges_from_file(db_manager, filename)
+        if report.ok:
+            messagebox.showinfo("Rapport d'importation", f"Importation réussie !\n\n- Congés ajoutés : {report.added}")
+        else:
+            summary = (f"Échec de l'importation : {len(report.errors)} erreur(s).\n\nAucune modification n'a été enregistrée."
+                       "\n\nDétail des erreurs (premières 5):\n" + "\n".join(report.errors[:5]))
+            messagebox.showerror("Rapport d'importation", summary)
     except Exception as e:
-        db_manager.conn.rollback()
-        summary = f"Échec de l'importation: {e}\n\nAucune modification n'a été enregistrée."
-        if errors:
-            summary += "\n\nDétail des erreurs (premières 5):\n" + "\n".join(errors[:5])
-        messagebox.showerror("Rapport d'importation", summary)
+        messagebox.showerror("Rapport d'importation", f"Échec de l'importation: {e}\n\nAucune modification n'a été enregistrée.")
     finally:
         main_window.config(cursor="")
         main_window.set_status("Prêt.")
-        main_window.refresh_all()
\ No newline at end of file
+        main_window.refresh_all()
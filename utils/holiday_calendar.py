@@ -0,0 +1,98 @@
+# utils/holiday_calendar.py
+"""
+Service de calendrier des jours fériés, partagé par tout le processus.
+
+Les jours fériés officiels (bibliothèque `holidays`) et personnalisés
+(table `jours_feries_personnalises`) sont mis en cache par année.
+Le cache des jours personnalisés n'est invalidé que lorsqu'un jour férié
+est ajouté, modifié ou supprimé (voir HolidaysManagerWindow).
+"""
+from datetime import date
+import logging
+import sqlite3
+
+import holidays
+
+from utils.config_loader import CONFIG
+
+
+class HolidayCalendar:
+    def __init__(self):
+        self._official = {}   # (pays, année) -> {date: nom}, jamais invalidé
+        self._merged = {}     # (base, année) -> frozenset des jours officiels et personnalisés
+        self._periods = {}    # (base, début, fin) -> frozenset
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _db_key(db_manager):
+        return getattr(db_manager, 'db_file', None)
+
+    def official_holidays(self, year, country_code=None):
+        """Jours fériés officiels d'une année : {date: nom}."""
+        key = (country_code or CONFIG['conges']['holidays_country'], int(year))
+        official = self._official.get(key)
+        if official is None:
+            self.misses += 1
+            official = self._official[key] = dict(holidays.country_holidays(key[0], years=key[1]))
+        else:
+            self.hits += 1
+        return official
+
+    def holidays_for_year(self, db_manager, year):
+        """Jours fériés officiels et personnalisés d'une année."""
+        key = (self._db_key(db_manager), int(year))
+        merged = self._merged.get(key)
+        if merged is not None:
+            self.hits += 1
+            return merged
+        self.misses += 1
+        days = set(self.official_holidays(year))
+        try:
+            if db_manager and db_manager.conn:
+                for date_str, _name, _type in db_manager.get_holidays_for_year(year):
+                    days.add(date.fromisoformat(date_str[:10]))
+        except sqlite3.Error as e:
+            # On ne met pas l'année en cache : elle sera relue au prochain appel
+            logging.error(f"Erreur lors du chargement des jours fériés pour l'année {year}: {e}")
+            return frozenset(days)
+        merged = self._merged[key] = frozenset(days)
+        return merged
+
+    def holidays_for_period(self, db_manager, start_year, end_year):
+        """Jours fériés (officiels et personnalisés) de start_year à end_year, avec une année de marge."""
+        key = (self._db_key(db_manager), int(start_year), int(end_year))
+        period = self._periods.get(key)
+        if period is not None:
+            self.hits += 1
+            return period
+        self.misses += 1
+        days = set()
+        for year in range(key[1], key[2] + 2): # Prévoir une marge
+            days |= self.holidays_for_year(db_manager, year)
+        period = self._periods[key] = frozenset(days)
+        return period
+
+    def invalidate(self, year=None):
+        """Oublie les jours personnalisés d'une année (ou de toutes) et les périodes qui l'incluent."""
+        if year is None:
+            self._merged.clear()
+            self._periods.clear()
+            return
+        year = int(year)
+        for key in [k for k in self._merged if k[1] == year]:
+            del self._merged[key]
+        for key in [k for k in self._periods if k[1] <= year <= k[2] + 1]:
+            del self._periods[key]
+
+    def sync_official(self, db_manager, years, force=False):
+        """Synchronise en base les jours fériés officiels des années données (une seule transaction)."""
+        country = CONFIG['conges']['holidays_country']
+        return db_manager.sync_official_holidays(country, {int(y): self.official_holidays(y, country) for y in years}, force=force)
+
+    def stats(self):
+        """Compteurs de succès/échecs du cache."""
+        return {'hits': self.hits, 'misses': self.misses, 'years': len(self._merged), 'periods': len(self._periods)}
+
+
+HOLIDAY_CALENDAR = HolidayCalendar()
@@ -0,0 +1,131 @@
+# utils/profiler.py
+"""
+Profilage à la demande des actions de l'interface (raccourci caché Ctrl+Maj+P dans MainWindow).
+
+Quand il est actif, chaque action décorée par `profiler_action` (et chaque lecture en arrière-plan
+de ReadExecutor, avec son affichage) s'exécute sous cProfile et écrit, dans le dossier `profils`
+à côté de conges.log :
+  - <horodatage>_<n°>_<action>.pstats       (python -m pstats, snakeviz...)
+  - <horodatage>_<n°>_<action>_memoire.txt  (allocations de l'action les plus importantes, tracemalloc)
+Une action appelée pendant une autre dans le même thread est comptée dans le profil de la première.
+Une lecture soumise pendant une action est nommée d'après elle : <n°>_<action>_lecture_<vue>, puis
+<n°>_<action>_affichage_<vue> (voir `action_en_cours` et ReadExecutor.submit).
+tracemalloc ne trace que pendant les actions profilées, mais les ralentit : les durées sont à comparer entre elles.
+"""
+import cProfile
+import functools
+import itertools
+import logging
+import os
+import threading
+import tracemalloc
+from datetime import datetime
+from time import perf_counter
+
+TOP_ALLOCATIONS = 25
+
+
+def dossier_journal():
+    """Dossier du fichier journal de l'application (conges.log), ou le dossier courant."""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.FileHandler): return os.path.dirname(handler.baseFilename)
+    return os.getcwd()
+
+
+class ProfileurActions:
+    def __init__(self):
+        self.actif = False
+        self.dossier = None
+        self._local = threading.local()
+        self._numeros = itertools.count(1)
+        self._lock = threading.Lock()
+        self._actions_en_cours = 0          # Actions profilées en cours, tous threads confondus
+        self._tracemalloc_demarre = False   # tracemalloc démarré par le profileur (et non par PYTHONTRACEMALLOC)
+
+    def activer(self, dossier=None):
+        self.dossier = dossier or os.path.join(dossier_journal(), "profils")
+        self.actif = True
+        logging.info(f"Profilage des actions activé : {self.dossier}")
+
+    def desactiver(self):
+        self.actif = False
+        logging.info("Profilage des actions désactivé.")
+
+    def basculer(self):
+        """Active ou désactive le profilage ; retourne le nouvel état."""
+        if self.actif: self.desactiver()
+        else: self.activer()
+        return self.actif
+
+    def action_en_cours(self):
+        """'<n°>_<action>' de l'action profilée en cours dans ce thread, ou None."""
+        return getattr(self._local, 'action', None)
+
+    def executer(self, nom, fonction, *args, **kwargs):
+        """Appelle fonction(*args, **kwargs), sous profilage si actif et si aucune action n'est déjà profilée dans ce thread."""
+        if not self.actif or getattr(self._local, 'action', None):
+            return fonction(*args, **kwargs)
+        numero = next(self._numeros)
+        self._local.action = f"{numero:04d}_{nom}"
+        profil = cProfile.Profile()
+        self._demarrer_memoire()
+        debut = perf_counter()
+        try:
+            return profil.runcall(fonction, *args, **kwargs)
+        finally:
+            duree = perf_counter() - debut
+            memoire = self._arreter_memoire()
+            self._local.action = None
+            self._ecrire(numero, nom, profil, memoire, duree)
+
+    def _demarrer_memoire(self):
+        # Le suivi ne commence qu'avec la première action en cours : l'instantané de fin ne contient que les
+        # allocations encore vivantes faites depuis (y compris par une action simultanée d'un autre thread)
+        with self._lock:
+            if self._actions_en_cours == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(); self._tracemalloc_demarre = True
+            self._actions_en_cours += 1
+
+    def _arreter_memoire(self):
+        """(instantané, mémoire suivie, pic) de fin d'action."""
+        with self._lock:
+            memoire = (tracemalloc.take_snapshot(), *tracemalloc.get_traced_memory())
+            self._actions_en_cours -= 1
+            if self._actions_en_cours == 0 and self._tracemalloc_demarre:
+                tracemalloc.stop(); self._tracemalloc_demarre = False
+        return memoire
+
+    def _ecrire(self, numero, nom, profil, memoire, duree):
+        # Un échec d'écriture ne doit jamais faire échouer l'action profilée
+        base = os.path.join(self.dossier, f"{datetime.now():%Y%m%d_%H%M%S}_{numero:04d}_{nom}")
+        try:
+            os.makedirs(self.dossier, exist_ok=True)
+            profil.dump_stats(f"{base}.pstats")
+            with open(f"{base}_memoire.txt", 'w', encoding='utf-8') as f: f.write(self._rapport_memoire(nom, memoire, duree))
+            logging.info(f"Profil de '{nom}' ({duree * 1000:.0f} ms) écrit : {base}.pstats")
+        except (OSError, ValueError) as e:
+            logging.error(f"Impossible d'écrire le profil de '{nom}' : {e}")
+
+    @staticmethod
+    def _rapport_memoire(nom, memoire, duree):
+        snapshot, courant, pic = memoire
+        internes = (tracemalloc.__file__, __file__)
+        stats = [s for s in snapshot.statistics('lineno') if s.traceback[0].filename not in internes]
+        lignes = [f"Action : {nom}", f"Durée : {duree * 1000:.1f} ms",
+                  f"Mémoire allouée encore utilisée : {courant / 1024:.0f} Kio (pic pendant l'action : {pic / 1024:.0f} Kio)", "",
+                  f"{TOP_ALLOCATIONS} lignes ayant alloué le plus de mémoire encore utilisée en fin d'action :"]
+        for stat in stats[:TOP_ALLOCATIONS]:
+            cadre = stat.traceback[0]
+            lignes.append(f"  {stat.size / 1024:10.1f} Kio {stat.count:8d} blocs  {cadre.filename}:{cadre.lineno}")
+        return "\n".join(lignes) + "\n"
+
+
+PROFILEUR = ProfileurActions()
+
+
+def profiler_action(fonction):
+    """Décorateur des gestionnaires d'actions de l'interface : profilés quand le profileur est actif."""
+    @functools.wraps(fonction)
+    def enveloppe(*args, **kwargs):
+        return PROFILEUR.executer(fonction.__name__, fonction, *args, **kwargs)
+    return enveloppe
@@ -0,0 +1,24 @@
+# utils/text_utils.py
+import unicodedata
+
+# Lettres arabes ramenées à une forme de base (les hamzas et harakat sont retirés par la décomposition)
+_ARABIC_MAP = str.maketrans({
+    'ٱ': 'ا',   # alef wasla
+    'ى': 'ي',   # alef maqsura
+    'ة': 'ه',   # ta marbuta
+    'ـ': None,  # tatweel
+})
+
+def normaliser_recherche(text):
+    """
+    Normalise un texte pour la recherche : minuscules, sans accents latins,
+    sans harakat ni hamza, variantes d'alef et de ya unifiées.
+    """
+    if text is None: return ""
+    decomposed = unicodedata.normalize('NFKD', str(text).casefold())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return stripped.translate(_ARABIC_MAP)
+
+def valeurs_recherche(nom, prenom, ppr):
+    """Valeurs des colonnes nom_recherche, prenom_recherche et ppr_recherche d'un agent (index plein texte)."""
+    return normaliser_recherche(nom), normaliser_recherche(prenom), normaliser_recherche(ppr)
@@ -0,0 +1,124 @@
+# utils/working_days.py
+"""
+Calendrier des jours ouvrés précalculé.
+
+Pour une plage de dates donnée, on stocke le nombre cumulé de jours ouvrés
+(lundi-vendredi hors jours fériés) dans un `array('i')`. Compter les jours
+ouvrés entre deux dates devient une soustraction, et « ajouter N jours ouvrés »
+une recherche dichotomique.
+"""
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+
+def _as_date(d):
+    return d.date() if isinstance(d, datetime) else d
+
+
+def _weekdays_between(d1, d2):
+    """Nombre de jours du lundi au vendredi dans [d1, d2], en O(1)."""
+    if d2 < d1: return 0
+    days = (d2 - d1).days + 1
+    weeks, rest = divmod(days, 7)
+    first = d1.weekday()
+    return weeks * 5 + sum(1 for i in range(rest) if (first + i) % 7 < 5)
+
+
+class WorkingDayCalendar:
+    """Jours ouvrés cumulés sur [start, end] pour un ensemble de jours fériés donné."""
+    _cache = OrderedDict()      # frozenset des jours fériés -> calendrier
+    _par_objet = OrderedDict()  # id(frozenset) -> (frozenset, calendrier) : recherche sans hacher ni comparer le contenu
+    _CACHE_SIZE = 16
+
+    def __init__(self, holidays_set, start, end):
+        self.holidays = holidays_set
+        self.start = _as_date(start)
+        self.end = _as_date(end)
+        n = (self.end - self.start).days + 1
+        # cumul[i] = nombre de jours ouvrés dans [start, start + i[
+        cumul = array('i', [0]) * (n + 1)
+        total, current = 0, self.start
+        for i in range(n):
+            if current.weekday() < 5 and current not in holidays_set:
+                total += 1
+            cumul[i + 1] = total
+            current += timedelta(days=1)
+        self._cumul = cumul
+
+    @classmethod
+    def for_holidays(cls, holidays_set):
+        """
+        Calendrier (mis en cache) couvrant les années présentes dans l'ensemble de jours fériés.
+        Les dates hors de cette plage sont traitées sans jours fériés, comme auparavant.
+        HOLIDAY_CALENDAR renvoie le même frozenset pour une période tant qu'elle n'est pas invalidée :
+        l'identité de l'objet sert alors de clé, en O(1) quelle que soit la taille de l'ensemble.
+        """
+        entry = cls._par_objet.get(id(holidays_set))
+        if entry is not None and entry[0] is holidays_set:
+            return entry[1]
+        key = holidays_set if isinstance(holidays_set, frozenset) else frozenset(holidays_set)
+        calendar = cls._cache.get(key)
+        if calendar is not None:
+            cls._cache.move_to_end(key)
+        else:
+            if key:
+                start, end = date(min(key).year, 1, 1), date(max(key).year, 12, 31)
+            else:
+                year = date.today().year
+                start, end = date(year, 1, 1), date(year, 12, 31)
+            calendar = cls._cache[key] = cls(key, start, end)
+            if len(cls._cache) > cls._CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        if isinstance(holidays_set, frozenset): # Seul un ensemble immuable peut être reconnu à son identité
+            cls._par_objet[id(holidays_set)] = (holidays_set, calendar)
+            if len(cls._par_objet) > cls._CACHE_SIZE:
+                cls._par_objet.popitem(last=False)
+        return calendar
+
+    def _index(self, d):
+        return (d - self.start).days
+
+    def is_working_day(self, d):
+        d = _as_date(d)
+        return d.weekday() < 5 and d not in self.holidays
+
+    def count(self, date_debut, date_fin):
+        """Nombre de jours ouvrés dans [date_debut, date_fin]."""
+        d1, d2 = _as_date(date_debut), _as_date(date_fin)
+        if d2 < d1: return 0
+        total = 0
+        if d1 < self.start:
+            total += _weekdays_between(d1, min(d2, self.start - timedelta(days=1)))
+        if d2 > self.end:
+            total += _weekdays_between(max(d1, self.end + timedelta(days=1)), d2)
+        lo, hi = max(d1, self.start), min(d2, self.end)
+        if lo <= hi:
+            total += self._cumul[self._index(hi) + 1] - self._cumul[self._index(lo)]
+        return total
+
+    def add_working_days(self, start_date, days):
+        """Date du N-ième jour ouvré compté à partir de start_date (inclus)."""
+        current = _as_date(start_date)
+        if days <= 0: return current
+        if self.start <= current <= self.end:
+            i0 = self._index(current)
+            k = bisect_left(self._cumul, self._cumul[i0] + days, i0 + 1)
+            if k < len(self._cumul):
+                return self.start + timedelta(days=k - 1)
+        # Hors de la plage précalculée : parcours jour par jour
+        counted = 0
+        while True:
+            if self.is_working_day(current):
+                counted += 1
+                if counted == days: return current
+            current += timedelta(days=1)
+
+    def count_many(self, ranges):
+        """Variante groupée de count() pour une suite de couples (début, fin)."""
+        return array('i', (self.count(d1, d2) if d1 and d2 else 0 for d1, d2 in ranges))
+
+    def add_working_days_many(self, requests):
+        """Variante groupée de add_working_days() pour une suite de couples (début, nombre de jours)."""
+        return [self.add_working_days(d, n) for d, n in requests]